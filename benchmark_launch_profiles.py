@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark CustomBrowser launch profiles: browser startup time and per-page load time.
+
+Usage:
+    python benchmark_launch_profiles.py [--profiles default throughput fidelity] [--runs 3]
+                                        [--urls https://example.com ...] [--headless]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from browser_use.browser.browser import BrowserConfig
+from browser_use.browser.context import BrowserContextConfig
+
+from src.browser.custom_browser import CustomBrowser, LAUNCH_PROFILES
+
+DEFAULT_URLS = [
+    "https://example.com",
+    "https://www.wikipedia.org",
+    "https://news.ycombinator.com",
+]
+
+
+async def benchmark_profile(profile: str, urls, runs: int, headless: bool):
+    """Returns (startup times, page load times) in seconds for one profile."""
+    startup_times = []
+    load_times = []
+    for _ in range(runs):
+        browser = CustomBrowser(
+            config=BrowserConfig(headless=headless, new_context_config=BrowserContextConfig()),
+            launch_profile=profile,
+        )
+        start = time.perf_counter()
+        await browser.get_playwright_browser()
+        startup_times.append(time.perf_counter() - start)
+
+        context = await browser.new_context()
+        try:
+            page = await context.get_current_page()
+            for url in urls:
+                start = time.perf_counter()
+                try:
+                    await page.goto(url, wait_until="load", timeout=30000)
+                    load_times.append(time.perf_counter() - start)
+                except Exception as e:
+                    print(f"  ⚠️ {profile}: failed to load {url}: {e}")
+        finally:
+            await context.close()
+            await browser.close()
+    return startup_times, load_times
+
+
+def _fmt(values):
+    if not values:
+        return "n/a"
+    return f"median {statistics.median(values) * 1000:7.0f} ms  (min {min(values) * 1000:.0f}, max {max(values) * 1000:.0f})"
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark CustomBrowser launch profiles")
+    parser.add_argument("--profiles", nargs="+", default=list(LAUNCH_PROFILES), choices=list(LAUNCH_PROFILES))
+    parser.add_argument("--runs", type=int, default=3, help="Browser launches per profile")
+    parser.add_argument("--urls", nargs="+", default=DEFAULT_URLS)
+    parser.add_argument("--headless", action="store_true")
+    args = parser.parse_args()
+
+    results = {}
+    for profile in args.profiles:
+        print(f"🚀 Benchmarking '{profile}' profile ({args.runs} runs, {len(args.urls)} pages each)...")
+        results[profile] = await benchmark_profile(profile, args.urls, args.runs, args.headless)
+
+    print("\n📊 Results")
+    for profile, (startup_times, load_times) in results.items():
+        print(f"{profile:>10}  startup:   {_fmt(startup_times)}")
+        print(f"{'':>10}  page load: {_fmt(load_times)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
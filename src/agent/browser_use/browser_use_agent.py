@@ -3,7 +3,8 @@ from __future__ import annotations
 import asyncio
 import logging
 import os
-from typing import Optional, Any, Dict
+import uuid
+from typing import Optional, Any, Dict, Union
 
 from browser_use import Agent
 from langchain_openai import ChatOpenAI
@@ -11,24 +12,67 @@ from langchain_anthropic import ChatAnthropic
 from langchain_google_genai import ChatGoogleGenerativeAI
 from dotenv import load_dotenv
 
+from src.utils.llm_provider import track_llm_usage
+from src.utils.result_cache import ResultCache, get_result_cache, resolve_cache_ttl, result_cache_key
+
 load_dotenv()
 logger = logging.getLogger(__name__)
 
+AGENT_HISTORY_DIR = "./tmp/agent_history"
+# Seconds a stopped agent gets to finish its step before the run (and its LLM call) is cancelled
+STOP_GRACE_PERIOD = 1.0
+
+
+def task_cache_settings(llm_provider: str, model_name: str, enable_vnc: bool,
+                        browser: Optional[Any] = None) -> Dict[str, Any]:
+    """
+    Settings that change the outcome of a task and are part of its result cache key.
+    Only the browser's configuration is read, so this works before the browser is launched.
+    """
+    browser_config = getattr(browser, "config", None)
+    return {
+        "llm_provider": llm_provider,
+        "model_name": model_name,
+        "vnc": enable_vnc,
+        "headless": getattr(browser_config, "headless", None),
+        "launch_profile": getattr(browser, "launch_profile", None),
+        "allowed_domains": getattr(getattr(browser_config, "new_context_config", None), "allowed_domains", None),
+    }
+
 
 class BrowserUseAgent:
     """Wrapper for browser-use Agent with task queue integration"""
 
-    def __init__(self, llm_provider: str = "openai", model_name: str = "gpt-4o", enable_vnc: bool = False):
+    def __init__(self, llm_provider: str = "openai", model_name: str = "gpt-4o", enable_vnc: bool = False,
+                 llm: Optional[Any] = None, browser: Optional[Any] = None, controller: Optional[Any] = None,
+                 result_cache: Optional[ResultCache] = None, browser_context: Optional[Any] = None,
+                 use_vision: bool = True, track_usage: bool = True):
         self.llm_provider = llm_provider
         self.model_name = model_name  # Use gpt-4o which supports vision
         self.enable_vnc = enable_vnc
         self.vnc_server = None
         self.vnc_info = None
-        self.llm = self._create_llm()
+        # Pre-built LLM, browser and controller (e.g. from the web UI warm-up) are reused instead of created per task
+        self.llm = llm or self._create_llm()
+        # Usage reported by the responses drives the task scheduler's rate limit admission;
+        # callers whose LLM is not the llm_provider/model_name one turn it off
+        if track_usage:
+            track_llm_usage(self.llm, self.llm_provider, self.model_name)
+        self.use_vision = use_vision
+        self.browser = browser
+        # A context owned by the caller; otherwise each task opens its own on `browser`
+        self.browser_context = browser_context
+        self.controller = controller
+        self.result_cache = result_cache
         self.current_agent: Optional[Agent] = None
+        self._run_task: Optional[asyncio.Task] = None
         self.is_running = False
         self.is_paused = False
         self.is_stopped = False
+        # Cleared while paused; the run waits on it before each step. Agent.pause()/resume() are not
+        # used: the Agent waits for resume with a blocking input() and relaunches the browser on resume.
+        self._resume_event = asyncio.Event()
+        self._resume_event.set()
 
     def _create_llm(self):
         """Create LLM instance based on provider"""
@@ -91,6 +135,28 @@ class BrowserUseAgent:
                 self.vnc_server = None
                 self.vnc_info = None
 
+    async def _new_browser_context(self) -> Optional[Any]:
+        """
+        Open a context on the shared browser for one task. Given only a browser, the Agent would
+        build a plain BrowserContext and skip CustomBrowser.new_context() (resource policy, HTTP
+        cache, saved logins).
+        """
+        if self.browser_context is not None or self.browser is None or not hasattr(self.browser, "new_context"):
+            return None
+        return await self.browser.new_context(config=self.browser.config.new_context_config)
+
+    def _agent_kwargs(self, browser_context: Optional[Any] = None) -> Dict[str, Any]:
+        """Shared browser/context/controller for the Agent; the Agent closes neither an injected browser nor context."""
+        kwargs = {"use_vision": self.use_vision}
+        if self.browser is not None:
+            kwargs["browser"] = self.browser
+        browser_context = browser_context or self.browser_context
+        if browser_context is not None:
+            kwargs["browser_context"] = browser_context
+        if self.controller is not None:
+            kwargs["controller"] = self.controller
+        return kwargs
+
     async def _create_vnc_agent(self, task: str):
         """Create browser-use Agent configured for VNC display"""
         from browser_use import Agent
@@ -146,13 +212,49 @@ class BrowserUseAgent:
             logger.error(f"Failed to create VNC agent: {e}")
             raise e
 
-    async def execute_task(self, task: str, max_steps: int = 50) -> dict:
-        """Execute a single task using browser-use Agent"""
+    def _cache_settings(self) -> Dict[str, Any]:
+        """Settings that change the outcome of a task and are part of its result cache key."""
+        return task_cache_settings(self.llm_provider, self.model_name, self.enable_vnc, self.browser)
+
+    def _save_history(self, agent: Agent) -> Optional[str]:
+        """Save the run's history so cached results can point to it."""
+        run_id = str(uuid.uuid4())
+        history_file = os.path.join(AGENT_HISTORY_DIR, run_id, f"{run_id}.json")
+        try:
+            os.makedirs(os.path.dirname(history_file), exist_ok=True)
+            agent.save_history(history_file)
+            return history_file
+        except Exception as e:
+            logger.warning(f"Failed to save agent history: {e}")
+            return None
+
+    async def execute_task(self, task: str, max_steps: int = 50,
+                           cache_ttl: Union[bool, float, None] = None, lookup_cache: bool = True) -> dict:
+        """
+        Execute a single task using browser-use Agent.
+        With `cache_ttl` (seconds, True for RESULT_CACHE_TTL) the task is read-only and repeatable:
+        a successful result is cached for that long and identical tasks return it without running
+        the browser. `lookup_cache=False` skips the lookup (the caller already missed) but still
+        caches the result.
+        """
+        cache = cache_key = None
+        cache_ttl = resolve_cache_ttl(cache_ttl)
+        if cache_ttl:
+            cache = self.result_cache or get_result_cache()
+            cache_key = result_cache_key(task, self._cache_settings())
+        if cache is not None and lookup_cache:
+            cached = await asyncio.to_thread(cache.get, cache_key)
+            if cached is not None:
+                logger.info(f"Returning cached result for task: {task}")
+                return {**cached, "cached": True}
+
+        task_context = None
         try:
             logger.info(f"Starting task execution: {task}")
             self.is_running = True
             self.is_stopped = False
             self.is_paused = False
+            self._resume_event.set()
 
             # Setup VNC if enabled
             await self._setup_vnc_if_enabled()
@@ -176,22 +278,44 @@ class BrowserUseAgent:
             else:
                 logger.info("Creating standard agent (PC browser)")
                 # Create normal agent (opens in PC browser)
+                task_context = await self._new_browser_context()
                 self.current_agent = Agent(
                     task=task,
-                    llm=self.llm
+                    llm=self.llm,
+                    **self._agent_kwargs(task_context)
                 )
 
-            # Execute the task
-            result = await self.current_agent.run(max_steps=max_steps)
+            if self.is_stopped:
+                return self._stopped_result(task)
+
+            # Run in its own task so stop() can cancel an in-flight step or LLM call
+            self._run_task = asyncio.create_task(
+                self.current_agent.run(max_steps=max_steps, on_step_start=self._wait_if_paused)
+            )
+            try:
+                result = await self._run_task
+            except asyncio.CancelledError:
+                if not self.is_stopped:
+                    raise  # execute_task itself was cancelled
+                return self._stopped_result(task)
+            if self.is_stopped:
+                return self._stopped_result(task)
 
             logger.info(f"Task completed successfully: {task}")
-            return {
+            task_result = {
                 "status": "completed",
                 "task": task,
                 "result": str(result),
+                "final_result": result.final_result(),
                 "success": True,
+                # Whether the agent itself reported success, e.g. before keeping its login state
+                "is_successful": result.is_successful(),
                 "vnc_info": self.vnc_info if self.enable_vnc else None
             }
+            if cache is not None and result.is_done() and result.is_successful() is not False:
+                task_result["history_file"] = self._save_history(self.current_agent)
+                await asyncio.to_thread(cache.put, cache_key, task, task_result, cache_ttl)
+            return task_result
 
         except Exception as e:
             logger.error(f"Task execution failed: {e}")
@@ -205,30 +329,62 @@ class BrowserUseAgent:
         finally:
             self.is_running = False
             self.current_agent = None
+            self._run_task = None
+            if task_context is not None:
+                # Only the task's context is closed, the shared browser stays up for the next task
+                try:
+                    await task_context.close()
+                except Exception as e:
+                    logger.warning(f"Failed to close browser context: {e}")
             # Keep VNC running for potential next task
             # await self._cleanup_vnc()
 
+    def _stopped_result(self, task: str) -> dict:
+        logger.info(f"Task stopped: {task}")
+        return {
+            "status": "stopped",
+            "task": task,
+            "success": False,
+            "vnc_info": self.vnc_info if self.enable_vnc else None
+        }
+
+    async def _wait_if_paused(self, agent: Agent):
+        """on_step_start hook: hold the run between steps while the task is paused."""
+        await self._resume_event.wait()
+
     async def pause(self):
-        """Pause current task execution"""
-        if self.current_agent and self.is_running:
-            self.is_paused = True
-            # Note: browser-use Agent doesn't have direct pause/resume
-            # This is a placeholder for future implementation
-            logger.info("Task paused")
+        """Pause current task execution; the Agent finishes its current step and then waits."""
+        self.is_paused = True
+        self._resume_event.clear()
+        logger.info("Task paused")
 
     async def resume(self):
         """Resume paused task execution"""
         if self.is_paused:
             self.is_paused = False
+            self._resume_event.set()
             logger.info("Task resumed")
 
-    async def stop(self):
-        """Stop current task execution"""
-        if self.current_agent and self.is_running:
-            self.is_stopped = True
-            # Note: browser-use Agent doesn't have direct stop method
-            # This is a placeholder for future implementation
-            logger.info("Task stopped")
+    async def stop(self, grace_period: float = STOP_GRACE_PERIOD):
+        """
+        Stop current task execution: the Agent stops after its current step, and if that takes
+        longer than `grace_period` the run is cancelled, aborting the in-flight LLM call. The
+        task's browser context is closed when its run ends either way. A paused run is idle
+        between steps, so it is cancelled right away.
+        """
+        was_paused = self.is_paused
+        self.is_stopped = True
+        self.is_paused = False
+        if self.current_agent:
+            self.current_agent.stop()
+        run_task = self._run_task
+        if run_task and not run_task.done():
+            if not was_paused:
+                await asyncio.wait({run_task}, timeout=grace_period)
+            if not run_task.done():
+                run_task.cancel()
+                await asyncio.wait({run_task})
+        logger.info("Task stopped")
 
     def get_status(self) -> dict:
         """Get current agent status"""
@@ -3,7 +3,9 @@ import json
 import logging
 import os
 import threading
+import time
 import uuid
+from functools import partial
 from pathlib import Path
 from typing import Any, Dict, List, Optional, TypedDict
 
@@ -15,6 +17,7 @@ from langchain_community.tools.file_management import (
 )
 
 # Langchain imports
+from langchain_core.callbacks import AsyncCallbackHandler
 from langchain_core.messages import (
     AIMessage,
     BaseMessage,
@@ -22,6 +25,7 @@ from langchain_core.messages import (
     SystemMessage,
     ToolMessage,
 )
+from langchain_core.outputs import ChatGenerationChunk
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.tools import StructuredTool, Tool
 
@@ -32,7 +36,12 @@ from pydantic import BaseModel, Field
 from browser_use.browser.context import BrowserContextConfig
 
 from src.agent.browser_use.browser_use_agent import BrowserUseAgent
+from src.browser.browser_pool import get_browser_pool
 from src.browser.custom_browser import CustomBrowser
+from src.browser.custom_context import CustomBrowserContext
+from src.browser.resource_policy import ResourcePolicy
+from src.browser.http_cache import get_http_cache
+from src.browser.storage_state_cache import get_storage_state_cache
 from src.controller.custom_controller import CustomController
 from src.utils.mcp_client import setup_mcp_client_and_tools
 
@@ -42,10 +51,102 @@ logger = logging.getLogger(__name__)
 REPORT_FILENAME = "report.md"
 PLAN_FILENAME = "research_plan.md"
 SEARCH_INFO_FILENAME = "search_info.json"
+# Seconds between rewrites of the partial report while the synthesis streams
+REPORT_STREAM_INTERVAL = 0.5
+
+# Browser isolation modes for parallel_browser_search:
+#   "process": every query runs in its own browser process.
+#   "context": queries share one browser process, each in its own BrowserContext.
+#   "tab":     queries share one BrowserContext (cookies, storage), each in its own tab.
+BROWSER_ISOLATION_MODES = ("process", "context", "tab")
+DEFAULT_BROWSER_ISOLATION = os.getenv("BROWSER_ISOLATION", "process")
 
 _AGENT_STOP_FLAGS = {}
 _BROWSER_AGENT_INSTANCES = {}
 
+# Browser settings that affect how Chromium is launched; pooled browsers are keyed on them.
+_BROWSER_LAUNCH_KEYS = (
+    "headless",
+    "disable_security",
+    "browser_binary_path",
+    "user_data_dir",
+    "use_own_browser",
+    "wss_url",
+    "cdp_url",
+    "window_width",
+    "window_height",
+    "launch_profile",
+)
+
+
+def _browser_pool_key(browser_config: Dict[str, Any]) -> str:
+    return json.dumps({key: browser_config.get(key) for key in _BROWSER_LAUNCH_KEYS}, sort_keys=True)
+
+
+def _create_browser(browser_config: Dict[str, Any]) -> CustomBrowser:
+    """Builds a CustomBrowser from the deep research browser_config dict."""
+    headless = browser_config.get("headless", False)
+    window_w = browser_config.get("window_width", 1280)
+    window_h = browser_config.get("window_height", 1100)
+    browser_user_data_dir = browser_config.get("user_data_dir", None)
+    use_own_browser = browser_config.get("use_own_browser", False)
+    browser_binary_path = browser_config.get("browser_binary_path", None)
+    wss_url = browser_config.get("wss_url", None)
+    cdp_url = browser_config.get("cdp_url", None)
+    disable_security = browser_config.get("disable_security", False)
+
+    extra_args = []
+    if use_own_browser:
+        browser_binary_path = os.getenv("BROWSER_PATH", None) or browser_binary_path
+        if browser_binary_path == "":
+            browser_binary_path = None
+        browser_user_data = browser_user_data_dir or os.getenv("BROWSER_USER_DATA", None)
+        if browser_user_data:
+            extra_args += [f"--user-data-dir={browser_user_data}"]
+    else:
+        browser_binary_path = None
+
+    return CustomBrowser(
+        config=BrowserConfig(
+            headless=headless,
+            disable_security=disable_security,
+            browser_binary_path=browser_binary_path,
+            extra_browser_args=extra_args,
+            wss_url=wss_url,
+            cdp_url=cdp_url,
+            new_context_config=BrowserContextConfig(
+                window_width=window_w,
+                window_height=window_h,
+            )
+        ),
+        launch_profile=browser_config.get("launch_profile"),
+    )
+
+
+async def _new_browser_context(bu_browser: CustomBrowser, browser_config: Dict[str, Any]) -> CustomBrowserContext:
+    """Creates a fresh context on `bu_browser` with the deep research browser_config settings."""
+    window_w = browser_config.get("window_width", 1280)
+    window_h = browser_config.get("window_height", 1100)
+
+    context_config = BrowserContextConfig(
+        save_downloads_path="./tmp/downloads",
+        window_height=window_h,
+        window_width=window_w,
+        force_new_context=True,
+    )
+    resource_policy = ResourcePolicy.from_settings(
+        browser_config.get("lean_mode", False), browser_config.get("lean_mode_allowed_domains")
+    )
+    storage_state_cache = get_storage_state_cache() if browser_config.get("reuse_logins", False) else None
+    # Fresh contexts start with an empty browser cache; share static assets across queries and runs
+    http_cache = get_http_cache() if browser_config.get("http_cache", False) else None
+    return await bu_browser.new_context(
+        config=context_config,
+        resource_policy=resource_policy,
+        storage_state_cache=storage_state_cache,
+        http_cache=http_cache,
+    )
+
 
 async def run_single_browser_task(
         task_query: str,
@@ -54,10 +155,15 @@ async def run_single_browser_task(
         browser_config: Dict[str, Any],
         stop_event: threading.Event,
         use_vision: bool = False,
+        browser: Optional[CustomBrowser] = None,
+        browser_context: Optional[CustomBrowserContext] = None,
 ) -> Dict[str, Any]:
     """
-    Runs a single BrowserUseAgent task.
-    Manages browser creation and closing for this specific task.
+    Runs a single BrowserUseAgent task in a fresh context.
+    Uses `browser` when the caller shares one across queries, otherwise leases
+    a browser from the shared pool for the duration of the task.
+    A `browser_context` (e.g. a tab of a shared context) is used instead of a
+    fresh context and is closed when the task ends.
     """
     if not BrowserUseAgent:
         return {
@@ -65,54 +171,21 @@ async def run_single_browser_task(
             "error": "BrowserUseAgent components not available.",
         }
 
-    # --- Browser Setup ---
-    # These should ideally come from the main agent's config
-    headless = browser_config.get("headless", False)
-    window_w = browser_config.get("window_width", 1280)
-    window_h = browser_config.get("window_height", 1100)
-    browser_user_data_dir = browser_config.get("user_data_dir", None)
-    use_own_browser = browser_config.get("use_own_browser", False)
-    browser_binary_path = browser_config.get("browser_binary_path", None)
-    wss_url = browser_config.get("wss_url", None)
-    cdp_url = browser_config.get("cdp_url", None)
-    disable_security = browser_config.get("disable_security", False)
-
-    bu_browser = None
+    bu_browser = browser or (browser_context.browser if browser_context else None)
     bu_browser_context = None
+    task_key = None
+    owns_browser = bu_browser is None
+    browser_pool = get_browser_pool()
     try:
         logger.info(f"Starting browser task for query: {task_query}")
-        extra_args = []
-        if use_own_browser:
-            browser_binary_path = os.getenv("BROWSER_PATH", None) or browser_binary_path
-            if browser_binary_path == "":
-                browser_binary_path = None
-            browser_user_data = browser_user_data_dir or os.getenv("BROWSER_USER_DATA", None)
-            if browser_user_data:
-                extra_args += [f"--user-data-dir={browser_user_data}"]
-        else:
-            browser_binary_path = None
-
-        bu_browser = CustomBrowser(
-            config=BrowserConfig(
-                headless=headless,
-                browser_binary_path=browser_binary_path,
-                extra_browser_args=extra_args,
-                wss_url=wss_url,
-                cdp_url=cdp_url,
-                new_context_config=BrowserContextConfig(
-                    window_width=window_w,
-                    window_height=window_h,
-                )
+        if owns_browser:
+            bu_browser = await browser_pool.checkout(
+                _browser_pool_key(browser_config), partial(_create_browser, browser_config)
             )
-        )
-
-        context_config = BrowserContextConfig(
-            save_downloads_path="./tmp/downloads",
-            window_height=window_h,
-            window_width=window_w,
-            force_new_context=True,
-        )
-        bu_browser_context = await bu_browser.new_context(config=context_config)
+        if browser_context is not None:
+            bu_browser_context = browser_context
+        else:
+            bu_browser_context = await _new_browser_context(bu_browser, browser_config)
 
         # Simple controller example, replace with your actual implementation if needed
         bu_controller = CustomController()
@@ -131,13 +204,13 @@ async def run_single_browser_task(
         """
 
         bu_agent_instance = BrowserUseAgent(
-            task=bu_task_prompt,
             llm=llm,  # Use the passed LLM
             browser=bu_browser,
             browser_context=bu_browser_context,
             controller=bu_controller,
             use_vision=use_vision,
-            source="webui",
+            # The research LLM is not the task queue's provider/model, keep it out of that rate limiter
+            track_usage=False,
         )
 
         # Store instance for potential stop() call
@@ -145,27 +218,26 @@ async def run_single_browser_task(
         _BROWSER_AGENT_INSTANCES[task_key] = bu_agent_instance
 
         # --- Run with Stop Check ---
-        # BrowserUseAgent needs to internally check a stop signal or have a stop method.
-        # We simulate checking before starting and assume `run` might be interruptible
-        # or have its own stop mechanism we can trigger via bu_agent_instance.stop().
+        # stop() on the stored instance stops the run after its current step (or cancels it)
         if stop_event.is_set():
             logger.info(f"Browser task for '{task_query}' cancelled before start.")
             return {"query": task_query, "result": None, "status": "cancelled"}
 
-        # The run needs to be awaitable and ideally accept a stop signal or have a .stop() method
-        # result = await bu_agent_instance.run(max_steps=max_steps) # Add max_steps if applicable
-        # Let's assume a simplified run for now
         logger.info(f"Running BrowserUseAgent for: {task_query}")
-        result = await bu_agent_instance.run()  # Assuming run is the main method
+        result = await bu_agent_instance.execute_task(bu_task_prompt)
         logger.info(f"BrowserUseAgent finished for: {task_query}")
 
-        final_data = result.final_result()
+        final_data = result.get("final_result")
 
-        if stop_event.is_set():
+        if stop_event.is_set() or result.get("status") == "stopped":
             logger.info(f"Browser task for '{task_query}' stopped during execution.")
             return {"query": task_query, "result": final_data, "status": "stopped"}
+        elif not result.get("success"):
+            return {"query": task_query, "error": result.get("error"), "status": "failed"}
         else:
             logger.info(f"Browser result for '{task_query}': {final_data}")
+            if result.get("is_successful"):
+                await bu_browser_context.save_storage_state()
             return {"query": task_query, "result": final_data, "status": "completed"}
 
     except Exception as e:
@@ -181,13 +253,10 @@ async def run_single_browser_task(
                 logger.info("Closed browser context.")
             except Exception as e:
                 logger.error(f"Error closing browser context: {e}")
-        if bu_browser:
-            try:
-                await bu_browser.close()
-                bu_browser = None
-                logger.info("Closed browser.")
-            except Exception as e:
-                logger.error(f"Error closing browser: {e}")
+        if bu_browser and owns_browser:
+            # Return the browser to the pool instead of closing it; the next query reuses it.
+            await browser_pool.checkin(bu_browser)
+            bu_browser = None
 
         if task_key in _BROWSER_AGENT_INSTANCES:
             del _BROWSER_AGENT_INSTANCES[task_key]
@@ -218,8 +287,15 @@ async def _run_browser_search_tool(
         f"[Browser Tool {task_id}] Running search for {len(queries)} queries: {queries}"
     )
 
-    results = []
+    isolation = browser_config.get("browser_isolation") or DEFAULT_BROWSER_ISOLATION
+    if isolation not in BROWSER_ISOLATION_MODES:
+        logger.warning(f"[Browser Tool {task_id}] Unknown browser isolation '{isolation}', using 'process'.")
+        isolation = "process"
+
     semaphore = asyncio.Semaphore(max_parallel_browsers)
+    browser_pool = get_browser_pool()
+    shared_browser = None
+    shared_context = None
 
     async def task_wrapper(query):
         async with semaphore:
@@ -236,10 +312,29 @@ async def _run_browser_search_tool(
                 browser_config,
                 stop_event,
                 # use_vision could be added here if needed
+                browser=shared_browser,
+                browser_context=shared_context.new_tab_context() if shared_context else None,
             )
 
-    tasks = [task_wrapper(query) for query in queries]
-    search_results = await asyncio.gather(*tasks, return_exceptions=True)
+    try:
+        if isolation in ("context", "tab") and len(queries) > 1:
+            # One Chromium process hosts an isolated context (or a tab of one shared context) per query.
+            shared_browser = await browser_pool.checkout(
+                _browser_pool_key(browser_config), partial(_create_browser, browser_config)
+            )
+            if isolation == "tab":
+                shared_context = await _new_browser_context(shared_browser, browser_config)
+        logger.info(f"[Browser Tool {task_id}] Using '{isolation}' browser isolation.")
+        tasks = [task_wrapper(query) for query in queries]
+        search_results = await asyncio.gather(*tasks, return_exceptions=True)
+    finally:
+        if shared_context:
+            try:
+                await shared_context.close()
+            except Exception as e:
+                logger.error(f"[Browser Tool {task_id}] Error closing shared browser context: {e}")
+        if shared_browser:
+            await browser_pool.checkin(shared_browser)
 
     processed_results = []
     for i, res in enumerate(search_results):
@@ -447,13 +542,59 @@ def _save_search_results_to_json(results: List[Dict[str, Any]], output_dir: str)
         logger.error(f"Failed to save search results to {search_file}: {e}")
 
 
-def _save_report_to_md(report: str, output_dir: Path):
+def _visible_report_text(text: str) -> str:
+    """Report text without a reasoning model's <think> block (nothing while it is still thinking)."""
+    if "<think>" not in text:
+        return text
+    return text.split("</think>", 1)[1] if "</think>" in text else ""
+
+
+def _chunk_text(chunk: Any) -> str:
+    content = getattr(chunk, "content", "")
+    if isinstance(content, list):
+        # Anthropic-style content blocks
+        return "".join(block.get("text", "") if isinstance(block, dict) else str(block) for block in content)
+    return content or ""
+
+
+class _ReportStreamWriter(AsyncCallbackHandler):
+    """Rewrites the partial report file every REPORT_STREAM_INTERVAL seconds as tokens arrive."""
+
+    def __init__(self, output_dir: Path):
+        self.output_dir = output_dir
+        self.parts: List[str] = []
+        self.last_write = 0.0
+
+    async def on_llm_new_token(self, token: str, *, chunk: Optional[Any] = None, **kwargs: Any) -> None:
+        self.parts.append(_chunk_text(chunk.message) if isinstance(chunk, ChatGenerationChunk) else token)
+        now = time.monotonic()
+        if now - self.last_write >= REPORT_STREAM_INTERVAL:
+            _save_report_to_md(_visible_report_text("".join(self.parts)), self.output_dir, final=False)
+            self.last_write = now
+
+
+async def _stream_report_to_md(llm: Any, messages: List[Any], output_dir: Path) -> str:
+    """
+    Streams the synthesis answer into the report file as it is generated, so the UI can show
+    the partial report within seconds; returns the complete text.
+    ainvoke(stream=True) streams the tokens to the callbacks and, unlike astream(), looks up and
+    updates the model's response cache. A cached answer arrives in one piece, without tokens.
+    """
+    writer = _ReportStreamWriter(output_dir)
+    message = await llm.ainvoke(messages, config={"callbacks": [writer]}, stream=True)
+    if writer.parts:
+        logger.info(f"Streamed report to {os.path.join(output_dir, REPORT_FILENAME)}")
+    return _visible_report_text(_chunk_text(message))
+
+
+def _save_report_to_md(report: str, output_dir: Path, final: bool = True):
     """Saves the final report to a markdown file."""
     report_file = os.path.join(output_dir, REPORT_FILENAME)
     try:
         with open(report_file, "w", encoding="utf-8") as f:
             f.write(report)
-        logger.info(f"Final report saved to {report_file}")
+        if final:
+            logger.info(f"Final report saved to {report_file}")
     except Exception as e:
         logger.error(f"Failed to save final report to {report_file}: {e}")
 
@@ -751,9 +892,6 @@ async def research_execution_node(state: DeepResearchState) -> Dict[str, Any]:
 
             # After processing all tool calls for this task
             step_failed_tool_execution = any("Error:" in str(tr.content) for tr in tool_results)
-            # Consider a task successful if a browser search was attempted and didn't immediately error out during call
-            # The browser search itself returns status for each query.
-            browser_tool_attempted_successfully = "parallel_browser_search" in executed_tool_names and not step_failed_tool_execution
 
             if step_failed_tool_execution:
                 current_task["status"] = "failed"
@@ -835,7 +973,6 @@ async def synthesis_node(state: DeepResearchState) -> Dict[str, Any]:
     # Format search results nicely, maybe group by query or original plan step
     formatted_results = ""
     references = {}
-    ref_count = 1
     for i, result_entry in enumerate(search_results):
         query = result_entry.get("query", "Unknown Query")  # From parallel_browser_search
         tool_name = result_entry.get("tool_name")  # From other tools
@@ -903,14 +1040,15 @@ async def synthesis_node(state: DeepResearchState) -> Dict[str, Any]:
     )
 
     try:
-        response = await llm.ainvoke(
+        final_report_md = await _stream_report_to_md(
+            llm,
             synthesis_prompt.format_prompt(
                 topic=topic,
                 plan_summary=plan_summary,
                 formatted_results=formatted_results,
-            ).to_messages()
+            ).to_messages(),
+            output_dir,
         )
-        final_report_md = response.content
 
         # Append the reference list automatically to the end of the generated markdown
         if references:
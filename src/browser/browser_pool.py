@@ -0,0 +1,233 @@
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Callable, Dict, List, Optional
+
+from .browser_watchdog import BrowserWatchdog, get_browser_watchdog
+from .custom_browser import CustomBrowser
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "4"))
+DEFAULT_IDLE_TIMEOUT = float(os.getenv("BROWSER_POOL_IDLE_TIMEOUT", "300"))
+
+
+@dataclass
+class _PooledBrowser:
+    key: str
+    browser: CustomBrowser
+    created_at: float = field(default_factory=time.monotonic)
+    last_used: float = field(default_factory=time.monotonic)
+
+
+class BrowserPool:
+    """
+    Process-wide pool of pre-launched CustomBrowser instances.
+
+    Browsers are grouped by a caller supplied key (launch settings), so a
+    checkout only ever returns a browser launched with matching settings.
+    Callers create fresh contexts on the leased browser and close them before
+    checking the browser back in.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_POOL_SIZE, idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+                 watchdog: Optional[BrowserWatchdog] = None):
+        self.max_size = max(1, max_size)
+        self.idle_timeout = idle_timeout
+        self.watchdog = watchdog or get_browser_watchdog()
+        self._idle: Dict[str, List[_PooledBrowser]] = {}
+        self._in_use: Dict[int, _PooledBrowser] = {}
+        self._launching = 0
+        self._condition: Optional[asyncio.Condition] = None
+        self._reaper_task: Optional[asyncio.Task] = None
+        self._closed = False
+
+    @property
+    def size(self) -> int:
+        """Number of browsers owned by the pool (idle, leased and launching)."""
+        return sum(len(entries) for entries in self._idle.values()) + len(self._in_use) + self._launching
+
+    @property
+    def idle_count(self) -> int:
+        return sum(len(entries) for entries in self._idle.values())
+
+    def _get_condition(self) -> asyncio.Condition:
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    @staticmethod
+    async def _is_healthy(browser: CustomBrowser) -> bool:
+        """A pooled browser is healthy if its Playwright connection is still up."""
+        playwright_browser = getattr(browser, "playwright_browser", None)
+        if playwright_browser is None:
+            return False
+        try:
+            return playwright_browser.is_connected()
+        except Exception:
+            return False
+
+    @staticmethod
+    async def _close_browser(entry: _PooledBrowser, reason: str):
+        logger.info(f"Closing pooled browser ({reason}).")
+        try:
+            await entry.browser.close()
+        except Exception as e:
+            logger.error(f"Error closing pooled browser: {e}")
+
+    def _pop_expired(self) -> List[_PooledBrowser]:
+        now = time.monotonic()
+        expired = []
+        for key, entries in list(self._idle.items()):
+            keep = []
+            for entry in entries:
+                if now - entry.last_used > self.idle_timeout:
+                    expired.append(entry)
+                else:
+                    keep.append(entry)
+            if keep:
+                self._idle[key] = keep
+            else:
+                del self._idle[key]
+        return expired
+
+    def _pop_oldest_idle(self) -> Optional[_PooledBrowser]:
+        oldest: Optional[_PooledBrowser] = None
+        for entries in self._idle.values():
+            for entry in entries:
+                if oldest is None or entry.last_used < oldest.last_used:
+                    oldest = entry
+        if oldest:
+            self._idle[oldest.key].remove(oldest)
+            if not self._idle[oldest.key]:
+                del self._idle[oldest.key]
+        return oldest
+
+    async def evict_idle(self):
+        """Close browsers that have been idle for longer than idle_timeout."""
+        for entry in self._pop_expired():
+            await self._close_browser(entry, "idle timeout")
+
+    async def checkout(self, key: str, factory: Callable[[], CustomBrowser]) -> CustomBrowser:
+        """
+        Lease a running browser for `key`, launching one with `factory` if needed.
+        Waits for a checkin when the pool is at max_size.
+        """
+        if self._closed:
+            raise RuntimeError("Browser pool is closed.")
+
+        condition = self._get_condition()
+        await self.evict_idle()
+
+        while True:
+            to_close: Optional[_PooledBrowser] = None
+            async with condition:
+                entries = self._idle.get(key)
+                if entries:
+                    entry = entries.pop()
+                    if not entries:
+                        del self._idle[key]
+                    if await self._is_healthy(entry.browser):
+                        entry.last_used = time.monotonic()
+                        self._in_use[id(entry.browser)] = entry
+                        logger.debug(f"Reusing pooled browser (pool size {self.size}).")
+                        return entry.browser
+                    to_close = entry
+                elif self.size < self.max_size:
+                    self._launching += 1
+                    break
+                else:
+                    # Pool is full; make room by retiring an idle browser launched with other settings.
+                    to_close = self._pop_oldest_idle()
+                    if to_close is None:
+                        await condition.wait()
+                        continue
+            if to_close:
+                await self._close_browser(to_close, "unhealthy" if to_close.key == key else "making room")
+
+        browser = None
+        try:
+            browser = factory()
+            # Launch Chromium now so the lease only pays for a new context.
+            await browser.get_playwright_browser()
+        except Exception:
+            async with condition:
+                self._launching -= 1
+                condition.notify()
+            if browser:
+                await self._close_browser(_PooledBrowser(key=key, browser=browser), "launch failed")
+            raise
+
+        self.watchdog.track(browser)
+        async with condition:
+            self._launching -= 1
+            self._in_use[id(browser)] = _PooledBrowser(key=key, browser=browser)
+        logger.info(f"Launched pooled browser (pool size {self.size}/{self.max_size}).")
+        return browser
+
+    async def checkin(self, browser: CustomBrowser, healthy: bool = True):
+        """Return a leased browser to the pool, closing it if it is no longer usable or due for recycling."""
+        self.watchdog.record_task(browser)
+        recycle_reason = self.watchdog.check(browser)
+        condition = self._get_condition()
+        async with condition:
+            entry = self._in_use.pop(id(browser), None)
+            if entry is None:
+                logger.warning("Checkin of a browser that is not leased from this pool.")
+                return
+            keep = healthy and not recycle_reason and not self._closed and await self._is_healthy(browser)
+            if keep:
+                entry.last_used = time.monotonic()
+                self._idle.setdefault(entry.key, []).append(entry)
+            condition.notify()
+
+        if not keep:
+            if recycle_reason:
+                self.watchdog.record_recycle(browser, recycle_reason)
+                await self._close_browser(entry, f"recycle: {recycle_reason}")
+            else:
+                await self._close_browser(entry, "closed pool" if self._closed else "unhealthy")
+            return
+        self._ensure_reaper()
+
+    @asynccontextmanager
+    async def lease(self, key: str, factory: Callable[[], CustomBrowser]) -> AsyncIterator[CustomBrowser]:
+        browser = await self.checkout(key, factory)
+        try:
+            yield browser
+        finally:
+            await self.checkin(browser)
+
+    def _ensure_reaper(self):
+        if self._reaper_task is None or self._reaper_task.done():
+            self._reaper_task = asyncio.create_task(self._reap_idle_loop())
+
+    async def _reap_idle_loop(self):
+        interval = max(self.idle_timeout / 2, 1.0)
+        while self._idle and not self._closed:
+            await asyncio.sleep(interval)
+            await self.evict_idle()
+
+    async def close(self):
+        """Close all idle browsers; leased browsers are closed on checkin."""
+        self._closed = True
+        if self._reaper_task and not self._reaper_task.done():
+            self._reaper_task.cancel()
+        idle = [entry for entries in self._idle.values() for entry in entries]
+        self._idle.clear()
+        for entry in idle:
+            await self._close_browser(entry, "pool shutdown")
+
+
+_BROWSER_POOL: Optional[BrowserPool] = None
+
+
+def get_browser_pool() -> BrowserPool:
+    """Get the process-wide browser pool, creating it on first use."""
+    global _BROWSER_POOL
+    if _BROWSER_POOL is None or _BROWSER_POOL._closed:
+        _BROWSER_POOL = BrowserPool()
+    return _BROWSER_POOL
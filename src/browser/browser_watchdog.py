@@ -0,0 +1,148 @@
+import logging
+import os
+import time
+import weakref
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+try:
+    import psutil
+except ImportError:  # RSS based recycling is skipped without psutil
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+RECYCLE_MAX_TASKS = int(os.getenv("BROWSER_RECYCLE_MAX_TASKS", "50"))
+RECYCLE_MAX_AGE = float(os.getenv("BROWSER_RECYCLE_MAX_AGE", "3600"))
+RECYCLE_MAX_RSS_MB = float(os.getenv("BROWSER_RECYCLE_MAX_RSS_MB", "2048"))
+
+
+@dataclass
+class _BrowserStats:
+    started_at: float = field(default_factory=time.monotonic)
+    tasks: int = 0
+    pid: Optional[int] = None
+    rss_unavailable_logged: bool = False
+
+
+class BrowserWatchdog:
+    """
+    Tracks long-lived browsers and tells their owner when to recycle them.
+
+    A browser is due for recycling once it has run `max_tasks` tasks, is older
+    than `max_age` seconds or its process tree uses more than `max_rss_mb`.
+    Owners check between tasks, so a running task is never interrupted.
+    A threshold of 0 disables that check.
+    """
+
+    def __init__(self, max_tasks: int = RECYCLE_MAX_TASKS, max_age: float = RECYCLE_MAX_AGE,
+                 max_rss_mb: float = RECYCLE_MAX_RSS_MB):
+        self.max_tasks = max_tasks
+        self.max_age = max_age
+        self.max_rss_mb = max_rss_mb
+        self._stats: "weakref.WeakKeyDictionary[Any, _BrowserStats]" = weakref.WeakKeyDictionary()
+        # Recycle metric: number of recycles per reason
+        self.recycle_counts: Counter = Counter()
+
+    def _get_stats(self, browser: Any) -> _BrowserStats:
+        stats = self._stats.get(browser)
+        if stats is None:
+            stats = _BrowserStats()
+            self._stats[browser] = stats
+        return stats
+
+    def track(self, browser: Any):
+        """Start tracking a freshly launched browser."""
+        self._stats[browser] = _BrowserStats()
+
+    def record_task(self, browser: Any):
+        """Count a finished task against the browser."""
+        self._get_stats(browser).tasks += 1
+
+    def _find_browser_process(self, browser: Any, stats: _BrowserStats):
+        if stats.pid is not None:
+            try:
+                return psutil.Process(stats.pid)
+            except psutil.NoSuchProcess:
+                stats.pid = None
+
+        # The Chromium main process is the one launched with this browser's debugging port
+        port = getattr(browser, "remote_debugging_port", None)
+        if port is None:
+            if getattr(browser, "playwright_browser", None) is not None and not stats.rss_unavailable_logged:
+                # Launched without a port (BROWSER_DEBUGGING_PORT=pipe): its process cannot be found
+                stats.rss_unavailable_logged = True
+                logger.warning("Memory-based browser recycling is disabled for a browser launched without a "
+                               "remote debugging port (BROWSER_DEBUGGING_PORT=pipe); max_tasks/max_age still apply.")
+            return None
+        port_arg = f"--remote-debugging-port={port}"
+        for proc in psutil.Process().children(recursive=True):
+            try:
+                if port_arg in proc.cmdline():
+                    stats.pid = proc.pid
+                    return proc
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        return None
+
+    def get_rss_mb(self, browser: Any) -> Optional[float]:
+        """Resident memory of the browser's whole process tree in MB, None if unknown."""
+        if psutil is None:
+            return None
+        stats = self._get_stats(browser)
+        proc = self._find_browser_process(browser, stats)
+        if proc is None:
+            return None
+        rss = 0
+        try:
+            for member in [proc, *proc.children(recursive=True)]:
+                try:
+                    rss += member.memory_info().rss
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    continue
+        except psutil.NoSuchProcess:
+            stats.pid = None
+            return None
+        return rss / (1024 * 1024)
+
+    def check(self, browser: Any) -> Optional[str]:
+        """Returns the recycle reason ("max_tasks", "max_age" or "max_rss") or None."""
+        if browser is None:
+            return None
+        stats = self._get_stats(browser)
+        if self.max_tasks and stats.tasks >= self.max_tasks:
+            return "max_tasks"
+        if self.max_age and time.monotonic() - stats.started_at >= self.max_age:
+            return "max_age"
+        if self.max_rss_mb:
+            rss_mb = self.get_rss_mb(browser)
+            if rss_mb is not None and rss_mb >= self.max_rss_mb:
+                return "max_rss"
+        return None
+
+    def record_recycle(self, browser: Any, reason: str):
+        """Record a recycle in the metrics and stop tracking the browser."""
+        stats = self._stats.pop(browser, None) or _BrowserStats()
+        self.recycle_counts[reason] += 1
+        logger.info(
+            f"Recycling browser: reason={reason}, tasks={stats.tasks}, "
+            f"age={time.monotonic() - stats.started_at:.0f}s, recycles={dict(self.recycle_counts)}"
+        )
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "tracked_browsers": len(self._stats),
+            "recycles": dict(self.recycle_counts),
+        }
+
+
+_BROWSER_WATCHDOG: Optional[BrowserWatchdog] = None
+
+
+def get_browser_watchdog() -> BrowserWatchdog:
+    """Get the process-wide browser watchdog."""
+    global _BROWSER_WATCHDOG
+    if _BROWSER_WATCHDOG is None:
+        _BROWSER_WATCHDOG = BrowserWatchdog()
+    return _BROWSER_WATCHDOG
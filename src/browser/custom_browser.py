@@ -2,6 +2,8 @@ import asyncio
 import os
 import logging
 import socket
+import threading
+from typing import Optional
 
 from playwright.async_api import Browser as PlaywrightBrowser
 from playwright.async_api import (
@@ -17,6 +19,9 @@ from browser_use import Browser, BrowserConfig
 from browser_use.browser.context import BrowserContext, BrowserContextConfig
 
 from .custom_context import CustomBrowserContext
+from .resource_policy import ResourcePolicy
+from .http_cache import HttpCache
+from .storage_state_cache import StorageStateCache
 
 # Define constants that were previously imported
 IN_DOCKER = os.environ.get('IN_DOCKER', False)
@@ -45,9 +50,83 @@ CHROME_DOCKER_ARGS = [
     '--no-sandbox',
     '--disable-dev-shm-usage',
 ]
+CHROME_THROUGHPUT_ARGS = [
+    '--disable-gpu',
+    '--disable-extensions',
+    '--disable-sync',
+    '--disable-background-networking',
+    '--disable-component-update',
+    '--disable-default-apps',
+    '--disable-domain-reliability',
+    '--disable-client-side-phishing-detection',
+    '--disable-breakpad',
+    '--metrics-recording-only',
+    '--mute-audio',
+    '--no-pings',
+]
+CHROME_DEBUG_ARGS = [
+    '--enable-logging=stderr',
+    '--v=1',
+    '--auto-open-devtools-for-tabs',
+]
+
+# Named launch profiles:
+#   "default":    the regular argument set
+#   "throughput": strip GPU, extensions, sync and background work and use a smaller window
+#   "fidelity":   full rendering with deterministic compositing, for screenshots/vision tasks
+#   "debug":      verbose Chromium logging and DevTools opened in every tab
+LAUNCH_PROFILES = {
+    "default": {"args": [], "window_size": None},
+    "throughput": {"args": CHROME_THROUGHPUT_ARGS, "window_size": {'width': 1280, 'height': 720}},
+    "fidelity": {"args": CHROME_DETERMINISTIC_RENDERING_ARGS, "window_size": None},
+    "debug": {"args": CHROME_DEBUG_ARGS, "window_size": None},
+}
+DEFAULT_LAUNCH_PROFILE = os.getenv("BROWSER_LAUNCH_PROFILE", "default")
 
 logger = logging.getLogger(__name__)
 
+# BROWSER_DEBUGGING_PORT: "auto" picks a free port per browser, a number is used when it
+# is free (otherwise a free port is picked), "pipe" disables the remote debugging port.
+BROWSER_DEBUGGING_PORT = os.getenv("BROWSER_DEBUGGING_PORT", "auto")
+BROWSER_DEBUGGING_HOST = os.getenv("BROWSER_DEBUGGING_HOST", "127.0.0.1")
+
+_reserved_debugging_ports: set[int] = set()
+_debugging_ports_lock = threading.Lock()
+
+
+def _port_is_free(port: int, host: str = BROWSER_DEBUGGING_HOST) -> bool:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        try:
+            s.bind((host, port))
+            return True
+        except OSError:
+            return False
+
+
+def allocate_debugging_port(preferred: Optional[int] = None) -> int:
+    """Reserve a free remote debugging port, trying `preferred` first."""
+    with _debugging_ports_lock:
+        if preferred and preferred not in _reserved_debugging_ports and _port_is_free(preferred):
+            port = preferred
+        else:
+            while True:
+                with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+                    s.bind((BROWSER_DEBUGGING_HOST, 0))
+                    port = s.getsockname()[1]
+                if port not in _reserved_debugging_ports:
+                    break
+        _reserved_debugging_ports.add(port)
+        return port
+
+
+def release_debugging_port(port: Optional[int]):
+    """Release a port reserved with allocate_debugging_port."""
+    if port is None:
+        return
+    with _debugging_ports_lock:
+        _reserved_debugging_ports.discard(port)
+
+
 # Simple utility functions to replace missing imports
 def get_screen_resolution():
     """Get screen resolution - simplified version"""
@@ -58,41 +137,106 @@ def get_window_adjustments():
     return 0, 0
 
 
+class CustomBrowserConfig(BrowserConfig):
+    """BrowserConfig that can also select a launch profile (BrowserConfig drops unknown fields)."""
+    launch_profile: Optional[str] = None
+
+
 class CustomBrowser(Browser):
 
-    async def new_context(self, config: BrowserContextConfig | None = None) -> CustomBrowserContext:
+    def __init__(
+            self,
+            config: BrowserConfig | None = None,
+            resource_policy: Optional[ResourcePolicy] = None,
+            storage_state_cache: Optional[StorageStateCache] = None,
+            launch_profile: Optional[str] = None,
+            http_cache: Optional[HttpCache] = None,
+    ):
+        super().__init__(config=config)
+        # Explicit argument wins over CustomBrowserConfig.launch_profile and BROWSER_LAUNCH_PROFILE
+        self.launch_profile = launch_profile or getattr(self.config, 'launch_profile', None) or DEFAULT_LAUNCH_PROFILE
+        if self.launch_profile not in LAUNCH_PROFILES:
+            logger.warning(f"Unknown launch profile '{self.launch_profile}', using 'default'.")
+            self.launch_profile = "default"
+        # Remote debugging port of the launched browser, None when using pipe transport
+        self.remote_debugging_port: Optional[int] = None
+        # Defaults for contexts created by this browser
+        self.resource_policy = resource_policy
+        self.storage_state_cache = storage_state_cache
+        self.http_cache = http_cache
+
+    async def new_context(
+            self,
+            config: BrowserContextConfig | None = None,
+            resource_policy: Optional[ResourcePolicy] = None,
+            storage_state_cache: Optional[StorageStateCache] = None,
+            http_cache: Optional[HttpCache] = None,
+    ) -> CustomBrowserContext:
         """Create a browser context"""
         # Use the provided config or create a default one
         if config is None:
             config = BrowserContextConfig()
-        return CustomBrowserContext(config=config, browser=self)
+        return CustomBrowserContext(
+            config=config,
+            browser=self,
+            resource_policy=resource_policy or self.resource_policy,
+            storage_state_cache=storage_state_cache or self.storage_state_cache,
+            http_cache=http_cache or self.http_cache,
+        )
 
     async def _setup_builtin_browser(self, playwright: Playwright) -> PlaywrightBrowser:
         """Sets up and returns a Playwright Browser instance with anti-detection measures."""
         # Simplified version that works with current browser_use
 
+        profile = LAUNCH_PROFILES[self.launch_profile]
+
         # Default screen size
-        screen_size = {'width': 1920, 'height': 1080}
+        screen_size = profile["window_size"] or {'width': 1920, 'height': 1080}
         offset_x, offset_y = 0, 0
 
+        # Each browser gets its own debugging port so several can run on one host
+        debugging_args = []
+        if BROWSER_DEBUGGING_PORT.lower() != "pipe":
+            preferred_port = int(BROWSER_DEBUGGING_PORT) if BROWSER_DEBUGGING_PORT.isdigit() else None
+            self.remote_debugging_port = allocate_debugging_port(preferred_port)
+            debugging_args.append(f'--remote-debugging-port={self.remote_debugging_port}')
+            logger.info(f"Launching browser with remote debugging port {self.remote_debugging_port}")
+
         # Basic chrome arguments
         chrome_args = [
-            '--remote-debugging-port=9222',
+            *debugging_args,
             *CHROME_ARGS,
             *(CHROME_DOCKER_ARGS if IN_DOCKER else []),
             *(CHROME_HEADLESS_ARGS if getattr(self.config, 'headless', False) else []),
             *(CHROME_DISABLE_SECURITY_ARGS if getattr(self.config, 'disable_security', False) else []),
+            *(CHROME_DETERMINISTIC_RENDERING_ARGS if getattr(self.config, 'deterministic_rendering', False)
+              and self.launch_profile != "fidelity" else []),
+            *profile["args"],
             f'--window-position={offset_x},{offset_y}',
             f'--window-size={screen_size["width"]},{screen_size["height"]}',
         ]
 
         # Get browser class - default to chromium
         browser_class = getattr(playwright, 'chromium')
-
-        browser = await browser_class.launch(
-            headless=getattr(self.config, 'headless', False),
-            args=chrome_args,
-            handle_sigterm=False,
-            handle_sigint=False,
-        )
+        logger.info(f"Launching browser with '{self.launch_profile}' launch profile")
+
+        try:
+            browser = await browser_class.launch(
+                headless=getattr(self.config, 'headless', False),
+                args=chrome_args,
+                handle_sigterm=False,
+                handle_sigint=False,
+            )
+        except Exception:
+            release_debugging_port(self.remote_debugging_port)
+            self.remote_debugging_port = None
+            raise
         return browser
+
+    async def close(self):
+        """Close the browser and release its remote debugging port."""
+        try:
+            await super().close()
+        finally:
+            release_debugging_port(self.remote_debugging_port)
+            self.remote_debugging_port = None
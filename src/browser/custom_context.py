@@ -1,17 +1,225 @@
+import asyncio
 import logging
+import os
+from typing import List, Optional
 
 from browser_use import Browser
-from browser_use.browser.context import BrowserContext, BrowserContextConfig
+from browser_use.browser.context import BrowserContext, BrowserContextConfig, BrowserSession
+from browser_use.browser.views import BrowserError, TabInfo
+from playwright.async_api import Browser as PlaywrightBrowser
+from playwright.async_api import BrowserContext as PlaywrightBrowserContext
+from playwright.async_api import Page, Response, Route
+from urllib.parse import urlparse
+
+from .http_cache import HttpCache
+from .resource_policy import ResourcePolicy
+from .storage_state_cache import StorageStateCache
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on tabs driven concurrently inside one Playwright context
+MAX_TABS_PER_CONTEXT = int(os.getenv("BROWSER_MAX_TABS_PER_CONTEXT", "4"))
+
 
 class CustomBrowserContext(BrowserContext):
     def __init__(
             self,
             browser: 'Browser',
             config: BrowserContextConfig | None = None,
+            resource_policy: Optional[ResourcePolicy] = None,
+            storage_state_cache: Optional[StorageStateCache] = None,
+            http_cache: Optional[HttpCache] = None,
     ):
         if config is None:
             config = BrowserContextConfig()
         super(CustomBrowserContext, self).__init__(browser=browser, config=config)
+        self.resource_policy = resource_policy
+        self.storage_state_cache = storage_state_cache if storage_state_cache and storage_state_cache.enabled else None
+        self.http_cache = http_cache
+        self.blocked_requests = 0
+        self._tab_slots: Optional[asyncio.Semaphore] = None
+        self._session_lock = asyncio.Lock()
+
+    async def _create_context(self, browser: PlaywrightBrowser) -> PlaywrightBrowserContext:
+        """Creates the Playwright context and installs request routing for the resource policy and HTTP cache."""
+        context = await super()._create_context(browser)
+        if self.resource_policy or self.http_cache:
+            await context.route("**/*", self._route_request)
+        if self.resource_policy:
+            logger.info("Lean page mode enabled: blocking images, media, fonts and trackers.")
+        if self.http_cache:
+            logger.info(f"Shared HTTP cache enabled ({self.http_cache.cache_dir}).")
+        if self.storage_state_cache:
+            try:
+                await self.storage_state_cache.restore(context, getattr(self.config, "allowed_domains", None))
+            except Exception as e:
+                logger.warning(f"Failed to restore cached storage state: {e}")
+            context.on("response", self._on_response)
+        return context
+
+    async def _on_response(self, response: Response):
+        # A login wall on a cached site means the saved session is no longer valid
+        if response.status in (401, 403) and response.request.is_navigation_request():
+            # Deleting the state files is disk IO, keep it off the event loop
+            try:
+                await asyncio.to_thread(self.storage_state_cache.invalidate, urlparse(response.url).hostname or "")
+            except Exception as e:
+                logger.warning(f"Failed to invalidate cached storage state: {e}")
+
+    async def save_storage_state(self):
+        """Saves cookies and localStorage to the storage state cache, call after a successful task."""
+        session = getattr(self, "session", None)
+        if not self.storage_state_cache or not session or not getattr(session, "context", None):
+            return
+        try:
+            await self.storage_state_cache.persist(session.context)
+        except Exception as e:
+            logger.warning(f"Failed to save storage state: {e}")
+
+    async def _route_request(self, route: Route):
+        request = route.request
+        try:
+            if self.resource_policy and self.resource_policy.should_block(request.url, request.resource_type):
+                self.blocked_requests += 1
+                await route.abort("blockedbyclient")
+            elif self.http_cache and self.http_cache.is_cacheable_request(request.method, request.resource_type,
+                                                                        request.headers):
+                try:
+                    await self.http_cache.handle(route)
+                except Exception as e:
+                    # Let the browser load it itself so a cache problem never breaks the page
+                    logger.debug(f"HTTP cache failed for {request.url}: {e}")
+                    await route.continue_()
+            else:
+                await route.continue_()
+        except Exception as e:
+            # The page may have navigated away or closed while the request was in flight
+            logger.debug(f"Failed to route request {request.url}: {e}")
+
+    def new_tab_context(self) -> "TabBrowserContext":
+        """A context for one more agent that works in its own tab of this context."""
+        return TabBrowserContext(parent=self)
+
+    async def get_shared_session(self) -> BrowserSession:
+        """get_session() that is safe to call from several tab contexts at once."""
+        async with self._session_lock:
+            return await self.get_session()
+
+    def get_tab_slots(self) -> asyncio.Semaphore:
+        if self._tab_slots is None:
+            self._tab_slots = asyncio.Semaphore(MAX_TABS_PER_CONTEXT)
+        return self._tab_slots
+
+    async def close(self):
+        if self.blocked_requests:
+            logger.info(f"Lean page mode blocked {self.blocked_requests} requests in this context.")
+        if self.http_cache:
+            logger.info(f"Shared HTTP cache: {self.http_cache.get_metrics()}")
+        await super().close()
+
+
+class TabBrowserContext(CustomBrowserContext):
+    """
+    Drives its own tabs inside the Playwright context of `parent` instead of creating a context.
+
+    Tab contexts of one parent share cookies, storage, request routing and the HTTP cache, and
+    are much cheaper than browsers, which suits read-only research queries. The agent only sees
+    and switches between the tabs it opened; closing it closes those tabs, not the shared context.
+    At most MAX_TABS_PER_CONTEXT tab contexts of a parent hold a session at once, others wait.
+    """
+
+    def __init__(self, parent: CustomBrowserContext):
+        super().__init__(browser=parent.browser, config=parent.config)
+        self.parent = parent
+        self._pages: List[Page] = []
+        self._page: Optional[Page] = None
+        self._holds_slot = False
+
+    async def _initialize_session(self) -> BrowserSession:
+        await self.parent.get_tab_slots().acquire()
+        self._holds_slot = True
+        parent_session = await self.parent.get_shared_session()
+        self.session = BrowserSession(context=parent_session.context, cached_state=None)
+        await self._new_page()
+        return self.session
+
+    def _set_current_page(self, page: Optional[Page]):
+        # browser-use reads the agent/human tab references when it reports state
+        self._page = page
+        self.agent_current_page = page
+        self.human_current_page = page
+
+    async def _new_page(self) -> Page:
+        page = await self.session.context.new_page()
+        page.on("popup", self._on_popup)
+        self._pages.append(page)
+        self._set_current_page(page)
+        return page
+
+    def _on_popup(self, page: Page):
+        # Links opened with target=_blank belong to this agent's tabs
+        page.on("popup", self._on_popup)
+        self._pages.append(page)
+        self._set_current_page(page)
+
+    async def get_current_page(self) -> Page:
+        await self.get_session()
+        if self._page is None or self._page.is_closed():
+            self._pages = [page for page in self._pages if not page.is_closed()]
+            self._set_current_page(self._pages[-1] if self._pages else await self._new_page())
+        return self._page
+
+    async def get_agent_current_page(self) -> Page:
+        return await self.get_current_page()
+
+    async def _get_current_page(self, session: BrowserSession) -> Page:
+        return await self.get_current_page()
+
+    async def get_tabs_info(self) -> list[TabInfo]:
+        await self.get_current_page()
+        return [
+            TabInfo(page_id=page_id, url=page.url, title=await page.title())
+            for page_id, page in enumerate(self._pages)
+        ]
+
+    async def switch_to_tab(self, page_id: int) -> None:
+        await self.get_current_page()
+        if page_id < 0 or page_id >= len(self._pages):
+            raise BrowserError(f"No tab found with page_id: {page_id}")
+        page = self._pages[page_id]
+        if not self._is_url_allowed(page.url):
+            raise BrowserError(f"Cannot switch to tab with non-allowed URL: {page.url}")
+        self._set_current_page(page)
+        await page.wait_for_load_state()
+
+    async def create_new_tab(self, url: str | None = None) -> None:
+        if url and not self._is_url_allowed(url):
+            raise BrowserError(f"Cannot create new tab with non-allowed URL: {url}")
+        await self.get_session()
+        page = await self._new_page()
+        if url:
+            await page.goto(url)
+            await page.wait_for_load_state()
+
+    async def close_current_tab(self):
+        page = await self.get_current_page()
+        self._pages.remove(page)
+        self._set_current_page(self._pages[-1] if self._pages else None)
+        await page.close()
+
+    async def save_storage_state(self):
+        await self.parent.save_storage_state()
+
+    async def close(self):
+        for page in self._pages:
+            try:
+                if not page.is_closed():
+                    await page.close()
+            except Exception as e:
+                logger.debug(f"Failed to close tab: {e}")
+        self._pages = []
+        self._set_current_page(None)
+        self.session = None
+        if self._holds_slot:
+            self._holds_slot = False
+            self.parent.get_tab_slots().release()
@@ -0,0 +1,279 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+HTTP_CACHE_DIR = os.getenv("BROWSER_HTTP_CACHE_DIR", "./tmp/http_cache")
+HTTP_CACHE_MAX_MB = float(os.getenv("BROWSER_HTTP_CACHE_MAX_MB", "512"))
+
+# Static sub-resources that are safe to share between contexts and runs
+CACHEABLE_RESOURCE_TYPES = frozenset({"script", "stylesheet", "font", "image"})
+
+# Hop-by-hop / encoding headers that no longer describe the decoded body we store
+_DROPPED_HEADERS = frozenset({"content-encoding", "content-length", "transfer-encoding", "connection",
+                              "keep-alive", "set-cookie"})
+
+_MAX_AGE_RE = re.compile(r"(?:^|,)\s*(?:s-maxage|max-age)\s*=\s*(\d+)", re.IGNORECASE)
+
+
+@dataclass
+class CacheEntry:
+    url: str
+    status: int
+    headers: Dict[str, str]
+    size: int
+    stored_at: float
+    last_access: float
+    max_age: Optional[float] = None
+
+    @property
+    def etag(self) -> Optional[str]:
+        return self.headers.get("etag")
+
+    @property
+    def last_modified(self) -> Optional[str]:
+        return self.headers.get("last-modified")
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        if self.max_age is None:
+            return False
+        return (now or time.time()) - self.stored_at < self.max_age
+
+
+def parse_max_age(cache_control: str) -> Optional[float]:
+    """Freshness lifetime from a Cache-Control header, None when the response must be revalidated."""
+    cache_control = (cache_control or "").lower()
+    if "no-cache" in cache_control or "must-revalidate" in cache_control:
+        return None
+    if "immutable" in cache_control:
+        return float("inf")
+    match = _MAX_AGE_RE.search(cache_control)
+    return float(match.group(1)) if match else None
+
+
+def is_storable(status: int, headers: Dict[str, str], request_headers: Optional[Dict[str, str]] = None) -> bool:
+    """
+    Whether a response may be stored in the shared cache. Entries are shared across contexts
+    and runs, some of them logged in, so per-user responses (private, or requested with
+    Authorization) are never stored; entries are keyed on the URL alone, so a response that
+    varies on anything but Accept-Encoding (the stored body is decoded) is not stored either.
+    """
+    if status != 200:
+        return False
+    cache_control = headers.get("cache-control", "").lower()
+    if "no-store" in cache_control or "private" in cache_control:
+        return False
+    if "authorization" in {name.lower() for name in (request_headers or {})}:
+        return False
+    vary = {field.strip().lower() for field in headers.get("vary", "").split(",") if field.strip()}
+    return vary <= {"accept-encoding"}
+
+
+class HttpCache:
+    """
+    Shared on-disk cache for static sub-resources, used from CustomBrowserContext request routing.
+
+    Every fresh context (and every run) starts with an empty Chromium cache, so the same JS/CSS
+    bundles are downloaded again for each query. This cache keys responses by URL; fresh entries
+    (Cache-Control max-age/immutable) are served without touching the network and stale ones are
+    revalidated with If-None-Match / If-Modified-Since, a 304 is answered from disk. The total
+    size is capped at `max_bytes`, least recently used entries are evicted first.
+    """
+
+    def __init__(self, cache_dir: str = HTTP_CACHE_DIR, max_bytes: int = int(HTTP_CACHE_MAX_MB * 1024 * 1024)):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._index: Dict[str, CacheEntry] = {}
+        self._total_bytes = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._load_index()
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def _meta_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _body_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.body")
+
+    def _load_index(self):
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".json"):
+                continue
+            key = name[:-len(".json")]
+            try:
+                with open(self._meta_path(key), "r", encoding="utf-8") as f:
+                    entry = CacheEntry(**json.load(f))
+                if not os.path.exists(self._body_path(key)):
+                    raise FileNotFoundError(self._body_path(key))
+            except (OSError, TypeError, ValueError) as e:
+                logger.debug(f"Dropping unreadable HTTP cache entry {name}: {e}")
+                self._remove_files(key)
+                continue
+            self._index[key] = entry
+            self._total_bytes += entry.size
+
+    def _remove_files(self, key: str):
+        for path in (self._meta_path(key), self._body_path(key)):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def _write_meta(self, key: str, entry: CacheEntry):
+        tmp_path = f"{self._meta_path(key)}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(asdict(entry), f)
+        os.replace(tmp_path, self._meta_path(key))
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def lookup(self, url: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._index.get(self._key(url))
+            if entry:
+                entry.last_access = time.time()
+            return entry
+
+    def read_body(self, url: str) -> Optional[bytes]:
+        try:
+            with open(self._body_path(self._key(url)), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def store(self, url: str, status: int, headers: Dict[str, str], body: bytes):
+        """Stores a response, evicting least recently used entries to stay under max_bytes."""
+        if len(body) > self.max_bytes:
+            return
+        key = self._key(url)
+        now = time.time()
+        headers = {name.lower(): value for name, value in headers.items() if name.lower() not in _DROPPED_HEADERS}
+        entry = CacheEntry(url=url, status=status, headers=headers, size=len(body), stored_at=now, last_access=now,
+                           max_age=parse_max_age(headers.get("cache-control", "")))
+        with self._lock:
+            old = self._index.pop(key, None)
+            if old:
+                self._total_bytes -= old.size
+            tmp_path = f"{self._body_path(key)}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(body)
+            os.replace(tmp_path, self._body_path(key))
+            self._write_meta(key, entry)
+            self._index[key] = entry
+            self._total_bytes += entry.size
+            self._evict()
+
+    def refresh(self, url: str, headers: Dict[str, str]):
+        """Marks an entry as revalidated (304) and picks up updated caching headers."""
+        key = self._key(url)
+        with self._lock:
+            entry = self._index.get(key)
+            if not entry:
+                return
+            for name in ("cache-control", "etag", "last-modified", "expires"):
+                if name in headers:
+                    entry.headers[name] = headers[name]
+            entry.max_age = parse_max_age(entry.headers.get("cache-control", ""))
+            entry.stored_at = entry.last_access = time.time()
+            self._write_meta(key, entry)
+
+    def _evict(self):
+        if self._total_bytes <= self.max_bytes:
+            return
+        for key, entry in sorted(self._index.items(), key=lambda item: item[1].last_access):
+            if self._total_bytes <= self.max_bytes:
+                break
+            del self._index[key]
+            self._total_bytes -= entry.size
+            self._remove_files(key)
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._index):
+                self._remove_files(key)
+            self._index.clear()
+            self._total_bytes = 0
+
+    @staticmethod
+    def is_cacheable_request(method: str, resource_type: str, headers: Optional[Dict[str, str]] = None) -> bool:
+        """Static GETs only; a request carrying Authorization is per-user and goes to the network."""
+        if "authorization" in {name.lower() for name in (headers or {})}:
+            return False
+        return method == "GET" and resource_type in CACHEABLE_RESOURCE_TYPES
+
+    async def handle(self, route):
+        """Answers a routed Playwright request from the cache, revalidating or fetching as needed."""
+        request = route.request
+        url = request.url
+        entry = self.lookup(url)
+
+        if entry and entry.is_fresh():
+            body = await asyncio.to_thread(self.read_body, url)
+            if body is not None:
+                self.hits += 1
+                await route.fulfill(status=entry.status, headers=entry.headers, body=body)
+                return
+
+        headers = dict(request.headers)
+        if entry and entry.etag:
+            headers["if-none-match"] = entry.etag
+        if entry and entry.last_modified:
+            headers["if-modified-since"] = entry.last_modified
+
+        response = await route.fetch(headers=headers)
+        if response.status == 304 and entry:
+            body = await asyncio.to_thread(self.read_body, url)
+            if body is not None:
+                self.revalidated += 1
+                await asyncio.to_thread(self.refresh, url, response.headers)
+                await route.fulfill(status=entry.status, headers=entry.headers, body=body)
+                return
+            # Body vanished from disk (evicted by another context), fetch it unconditionally
+            response = await route.fetch()
+
+        self.misses += 1
+        body = await response.body()
+        # all_headers() also has the headers the browser adds itself (HTTP auth), unlike request.headers
+        if is_storable(response.status, response.headers, await request.all_headers()):
+            await asyncio.to_thread(self.store, url, response.status, response.headers, body)
+        await route.fulfill(response=response, body=body)
+
+    def get_metrics(self) -> Dict[str, float]:
+        return {
+            "entries": len(self),
+            "size_mb": round(self._total_bytes / (1024 * 1024), 2),
+            "hits": self.hits,
+            "revalidated": self.revalidated,
+            "misses": self.misses,
+        }
+
+
+_HTTP_CACHE: Optional[HttpCache] = None
+
+
+def get_http_cache() -> HttpCache:
+    """Get the process-wide HTTP cache shared by all browser contexts."""
+    global _HTTP_CACHE
+    if _HTTP_CACHE is None:
+        _HTTP_CACHE = HttpCache()
+    return _HTTP_CACHE
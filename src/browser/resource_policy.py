@@ -0,0 +1,89 @@
+import logging
+from dataclasses import dataclass, field
+from typing import FrozenSet, Iterable, Optional, Union
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+# Playwright resource types the agent does not need when it is not looking at pixels
+LEAN_BLOCKED_RESOURCE_TYPES = frozenset({"image", "media", "font"})
+
+# Well known ad and tracker hosts; subdomains are matched as well
+TRACKER_HOSTS = frozenset({
+    "2mdn.net",
+    "adnxs.com",
+    "adsrvr.org",
+    "adservice.google.com",
+    "amazon-adsystem.com",
+    "bat.bing.com",
+    "casalemedia.com",
+    "chartbeat.com",
+    "criteo.com",
+    "criteo.net",
+    "connect.facebook.net",
+    "doubleclick.net",
+    "doubleverify.com",
+    "google-analytics.com",
+    "googleadservices.com",
+    "googlesyndication.com",
+    "googletagmanager.com",
+    "googletagservices.com",
+    "hotjar.com",
+    "mc.yandex.ru",
+    "mixpanel.com",
+    "moatads.com",
+    "nr-data.net",
+    "openx.net",
+    "outbrain.com",
+    "pubmatic.com",
+    "quantserve.com",
+    "rubiconproject.com",
+    "scorecardresearch.com",
+    "segment.io",
+    "taboola.com",
+})
+
+
+def _host_matches(host: str, domains: Iterable[str]) -> bool:
+    return any(host == domain or host.endswith(f".{domain}") for domain in domains)
+
+
+def parse_domain_list(domains: Union[str, Iterable[str], None]) -> FrozenSet[str]:
+    """Accepts a comma/whitespace separated string or an iterable of domains."""
+    if not domains:
+        return frozenset()
+    if isinstance(domains, str):
+        domains = domains.replace(",", " ").split()
+    return frozenset(domain.strip().lower().lstrip(".") for domain in domains if domain.strip())
+
+
+@dataclass(frozen=True)
+class ResourcePolicy:
+    """
+    Decides which requests a CustomBrowserContext aborts.
+
+    Requests to hosts in `allowed_domains` are never blocked, so a site that
+    needs its images or fonts to work can be exempted.
+    """
+
+    blocked_resource_types: FrozenSet[str] = LEAN_BLOCKED_RESOURCE_TYPES
+    blocked_hosts: FrozenSet[str] = TRACKER_HOSTS
+    allowed_domains: FrozenSet[str] = field(default_factory=frozenset)
+
+    @classmethod
+    def lean(cls, allowed_domains: Union[str, Iterable[str], None] = None) -> "ResourcePolicy":
+        return cls(allowed_domains=parse_domain_list(allowed_domains))
+
+    @classmethod
+    def from_settings(cls, lean_mode: bool,
+                      allowed_domains: Union[str, Iterable[str], None] = None) -> Optional["ResourcePolicy"]:
+        """Builds the policy from UI / browser_config settings, None when lean mode is off."""
+        return cls.lean(allowed_domains) if lean_mode else None
+
+    def should_block(self, url: str, resource_type: str) -> bool:
+        host = (urlparse(url).hostname or "").lower()
+        if not host or _host_matches(host, self.allowed_domains):
+            return False
+        if resource_type in self.blocked_resource_types:
+            return True
+        return _host_matches(host, self.blocked_hosts)
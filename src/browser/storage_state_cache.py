@@ -0,0 +1,180 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+from playwright.async_api import BrowserContext as PlaywrightBrowserContext
+
+try:
+    from cryptography.fernet import Fernet, InvalidToken
+except ImportError:  # the cache stays disabled without cryptography
+    Fernet = None
+    InvalidToken = Exception
+
+logger = logging.getLogger(__name__)
+
+STORAGE_STATE_DIR = os.getenv("BROWSER_STORAGE_STATE_DIR", "./tmp/storage_state")
+STORAGE_STATE_TTL = float(os.getenv("BROWSER_STORAGE_STATE_TTL", "86400"))
+
+# Seeds localStorage for the page's origin before any page script runs; existing keys are left alone.
+_LOCAL_STORAGE_INIT_SCRIPT = """
+(() => {
+    const origins = %s;
+    const items = origins[window.location.origin];
+    if (!items) return;
+    try {
+        for (const item of items) {
+            if (window.localStorage.getItem(item.name) === null) {
+                window.localStorage.setItem(item.name, item.value);
+            }
+        }
+    } catch (e) {}
+})();
+"""
+
+
+def _normalize_domain(host: str) -> str:
+    host = (host or "").lower().lstrip(".")
+    return host[4:] if host.startswith("www.") else host
+
+
+def _domain_matches(host: str, domain: str) -> bool:
+    return host == domain or host.endswith(f".{domain}") or domain.endswith(f".{host}")
+
+
+class StorageStateCache:
+    """
+    Encrypted-at-rest cache of Playwright storage_state (cookies and localStorage), one file per domain.
+
+    State is saved after a successful task and restored into new contexts so the agent does not
+    have to log in again. Entries expire after `ttl` seconds and are dropped when a site answers
+    a navigation with 401/403. Encryption uses Fernet with the key from BROWSER_STORAGE_STATE_KEY;
+    without a key (or without the cryptography package) the cache is disabled.
+    """
+
+    def __init__(self, cache_dir: str = STORAGE_STATE_DIR, ttl: float = STORAGE_STATE_TTL,
+                 key: Optional[str] = None):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        key = key or os.getenv("BROWSER_STORAGE_STATE_KEY", "")
+        self._fernet = None
+        if Fernet is None:
+            logger.warning("cryptography is not installed, storage state cache disabled.")
+        elif not key:
+            logger.warning("BROWSER_STORAGE_STATE_KEY is not set, storage state cache disabled.")
+        else:
+            self._fernet = Fernet(key.encode() if isinstance(key, str) else key)
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    @property
+    def enabled(self) -> bool:
+        return self._fernet is not None
+
+    def _path(self, domain: str) -> str:
+        return os.path.join(self.cache_dir, f"{hashlib.sha256(domain.encode()).hexdigest()[:32]}.state")
+
+    def _write(self, domain: str, entry: Dict[str, Any]):
+        path = self._path(domain)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(self._fernet.encrypt(json.dumps(entry).encode("utf-8")))
+        os.chmod(tmp_path, 0o600)
+        os.replace(tmp_path, path)
+
+    def _read_all(self) -> List[Dict[str, Any]]:
+        entries = []
+        now = time.time()
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".state"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                with open(path, "rb") as f:
+                    entry = json.loads(self._fernet.decrypt(f.read()))
+            except (OSError, InvalidToken, ValueError) as e:
+                logger.warning(f"Dropping unreadable storage state file {path}: {e}")
+                os.remove(path)
+                continue
+            if now - entry.get("saved_at", 0) > self.ttl:
+                os.remove(path)
+                continue
+            entries.append(entry)
+        return entries
+
+    def save(self, storage_state: Dict[str, Any]):
+        """Splits a Playwright storage_state by domain and stores each part."""
+        if not self.enabled:
+            return
+        by_domain: Dict[str, Dict[str, list]] = {}
+        for cookie in storage_state.get("cookies", []):
+            domain = _normalize_domain(cookie.get("domain", ""))
+            if domain:
+                by_domain.setdefault(domain, {"cookies": [], "origins": []})["cookies"].append(cookie)
+        for origin in storage_state.get("origins", []):
+            domain = _normalize_domain(urlparse(origin.get("origin", "")).hostname or "")
+            if domain and origin.get("localStorage"):
+                by_domain.setdefault(domain, {"cookies": [], "origins": []})["origins"].append(origin)
+
+        saved_at = time.time()
+        for domain, state in by_domain.items():
+            self._write(domain, {"domain": domain, "saved_at": saved_at, **state})
+        logger.info(f"Saved storage state for {len(by_domain)} domains.")
+
+    def load(self, domains: Optional[Iterable[str]] = None) -> Dict[str, list]:
+        """Returns the merged, unexpired storage_state, optionally limited to `domains`."""
+        state = {"cookies": [], "origins": []}
+        if not self.enabled:
+            return state
+        wanted = [_normalize_domain(domain) for domain in domains] if domains else None
+        for entry in self._read_all():
+            if wanted is not None and not any(_domain_matches(domain, entry["domain"]) for domain in wanted):
+                continue
+            state["cookies"].extend(entry.get("cookies", []))
+            state["origins"].extend(entry.get("origins", []))
+        return state
+
+    def invalidate(self, host: str):
+        """Drops cached state for `host` and its parent/child domains."""
+        if not self.enabled:
+            return
+        host = _normalize_domain(host)
+        for entry in self._read_all():
+            if _domain_matches(host, entry["domain"]):
+                os.remove(self._path(entry["domain"]))
+                logger.info(f"Invalidated cached storage state for {entry['domain']}.")
+
+    async def restore(self, context: PlaywrightBrowserContext, domains: Optional[Iterable[str]] = None):
+        """Loads cached cookies and localStorage into a freshly created context."""
+        if not self.enabled:
+            return
+        state = await asyncio.to_thread(self.load, domains)
+        if state["cookies"]:
+            await context.add_cookies(state["cookies"])
+        if state["origins"]:
+            origins = {origin["origin"]: origin["localStorage"] for origin in state["origins"]}
+            await context.add_init_script(_LOCAL_STORAGE_INIT_SCRIPT % json.dumps(origins))
+        logger.info(
+            f"Restored {len(state['cookies'])} cookies and {len(state['origins'])} localStorage origins."
+        )
+
+    async def persist(self, context: PlaywrightBrowserContext):
+        """Saves the context's current cookies and localStorage."""
+        if not self.enabled:
+            return
+        storage_state = await context.storage_state()
+        await asyncio.to_thread(self.save, storage_state)
+
+
+_STORAGE_STATE_CACHE: Optional[StorageStateCache] = None
+
+
+def get_storage_state_cache() -> StorageStateCache:
+    """Get the process-wide storage state cache."""
+    global _STORAGE_STATE_CACHE
+    if _STORAGE_STATE_CACHE is None:
+        _STORAGE_STATE_CACHE = StorageStateCache()
+    return _STORAGE_STATE_CACHE
@@ -0,0 +1,210 @@
+"""
+Headless command line entry point for running tasks without the web UI.
+
+Usage:
+    python -m src.cli run-batch tasks.jsonl --concurrency 8 [--output results.jsonl] [--resume]
+
+Each input line is a JSON object with a "task" (or "description") and optionally "id",
+"max_steps" and "cache_ttl" (seconds, or true for RESULT_CACHE_TTL); a plain string line is
+taken as the task itself. Results are appended to the output JSONL as tasks finish, tagged
+with the input line number, so a run can be resumed with --resume (skip lines already in the
+output) or --offset N.
+"""
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from typing import Any, Dict, Iterator, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def read_tasks(path: str, offset: int = 0, skip_lines: Optional[Set[int]] = None) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Stream (line number, task dict) from a JSONL file, starting at line `offset`."""
+    skip_lines = skip_lines or set()
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f):
+            if line_no < offset or line_no in skip_lines:
+                continue
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                task = json.loads(line)
+            except json.JSONDecodeError:
+                task = line
+            if isinstance(task, str):
+                task = {"task": task}
+            if not isinstance(task, dict) or not (task.get("task") or task.get("description")):
+                logger.warning(f"Skipping line {line_no}: no task")
+                continue
+            yield line_no, task
+
+
+def completed_lines(output_path: str) -> Set[int]:
+    """Input line numbers that already have a result in the output file."""
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                done.add(json.loads(line)["line"])
+            except (ValueError, KeyError, TypeError):
+                continue
+    return done
+
+
+async def _create_controller():
+    from src.controller.custom_controller import CustomController
+
+    controller = CustomController()
+    mcp_config_path = os.getenv("MCP_SERVER_CONFIG", "")
+    if mcp_config_path and os.path.exists(mcp_config_path):
+        with open(mcp_config_path, "r") as f:
+            await controller.setup_mcp_client(json.load(f))
+    return controller
+
+
+def _create_browser(args):
+    from browser_use.browser.browser import BrowserConfig
+    from browser_use.browser.context import BrowserContextConfig
+    from src.browser.custom_browser import CustomBrowser
+    from src.browser.http_cache import get_http_cache
+    from src.browser.resource_policy import ResourcePolicy
+
+    return CustomBrowser(
+        config=BrowserConfig(
+            headless=not args.headed,
+            new_context_config=BrowserContextConfig(window_width=1280, window_height=1100),
+        ),
+        resource_policy=ResourcePolicy.from_settings(args.lean_mode, None),
+        launch_profile=args.launch_profile,
+        http_cache=get_http_cache() if args.http_cache else None,
+    )
+
+
+def _create_llm(llm_provider: str, model_name: str):
+    """The tasks' LLM, built and memoized like the web UI's (shared HTTP pool, response cache)."""
+    from src.utils import config
+    from src.utils.llm_provider import get_llm_model
+
+    if llm_provider not in config.model_names:
+        raise ValueError(f"Unsupported LLM provider '{llm_provider}', use one of: {', '.join(config.model_names)}")
+    return get_llm_model(llm_provider, model_name=model_name)
+
+
+async def run_batch(args) -> int:
+    """Run every task of args.input with at most args.concurrency at a time; returns the number of failures."""
+    from src.agent.browser_use.browser_use_agent import BrowserUseAgent
+
+    output_path = args.output or f"{os.path.splitext(args.input)[0]}.results.jsonl"
+    skip_lines = completed_lines(output_path) if args.resume else set()
+    if skip_lines:
+        print(f"Resuming: {len(skip_lines)} tasks already in {output_path}")
+
+    llm_provider = args.llm_provider or os.getenv("TASK_LLM_PROVIDER", "openai")
+    model_name = args.model_name or os.getenv("TASK_LLM_MODEL", "gpt-4o")
+    # One LLM client, controller and browser for all tasks; every agent gets its own browser context
+    llm = _create_llm(llm_provider, model_name)
+    controller = await _create_controller()
+    browser = _create_browser(args)
+    try:
+        # Launch once up front: get_playwright_browser() is not locked, so concurrent
+        # first contexts would each launch (and leak) their own Chromium
+        await browser.get_playwright_browser()
+    except Exception:
+        await browser.close()
+        await controller.close_mcp_client()
+        raise
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+    running = set()
+    stats = {"completed": 0, "failed": 0}
+    start = time.monotonic()
+
+    with open(output_path, "a", encoding="utf-8") as output:
+        async def run_one(line_no: int, task: Dict[str, Any]):
+            description = task.get("task") or task.get("description")
+            task_start = time.monotonic()
+            context = None
+            try:
+                # The agent's own context, so --lean-mode and --http-cache apply to it
+                context = await browser.new_context(config=browser.config.new_context_config)
+                agent = BrowserUseAgent(llm_provider=llm_provider, model_name=model_name, llm=llm,
+                                        browser=browser, browser_context=context, controller=controller)
+                result = await agent.execute_task(description, max_steps=task.get("max_steps", args.max_steps),
+                                                  cache_ttl=task.get("cache_ttl"))
+            except Exception as e:
+                result = {"status": "failed", "task": description, "error": str(e), "success": False}
+            finally:
+                if context is not None:
+                    try:
+                        await context.close()
+                    except Exception as e:
+                        logger.warning(f"Failed to close browser context: {e}")
+                semaphore.release()
+            record = {"line": line_no, "id": task.get("id"), **result,
+                      "duration": round(time.monotonic() - task_start, 2)}
+            output.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+            output.flush()
+            stats["completed" if result.get("success") else "failed"] += 1
+            done = stats["completed"] + stats["failed"]
+            print(f"[{done}] line {line_no}: {result.get('status')} ({record['duration']}s)")
+
+        try:
+            # Tasks are read lazily, so only `concurrency` of them are in memory at a time
+            for line_no, task in read_tasks(args.input, args.offset, skip_lines):
+                await semaphore.acquire()
+                job = asyncio.create_task(run_one(line_no, task))
+                running.add(job)
+                job.add_done_callback(running.discard)
+            if running:
+                await asyncio.gather(*running)
+        finally:
+            await browser.close()
+            await controller.close_mcp_client()
+
+    print(f"Done in {time.monotonic() - start:.1f}s: {stats['completed']} completed, "
+          f"{stats['failed']} failed, results in {output_path}")
+    return stats["failed"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m src.cli", description="AUTONOBOT headless runner")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    batch = subparsers.add_parser("run-batch", help="Run the tasks of a JSONL file")
+    batch.add_argument("input", help="JSONL file with one task per line")
+    batch.add_argument("--concurrency", type=int, default=4, help="Tasks that run at the same time")
+    batch.add_argument("--output", help="Results JSONL (default: <input>.results.jsonl)")
+    batch.add_argument("--offset", type=int, default=0, help="Skip the first N input lines")
+    batch.add_argument("--resume", action="store_true", help="Skip input lines that already have a result")
+    batch.add_argument("--max-steps", type=int, default=20, help="Default max agent steps per task")
+    batch.add_argument("--llm-provider", help="LLM provider (default: TASK_LLM_PROVIDER)")
+    batch.add_argument("--model-name", help="LLM model (default: TASK_LLM_MODEL)")
+    batch.add_argument("--launch-profile", help="Browser launch profile (default: BROWSER_LAUNCH_PROFILE)")
+    batch.add_argument("--lean-mode", action="store_true", help="Block images, media, fonts and trackers")
+    batch.add_argument("--http-cache", action="store_true", help="Use the shared on-disk HTTP cache")
+    batch.add_argument("--headed", action="store_true", help="Show the browser window")
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    if args.command == "run-batch":
+        try:
+            failures = asyncio.run(run_batch(args))
+        except ValueError as e:
+            parser.error(str(e))
+        sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import logging
+import os
+import threading
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+LLM_HTTP_MAX_CONNECTIONS = int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "100"))
+LLM_HTTP_MAX_KEEPALIVE = int(os.getenv("LLM_HTTP_MAX_KEEPALIVE", "20"))
+LLM_HTTP_KEEPALIVE_EXPIRY = float(os.getenv("LLM_HTTP_KEEPALIVE_EXPIRY", "60"))
+# HTTP/2 needs the 'h2' package (in requirements.txt); without it the clients fall back to HTTP/1.1
+LLM_HTTP2 = os.getenv("LLM_HTTP2", "false").lower() in ("true", "1", "yes")
+
+try:
+    import h2  # noqa: F401  (httpx needs it for HTTP/2)
+except ImportError:
+    h2 = None
+
+_SYNC_CLIENTS: Dict[str, httpx.Client] = {}
+_ASYNC_CLIENTS: Dict[str, httpx.AsyncClient] = {}
+_LOCK = threading.Lock()
+_HTTP2_FALLBACK_LOGGED = False
+
+
+def endpoint_key(base_url: Optional[str]) -> str:
+    """scheme://host:port of a base URL; clients of one endpoint share a pool."""
+    parsed = urlparse(base_url or "")
+    if not parsed.hostname:
+        return ""
+    port = parsed.port or (443 if parsed.scheme == "https" else 80)
+    return f"{parsed.scheme}://{parsed.hostname}:{port}"
+
+
+def _client_options() -> dict:
+    global _HTTP2_FALLBACK_LOGGED
+    http2 = LLM_HTTP2 and h2 is not None
+    if LLM_HTTP2 and h2 is None and not _HTTP2_FALLBACK_LOGGED:
+        _HTTP2_FALLBACK_LOGGED = True
+        logger.warning("LLM_HTTP2 is set but the 'h2' package is missing (pip install httpx[http2]), "
+                       "LLM clients use HTTP/1.1.")
+    return {
+        "http2": http2,
+        "limits": httpx.Limits(
+            max_connections=LLM_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=LLM_HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=LLM_HTTP_KEEPALIVE_EXPIRY,
+        ),
+        # The LLM SDKs pass their own per-request timeouts
+        "timeout": httpx.Timeout(600.0, connect=10.0),
+        "follow_redirects": True,
+    }
+
+
+def get_http_client(base_url: Optional[str]) -> httpx.Client:
+    """Process-wide synchronous httpx client (connection pool) for the endpoint of `base_url`."""
+    key = endpoint_key(base_url)
+    with _LOCK:
+        if key not in _SYNC_CLIENTS:
+            _SYNC_CLIENTS[key] = httpx.Client(**_client_options())
+        return _SYNC_CLIENTS[key]
+
+
+def get_async_http_client(base_url: Optional[str]) -> httpx.AsyncClient:
+    """
+    Process-wide async httpx client for the endpoint of `base_url`. With HTTP/2 concurrent
+    requests are multiplexed over one connection instead of a TLS session each.
+    """
+    key = endpoint_key(base_url)
+    with _LOCK:
+        if key not in _ASYNC_CLIENTS:
+            _ASYNC_CLIENTS[key] = httpx.AsyncClient(**_client_options())
+        return _ASYNC_CLIENTS[key]
+
+
+async def close_http_clients():
+    """Close every pooled client (on shutdown)."""
+    with _LOCK:
+        sync_clients, async_clients = list(_SYNC_CLIENTS.values()), list(_ASYNC_CLIENTS.values())
+        _SYNC_CLIENTS.clear()
+        _ASYNC_CLIENTS.clear()
+    for client in sync_clients:
+        client.close()
+    for client in async_clients:
+        await client.aclose()
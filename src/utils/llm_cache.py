@@ -0,0 +1,145 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.load import dumps, loads
+
+logger = logging.getLogger(__name__)
+
+# off: no caching, deterministic: only temperature 0 models, all: every model built by get_llm_model
+LLM_CACHE_MODE = os.getenv("LLM_CACHE", "off").lower()
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "./tmp/llm_cache.db")
+LLM_CACHE_MAX_MB = float(os.getenv("LLM_CACHE_MAX_MB", "256"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access);
+"""
+
+
+def should_cache(temperature: Optional[float], mode: str = LLM_CACHE_MODE) -> bool:
+    """Whether a model with `temperature` gets the response cache in `mode`."""
+    if mode == "all":
+        return True
+    if mode == "deterministic":
+        return not temperature
+    return False
+
+
+class SQLiteLRUCache(BaseCache):
+    """
+    LangChain response cache in SQLite with exact-match keys and size-based LRU eviction.
+
+    LangChain builds the lookup from the serialized message list and the model's parameters
+    (model name, temperature, bound tools/schemas...), so a hit means the very same request was
+    answered before; re-running a research topic or a regression suite replays those answers
+    without calling the provider. Once the stored answers exceed `max_bytes` the least recently
+    used ones are evicted.
+    """
+
+    def __init__(self, db_path: str = LLM_CACHE_PATH, max_bytes: int = int(LLM_CACHE_MAX_MB * 1024 * 1024)):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    @staticmethod
+    def _key(prompt: str, llm_string: str) -> str:
+        return hashlib.sha256(f"{llm_string}\n{prompt}".encode("utf-8")).hexdigest()
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        key = self._key(prompt, llm_string)
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT value FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+        try:
+            generations = loads(row[0])
+        except Exception as e:
+            logger.warning(f"Dropping unreadable LLM cache entry: {e}")
+            self._delete(key)
+            return None
+        self.hits += 1
+        return generations
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        key = self._key(prompt, llm_string)
+        value = dumps(list(return_val))
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock, self._conn:
+            old = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, value, size, time.time()),
+            )
+            self._total_bytes += size - (old[0] if old else 0)
+            self._evict()
+
+    def _evict(self):
+        while self._total_bytes > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT key, size FROM responses ORDER BY last_access, rowid LIMIT 64"
+            ).fetchall()
+            if not rows:
+                self._total_bytes = 0
+                return
+            for key, size in rows:
+                if self._total_bytes <= self.max_bytes:
+                    break
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._total_bytes -= size
+
+    def _delete(self, key: str):
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            if row:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._total_bytes -= row[0]
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+            self._total_bytes = 0
+
+    def get_metrics(self) -> Dict[str, float]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return {
+            "entries": entries,
+            "size_mb": round(self._total_bytes / (1024 * 1024), 2),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+_LLM_CACHE: Optional[SQLiteLRUCache] = None
+
+
+def get_llm_response_cache() -> SQLiteLRUCache:
+    """Get the process-wide LLM response cache."""
+    global _LLM_CACHE
+    if _LLM_CACHE is None:
+        _LLM_CACHE = SQLiteLRUCache()
+    return _LLM_CACHE
@@ -1,16 +1,23 @@
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 import pdb
 from langchain_openai import ChatOpenAI
+from langchain_core.callbacks import AsyncCallbackManager, BaseCallbackHandler, CallbackManager
 from langchain_core.globals import get_llm_cache
 from langchain_core.language_models.base import (
     BaseLanguageModel,
     LangSmithParams,
     LanguageModelInput,
 )
+import functools
+import hashlib
+import json
 import os
+import threading
+from collections import OrderedDict
 from langchain_core.load import dumpd, dumps
 from langchain_core.messages import (
     AIMessage,
+    AIMessageChunk,
     SystemMessage,
     AnyMessage,
     BaseMessage,
@@ -28,12 +35,14 @@ from langchain_core.outputs import (
 )
 from langchain_ollama import ChatOllama
 from langchain_core.output_parsers.base import OutputParserLike
-from langchain_core.runnables import Runnable, RunnableConfig
+from langchain_core.runnables import Runnable, RunnableConfig, ensure_config
 from langchain_core.tools import BaseTool
 
 from typing import (
     TYPE_CHECKING,
     Any,
+    AsyncIterator,
+    Dict,
     Callable,
     Literal,
     Optional,
@@ -47,45 +56,135 @@ from langchain_ollama import ChatOllama
 from langchain_openai import AzureChatOpenAI, ChatOpenAI
 from langchain_ibm import ChatWatsonx
 from langchain_aws import ChatBedrock
-from pydantic import SecretStr
+from pydantic import PrivateAttr, SecretStr
 
 from src.utils import config
+from src.utils.http_pool import get_async_http_client, get_http_client
+from src.utils.llm_cache import get_llm_response_cache, should_cache
+from src.utils.rate_limiter import ProviderRateLimiter, get_rate_limiter
+
+
+_ASYNC_OPENAI_CLIENTS: Dict[tuple, AsyncOpenAI] = {}
+
+
+def get_async_openai_client(base_url: Optional[str], api_key: Optional[str]) -> AsyncOpenAI:
+    """AsyncOpenAI client shared by all models of one endpoint, so its keep-alive connections are reused."""
+    key = (base_url, api_key)
+    if key not in _ASYNC_OPENAI_CLIENTS:
+        _ASYNC_OPENAI_CLIENTS[key] = AsyncOpenAI(base_url=base_url, api_key=api_key,
+                                                 http_client=get_async_http_client(base_url))
+    return _ASYNC_OPENAI_CLIENTS[key]
+
+
+def _to_openai_messages(input: LanguageModelInput) -> List[Dict[str, Any]]:
+    message_history = []
+    for input_ in input:
+        if isinstance(input_, SystemMessage):
+            message_history.append({"role": "system", "content": input_.content})
+        elif isinstance(input_, AIMessage):
+            message_history.append({"role": "assistant", "content": input_.content})
+        else:
+            message_history.append({"role": "user", "content": input_.content})
+    return message_history
 
 
 class DeepSeekR1ChatOpenAI(ChatOpenAI):
+    # Raw SDK clients for the reasoning_content field; ChatOpenAI's own client/async_client
+    # (chat.completions resources) stay as they are for the inherited methods
+    _openai_client: Any = PrivateAttr(default=None)
+    _async_openai_client: Any = PrivateAttr(default=None)
 
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         super().__init__(*args, **kwargs)
-        self.client = OpenAI(
+        self._openai_client = OpenAI(
             base_url=kwargs.get("base_url"),
-            api_key=kwargs.get("api_key")
+            api_key=kwargs.get("api_key"),
+            http_client=get_http_client(kwargs.get("base_url")),
         )
+        # Async calls must not block the event loop: 30-120s reasoning calls would stall the UI and other agents
+        self._async_openai_client = get_async_openai_client(kwargs.get("base_url"), kwargs.get("api_key"))
 
-    async def ainvoke(
+    def _callback_args(self, config: RunnableConfig, stop: Optional[list[str]], **kwargs: Any) -> tuple:
+        """configure() arguments and on_chat_model_start() kwargs, the way BaseChatModel runs its callbacks."""
+        configure_args = (config.get("callbacks"), self.callbacks, self.verbose, config.get("tags"), self.tags,
+                          config.get("metadata"), self.metadata)
+        start_kwargs = {
+            "invocation_params": self._get_invocation_params(stop=stop, **kwargs),
+            "options": {"stop": stop, **kwargs},
+            "name": config.get("run_name"),
+            "run_id": config.pop("run_id", None),
+            "batch_size": 1,
+        }
+        return configure_args, start_kwargs
+
+    async def astream(
             self,
             input: LanguageModelInput,
             config: Optional[RunnableConfig] = None,
             *,
             stop: Optional[list[str]] = None,
             **kwargs: Any,
-    ) -> AIMessage:
-        message_history = []
-        for input_ in input:
-            if isinstance(input_, SystemMessage):
-                message_history.append({"role": "system", "content": input_.content})
-            elif isinstance(input_, AIMessage):
-                message_history.append({"role": "assistant", "content": input_.content})
-            else:
-                message_history.append({"role": "user", "content": input_.content})
-
-        response = self.client.chat.completions.create(
-            model=self.model_name,
-            messages=message_history
+    ) -> AsyncIterator[AIMessageChunk]:
+        """Streams the answer; reasoning tokens are in additional_kwargs["reasoning_content"]."""
+        config = ensure_config(config)
+        messages = self._convert_input(input).to_messages()
+        configure_args, start_kwargs = self._callback_args(config, stop, **kwargs)
+        (run_manager,) = await AsyncCallbackManager.configure(*configure_args).on_chat_model_start(
+            self._serialized, [messages], **start_kwargs
         )
 
-        reasoning_content = response.choices[0].message.reasoning_content
-        content = response.choices[0].message.content
-        return AIMessage(content=content, reasoning_content=reasoning_content)
+        stream = None
+        generation: Optional[ChatGenerationChunk] = None
+        token_usage = None
+        try:
+            stream = await self._async_openai_client.chat.completions.create(
+                model=self.model_name,
+                messages=_to_openai_messages(messages),
+                stop=stop,
+                stream=True,
+                # The last chunk reports the usage, which the callbacks pass on to the rate limiter
+                stream_options={"include_usage": True},
+            )
+            async for chunk in stream:
+                if chunk.usage:
+                    token_usage = chunk.usage.model_dump()
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta
+                reasoning_content = getattr(delta, "reasoning_content", None)
+                message_chunk = AIMessageChunk(
+                    content=delta.content or "",
+                    additional_kwargs={"reasoning_content": reasoning_content} if reasoning_content else {},
+                )
+                generation_chunk = ChatGenerationChunk(message=message_chunk)
+                await run_manager.on_llm_new_token(message_chunk.content, chunk=generation_chunk)
+                generation = generation_chunk if generation is None else generation + generation_chunk
+                yield message_chunk
+        except BaseException as e:
+            await run_manager.on_llm_error(e, response=LLMResult(generations=[[generation]] if generation else []))
+            raise
+        finally:
+            # On cancellation this closes the HTTP response, so the provider stops generating
+            if stream is not None:
+                await stream.close()
+
+        await run_manager.on_llm_end(LLMResult(generations=[[generation]] if generation else [],
+                                               llm_output={"token_usage": token_usage or {}}))
+
+    async def ainvoke(
+            self,
+            input: LanguageModelInput,
+            config: Optional[RunnableConfig] = None,
+            *,
+            stop: Optional[list[str]] = None,
+            **kwargs: Any,
+    ) -> AIMessage:
+        content = []
+        reasoning_content = []
+        async for chunk in self.astream(input, config, stop=stop, **kwargs):
+            content.append(chunk.content)
+            reasoning_content.append(chunk.additional_kwargs.get("reasoning_content", ""))
+        return AIMessage(content="".join(content), reasoning_content="".join(reasoning_content))
 
     def invoke(
             self,
@@ -95,23 +194,29 @@ class DeepSeekR1ChatOpenAI(ChatOpenAI):
             stop: Optional[list[str]] = None,
             **kwargs: Any,
     ) -> AIMessage:
-        message_history = []
-        for input_ in input:
-            if isinstance(input_, SystemMessage):
-                message_history.append({"role": "system", "content": input_.content})
-            elif isinstance(input_, AIMessage):
-                message_history.append({"role": "assistant", "content": input_.content})
-            else:
-                message_history.append({"role": "user", "content": input_.content})
-
-        response = self.client.chat.completions.create(
-            model=self.model_name,
-            messages=message_history
+        config = ensure_config(config)
+        messages = self._convert_input(input).to_messages()
+        configure_args, start_kwargs = self._callback_args(config, stop, **kwargs)
+        (run_manager,) = CallbackManager.configure(*configure_args).on_chat_model_start(
+            self._serialized, [messages], **start_kwargs
         )
+        try:
+            response = self._openai_client.chat.completions.create(
+                model=self.model_name,
+                messages=_to_openai_messages(messages),
+                stop=stop,
+            )
+        except BaseException as e:
+            run_manager.on_llm_error(e, response=LLMResult(generations=[]))
+            raise
 
         reasoning_content = response.choices[0].message.reasoning_content
         content = response.choices[0].message.content
-        return AIMessage(content=content, reasoning_content=reasoning_content)
+        message = AIMessage(content=content, reasoning_content=reasoning_content)
+        token_usage = response.usage.model_dump() if response.usage else {}
+        run_manager.on_llm_end(LLMResult(generations=[[ChatGeneration(message=message)]],
+                                         llm_output={"token_usage": token_usage}))
+        return message
 
 
 class DeepSeekR1ChatOllama(ChatOllama):
@@ -124,7 +229,8 @@ class DeepSeekR1ChatOllama(ChatOllama):
             stop: Optional[list[str]] = None,
             **kwargs: Any,
     ) -> AIMessage:
-        org_ai_message = await super().ainvoke(input=input)
+        # Through the regular ainvoke, so the callbacks (and the rate limiter) see the usage
+        org_ai_message = await super().ainvoke(input=input, config=config, stop=stop, **kwargs)
         org_content = org_ai_message.content
         reasoning_content = org_content.split("</think>")[0].replace("<think>", "")
         content = org_content.split("</think>")[1]
@@ -149,9 +255,127 @@ class DeepSeekR1ChatOllama(ChatOllama):
         return AIMessage(content=content, reasoning_content=reasoning_content)
 
 
+class RateLimitCallbackHandler(BaseCallbackHandler):
+    """Feeds the requests and token usage reported in LLM responses to a provider rate limiter."""
+
+    def __init__(self, limiter: ProviderRateLimiter):
+        self.limiter = limiter
+
+    @staticmethod
+    def total_tokens(response: LLMResult) -> int:
+        usage = (response.llm_output or {}).get("token_usage") or (response.llm_output or {}).get("usage") or {}
+        tokens = usage.get("total_tokens") or (usage.get("input_tokens", 0) + usage.get("output_tokens", 0))
+        if tokens:
+            return tokens
+        for generations in response.generations:
+            for generation in generations:
+                usage_metadata = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if usage_metadata:
+                    tokens += usage_metadata.get("total_tokens", 0)
+        return tokens
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        self.limiter.record(self.total_tokens(response))
+
+
+def track_llm_usage(llm: BaseLanguageModel, provider: str, model_name: str) -> BaseLanguageModel:
+    """Attach a RateLimitCallbackHandler for provider/model to `llm` (once) and return it."""
+    callbacks = llm.callbacks
+    if callbacks is not None and not isinstance(callbacks, list):
+        # A callback manager was configured explicitly, leave it alone
+        return llm
+    if not any(isinstance(callback, RateLimitCallbackHandler) for callback in callbacks or []):
+        llm.callbacks = [*(callbacks or []), RateLimitCallbackHandler(get_rate_limiter(provider, model_name))]
+    return llm
+
+
+def _shared_http_clients(base_url: Optional[str]) -> Dict[str, Any]:
+    """http_client/http_async_client arguments of OpenAI-compatible models: the endpoint's shared pool."""
+    return {
+        "http_client": get_http_client(base_url),
+        "http_async_client": get_async_http_client(base_url),
+    }
+
+
+def _use_shared_http_pool(llm: ChatAnthropic, base_url: str, api_key: Optional[str]) -> ChatAnthropic:
+    """ChatAnthropic has no http_client option, so give it SDK clients built on the endpoint's shared pool."""
+    import anthropic
+
+    # Same retries, timeout and headers ChatAnthropic would give its own clients
+    params = {
+        "api_key": api_key,
+        "base_url": base_url,
+        "max_retries": llm.max_retries,
+        "default_headers": llm.default_headers or None,
+    }
+    # A timeout <= 0 means "not set", None means no timeout
+    if llm.default_request_timeout is None or llm.default_request_timeout > 0:
+        params["timeout"] = llm.default_request_timeout
+    clients = {
+        "_client": anthropic.Client(**params, http_client=get_http_client(base_url)),
+        "_async_client": anthropic.AsyncClient(**params, http_client=get_async_http_client(base_url)),
+    }
+    for name, client in clients.items():
+        if isinstance(getattr(type(llm), name, None), functools.cached_property):
+            llm.__dict__[name] = client  # pre-fill the lazily created client
+        else:
+            setattr(llm, name, client)
+    return llm
+
+
+# Built clients kept for reuse; each holds an HTTP connection pool that stays warm between tasks
+LLM_CLIENT_CACHE_SIZE = int(os.getenv("LLM_CLIENT_CACHE_SIZE", "16"))
+_LLM_MODELS: "OrderedDict[str, BaseLanguageModel]" = OrderedDict()
+_LLM_MODELS_LOCK = threading.Lock()
+
+
+def _llm_model_key(provider: str, **kwargs) -> str:
+    """Provider, model, base URL, a hash of the API key and the remaining params."""
+    api_key = kwargs.pop("api_key", None) or os.getenv(f"{provider.upper()}_API_KEY", "")
+    params = {
+        "provider": provider,
+        "model_name": kwargs.pop("model_name", None),
+        "base_url": kwargs.pop("base_url", None),
+        "api_key": hashlib.sha256(str(api_key).encode("utf-8")).hexdigest()[:16] if api_key else None,
+        "params": kwargs,
+    }
+    return json.dumps(params, sort_keys=True, default=str)
+
+
+def clear_llm_model_cache(provider: Optional[str] = None):
+    """Drop cached LLM clients (of one provider), e.g. after API keys or endpoints changed."""
+    with _LLM_MODELS_LOCK:
+        for key in list(_LLM_MODELS):
+            if provider is None or json.loads(key)["provider"] == provider:
+                del _LLM_MODELS[key]
+
+
 def get_llm_model(provider: str, **kwargs):
     """
-    Get LLM model
+    Get LLM model, reusing the client built earlier for the same settings
+    :param provider: LLM provider
+    :param kwargs:
+    :return:
+    """
+    key = _llm_model_key(provider, **kwargs)
+    with _LLM_MODELS_LOCK:
+        if key in _LLM_MODELS:
+            _LLM_MODELS.move_to_end(key)
+            return _LLM_MODELS[key]
+    llm = _create_llm_model(provider, **kwargs)
+    # Opt-in response replay (LLM_CACHE=deterministic|all), exact match on messages and model params
+    if should_cache(kwargs.get("temperature", 0.0)):
+        llm.cache = get_llm_response_cache()
+    with _LLM_MODELS_LOCK:
+        _LLM_MODELS[key] = llm
+        while len(_LLM_MODELS) > LLM_CLIENT_CACHE_SIZE:
+            _LLM_MODELS.popitem(last=False)
+    return llm
+
+
+def _create_llm_model(provider: str, **kwargs):
+    """
+    Build a new LLM client
     :param provider: LLM provider
     :param kwargs:
     :return:
@@ -171,12 +395,13 @@ def get_llm_model(provider: str, **kwargs):
         else:
             base_url = kwargs.get("base_url")
 
-        return ChatAnthropic(
+        llm = ChatAnthropic(
             model=kwargs.get("model_name", "claude-3-5-sonnet-20241022"),
             temperature=kwargs.get("temperature", 0.0),
             base_url=base_url,
             api_key=api_key,
         )
+        return _use_shared_http_pool(llm, base_url, api_key)
     elif provider == 'mistral':
         if not kwargs.get("base_url", ""):
             base_url = os.getenv("MISTRAL_ENDPOINT", "https://api.mistral.ai/v1")
@@ -204,6 +429,7 @@ def get_llm_model(provider: str, **kwargs):
             temperature=kwargs.get("temperature", 0.0),
             base_url=base_url,
             api_key=api_key,
+            **_shared_http_clients(base_url),
         )
     elif provider == "grok":
         if not kwargs.get("base_url", ""):
@@ -216,6 +442,7 @@ def get_llm_model(provider: str, **kwargs):
             temperature=kwargs.get("temperature", 0.0),
             base_url=base_url,
             api_key=api_key,
+            **_shared_http_clients(base_url),
         )
     elif provider == "deepseek":
         if not kwargs.get("base_url", ""):
@@ -229,6 +456,7 @@ def get_llm_model(provider: str, **kwargs):
                 temperature=kwargs.get("temperature", 0.0),
                 base_url=base_url,
                 api_key=api_key,
+                **_shared_http_clients(base_url),
             )
         else:
             return ChatOpenAI(
@@ -236,6 +464,7 @@ def get_llm_model(provider: str, **kwargs):
                 temperature=kwargs.get("temperature", 0.0),
                 base_url=base_url,
                 api_key=api_key,
+                **_shared_http_clients(base_url),
             )
     elif provider == "google":
         return ChatGoogleGenerativeAI(
@@ -288,6 +517,7 @@ def get_llm_model(provider: str, **kwargs):
             temperature=kwargs.get("temperature", 0.0),
             base_url=base_url,
             api_key=api_key,
+            **_shared_http_clients(base_url),
         )
     elif provider == "ibm":
         parameters = {
@@ -312,6 +542,7 @@ def get_llm_model(provider: str, **kwargs):
             temperature=kwargs.get("temperature", 0.0),
             base_url=os.getenv("MOONSHOT_ENDPOINT"),
             api_key=os.getenv("MOONSHOT_API_KEY"),
+            **_shared_http_clients(os.getenv("MOONSHOT_ENDPOINT")),
         )
     elif provider == "unbound":
         return ChatOpenAI(
@@ -319,6 +550,7 @@ def get_llm_model(provider: str, **kwargs):
             temperature=kwargs.get("temperature", 0.0),
             base_url=os.getenv("UNBOUND_ENDPOINT", "https://api.getunbound.ai"),
             api_key=api_key,
+            **_shared_http_clients(os.getenv("UNBOUND_ENDPOINT", "https://api.getunbound.ai")),
         )
     elif provider == "siliconflow":
         if not kwargs.get("api_key", ""):
@@ -334,6 +566,7 @@ def get_llm_model(provider: str, **kwargs):
             base_url=base_url,
             model_name=kwargs.get("model_name", "Qwen/QwQ-32B"),
             temperature=kwargs.get("temperature", 0.0),
+            **_shared_http_clients(base_url),
         )
     elif provider == "modelscope":
         if not kwargs.get("api_key", ""):
@@ -349,6 +582,7 @@ def get_llm_model(provider: str, **kwargs):
             base_url=base_url,
             model_name=kwargs.get("model_name", "Qwen/QwQ-32B"),
             temperature=kwargs.get("temperature", 0.0),
+            **_shared_http_clients(base_url),
         )
     else:
         raise ValueError(f"Unsupported provider: {provider}")
@@ -0,0 +1,110 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Default requests and tokens per minute for every provider/model (0 = unlimited)
+LLM_RPM_LIMIT = int(os.getenv("LLM_RPM_LIMIT", "0"))
+LLM_TPM_LIMIT = int(os.getenv("LLM_TPM_LIMIT", "0"))
+RATE_LIMIT_WINDOW = 60.0
+
+
+def parse_rate_limits(value: str) -> Dict[str, Tuple[int, int]]:
+    """
+    Parses "openai:gpt-4o=500/300000,anthropic=50/40000" into (rpm, tpm) per "provider:model"
+    or per provider; a limit of 0 means unlimited.
+    """
+    limits = {}
+    for part in (value or "").replace(";", ",").split(","):
+        if "=" not in part:
+            continue
+        key, limit = part.split("=", 1)
+        try:
+            rpm, tpm = (limit.split("/", 1) + ["0"])[:2]
+            limits[key.strip()] = (int(rpm or 0), int(tpm or 0))
+        except ValueError:
+            logger.warning(f"Ignoring invalid LLM rate limit: {part}")
+    return limits
+
+
+LLM_RATE_LIMITS = parse_rate_limits(os.getenv("LLM_RATE_LIMITS", ""))
+
+
+class ProviderRateLimiter:
+    """
+    Sliding one-minute window of the requests and tokens sent to one provider/model.
+
+    LLM callbacks `record()` every response with the usage the provider reported; the task
+    processor calls `admit()` before starting a task, which waits until the window leaves room
+    for one more task, estimated as the average usage of the tasks already running. Starting
+    tasks beyond the quota would only turn into 429 retries that slow every task down.
+    """
+
+    def __init__(self, rpm: int = 0, tpm: int = 0, window: float = RATE_LIMIT_WINDOW):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.window = window
+        self.running = 0
+        self._events: Deque[Tuple[float, int]] = deque()
+        self._lock = threading.Lock()  # callbacks may run in executor threads
+
+    @property
+    def limited(self) -> bool:
+        return bool(self.rpm or self.tpm)
+
+    def record(self, tokens: int = 0, now: Optional[float] = None):
+        """Record one LLM request and the tokens it used."""
+        with self._lock:
+            self._events.append((now or time.monotonic(), tokens))
+
+    def usage(self, now: Optional[float] = None) -> Tuple[int, int]:
+        """(requests, tokens) in the current window."""
+        now = now or time.monotonic()
+        with self._lock:
+            while self._events and self._events[0][0] <= now - self.window:
+                self._events.popleft()
+            return len(self._events), sum(tokens for _, tokens in self._events)
+
+    def has_headroom(self, now: Optional[float] = None) -> bool:
+        """Whether one more task fits in the quota next to the running ones."""
+        if not self.limited:
+            return True
+        requests, tokens = self.usage(now)
+        task_requests = requests / self.running if self.running else 0
+        task_tokens = tokens / self.running if self.running else 0
+        if self.rpm and requests + task_requests >= self.rpm:
+            return False
+        if self.tpm and tokens + task_tokens >= self.tpm:
+            return False
+        return True
+
+    async def admit(self, poll_interval: float = 1.0):
+        """Wait until there is headroom for a new task and count it as running; pair with release()."""
+        while not self.has_headroom():
+            await asyncio.sleep(poll_interval)
+        self.running += 1
+
+    def release(self):
+        self.running = max(0, self.running - 1)
+
+    def get_metrics(self) -> Dict[str, int]:
+        requests, tokens = self.usage()
+        return {"rpm": requests, "tpm": tokens, "rpm_limit": self.rpm, "tpm_limit": self.tpm,
+                "running": self.running}
+
+
+_RATE_LIMITERS: Dict[str, ProviderRateLimiter] = {}
+
+
+def get_rate_limiter(provider: str, model_name: str = "") -> ProviderRateLimiter:
+    """Get the process-wide limiter of a provider/model, limits from LLM_RATE_LIMITS or LLM_RPM/TPM_LIMIT."""
+    key = f"{provider}:{model_name}"
+    if key not in _RATE_LIMITERS:
+        rpm, tpm = LLM_RATE_LIMITS.get(key) or LLM_RATE_LIMITS.get(provider) or (LLM_RPM_LIMIT, LLM_TPM_LIMIT)
+        _RATE_LIMITERS[key] = ProviderRateLimiter(rpm=rpm, tpm=tpm)
+    return _RATE_LIMITERS[key]
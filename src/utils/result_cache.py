@@ -0,0 +1,128 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Union
+
+from src.utils.task_queue import normalize_task_description
+
+logger = logging.getLogger(__name__)
+
+RESULT_CACHE_PATH = os.getenv("RESULT_CACHE_PATH", "./tmp/result_cache.db")
+RESULT_CACHE_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "1000"))
+RESULT_CACHE_TTL = float(os.getenv("RESULT_CACHE_TTL", "300"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    task TEXT NOT NULL,
+    result TEXT NOT NULL,
+    stored_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_last_access ON results (last_access);
+"""
+
+
+def result_cache_key(task: str, settings: Optional[Dict[str, Any]] = None) -> str:
+    """Key of a task result: normalized task text plus the model and browser settings it ran with."""
+    payload = json.dumps({"task": normalize_task_description(task), "settings": settings or {}},
+                         sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def resolve_cache_ttl(cache_ttl: Union[bool, float, None]) -> Optional[float]:
+    """TTL in seconds of a task's `cache_ttl` option: True means RESULT_CACHE_TTL, a false value no caching."""
+    if cache_ttl is True:
+        return RESULT_CACHE_TTL
+    return float(cache_ttl) if cache_ttl else None
+
+
+class ResultCache:
+    """
+    SQLite cache of task results with a TTL per entry and LRU eviction.
+
+    Meant for read-only lookups ("current price of X") that are repeated many times an hour:
+    a hit returns the previous result in milliseconds instead of running the browser again.
+    Tasks opt in by passing a TTL; results of failed runs are never stored.
+    """
+
+    def __init__(self, db_path: str = RESULT_CACHE_PATH, max_entries: int = RESULT_CACHE_MAX_ENTRIES):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Cached result for `key`, None when missing or expired."""
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT result, stored_at, expires_at FROM results WHERE key = ?",
+                                     (key,)).fetchone()
+            if row is None or row[2] <= now:
+                if row is not None:
+                    self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE results SET last_access = ? WHERE key = ?", (now, key))
+        self.hits += 1
+        result = json.loads(row[0])
+        result["cached_at"] = row[1]
+        return result
+
+    def put(self, key: str, task: str, result: Dict[str, Any], ttl: float = RESULT_CACHE_TTL):
+        """Store a result for `ttl` seconds, evicting the least recently used entries over max_entries."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (key, task, result, stored_at, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, task, json.dumps(result, default=str), now, now + ttl, now),
+            )
+            self._conn.execute("DELETE FROM results WHERE expires_at <= ?", (now,))
+            self._conn.execute(
+                "DELETE FROM results WHERE key NOT IN "
+                "(SELECT key FROM results ORDER BY last_access DESC LIMIT ?)",
+                (self.max_entries,),
+            )
+
+    def invalidate(self, key: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM results")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def get_metrics(self) -> Dict[str, int]:
+        return {"entries": len(self), "hits": self.hits, "misses": self.misses}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_RESULT_CACHE: Optional[ResultCache] = None
+
+
+def get_result_cache() -> ResultCache:
+    """Get the process-wide task result cache."""
+    global _RESULT_CACHE
+    if _RESULT_CACHE is None:
+        _RESULT_CACHE = ResultCache()
+    return _RESULT_CACHE
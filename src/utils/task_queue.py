@@ -0,0 +1,176 @@
+import asyncio
+import hashlib
+import heapq
+import itertools
+import json
+import logging
+import os
+import re
+import time
+from typing import Any, Callable, Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+TASK_PRIORITIES = {"low": 0, "normal": 1, "high": 2}
+DEFAULT_TASK_PRIORITY = "normal"
+
+# What to do with a submission when the queue is at its maximum depth
+QUEUE_FULL_POLICIES = ("reject", "block", "drop_oldest")
+
+
+class TaskRejectedError(Exception):
+    """A task submission was refused (queue full or submitter over quota)."""
+
+
+def parse_type_weights(value: str) -> Dict[str, float]:
+    """Parses "browser_use=1,deep_research=0.25" into a weight per task type."""
+    weights = {}
+    for part in (value or "").replace(";", ",").split(","):
+        if "=" not in part:
+            continue
+        task_type, weight = part.split("=", 1)
+        try:
+            weights[task_type.strip()] = float(weight)
+        except ValueError:
+            logger.warning(f"Ignoring invalid task type weight: {part}")
+    return weights
+
+
+# Short interactive tasks go before long research jobs of the same priority
+DEFAULT_TYPE_WEIGHTS = {
+    "browser_use": 1.0,
+    "browser_automation": 1.0,
+    "deep_research": 0.25,
+    **parse_type_weights(os.getenv("TASK_TYPE_WEIGHTS", "")),
+}
+
+# Aging: seconds of waiting that raise a task by one priority class (0 disables aging)
+TASK_AGING_INTERVAL = float(os.getenv("TASK_AGING_INTERVAL", "120"))
+# Priority classes a task with a deadline has gained by the time its deadline is reached
+DEADLINE_BOOST_CLASSES = 2
+
+
+def priority_value(priority: Union[str, int, float, None]) -> float:
+    """Numeric value of a priority given by name ("low", "normal", "high") or number."""
+    if priority is None:
+        return TASK_PRIORITIES[DEFAULT_TASK_PRIORITY]
+    if isinstance(priority, str):
+        if priority in TASK_PRIORITIES:
+            return TASK_PRIORITIES[priority]
+        try:
+            return float(priority)
+        except ValueError:
+            logger.warning(f"Unknown task priority '{priority}', using '{DEFAULT_TASK_PRIORITY}'.")
+            return TASK_PRIORITIES[DEFAULT_TASK_PRIORITY]
+    return float(priority)
+
+
+def normalize_task_description(description: str) -> str:
+    """Case and whitespace insensitive form of a task description."""
+    return re.sub(r"\s+", " ", (description or "").strip().lower())
+
+
+def task_coalesce_key(description: str, task_type: str, settings: Optional[Dict[str, Any]] = None) -> str:
+    """Key under which identical in-flight tasks are coalesced: normalized description, type and settings hash."""
+    settings_hash = hashlib.sha256(json.dumps(settings or {}, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    return f"{task_type}:{settings_hash[:16]}:{normalize_task_description(description)}"
+
+
+class PriorityTaskQueue(asyncio.Queue):
+    """
+    asyncio.Queue of task_info dicts ordered by priority class, task type weight, age and deadline.
+
+    The priority class decides first; within a class the weight of the task's "type" decides
+    (it adds less than one class). Every `aging_interval` seconds of waiting raise a task by
+    one class, so a stream of high priority tasks cannot starve older low priority ones. A
+    task with a "deadline" (epoch seconds) ages as if it had been queued since
+    DEADLINE_BOOST_CLASSES intervals before its deadline, so it moves up as the deadline
+    nears. Ties go to the earliest deadline and then to the oldest task. Tasks whose deadline
+    has passed are dropped when they reach the head of the queue, before a worker spends a
+    browser on them; `on_expired` is called for each.
+    """
+
+    def __init__(self, maxsize: int = 0, type_weights: Optional[Dict[str, float]] = None,
+                 on_expired: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 aging_interval: float = TASK_AGING_INTERVAL):
+        self.type_weights = dict(DEFAULT_TYPE_WEIGHTS if type_weights is None else type_weights)
+        self.on_expired = on_expired
+        self.aging_interval = aging_interval
+        self._counter = itertools.count()
+        super().__init__(maxsize)
+
+    def _init(self, maxsize):
+        self._queue = []
+
+    def score(self, task_info: Dict[str, Any], now: Optional[float] = None) -> float:
+        """Effective priority of a task at `now`: class + type weight share + aging boost."""
+        weight = max(self.type_weights.get(task_info.get("type"), 1.0), 0.0)
+        # weight / (1 + weight) stays below 1, so the type weight never outranks a priority class
+        score = priority_value(task_info.get("priority")) + weight / (1 + weight)
+        if self.aging_interval > 0:
+            now = time.time() if now is None else now
+            score += (now - self._aging_start(task_info)) / self.aging_interval
+        return score
+
+    def _aging_start(self, task_info: Dict[str, Any]) -> float:
+        start = task_info.get("enqueued_at") or time.time()
+        deadline = task_info.get("deadline")
+        if deadline is not None:
+            start = min(start, deadline - DEADLINE_BOOST_CLASSES * self.aging_interval)
+        return start
+
+    def _put(self, task_info):
+        task_info.setdefault("enqueued_at", time.time())
+        deadline = task_info.get("deadline")
+        # Every task ages at the same rate, so the order at a fixed time is the order at any time
+        entry = (-self.score(task_info, now=0.0), deadline if deadline is not None else float("inf"), next(self._counter),
+                 task_info)
+        heapq.heappush(self._queue, entry)
+
+    def _get(self):
+        return heapq.heappop(self._queue)[-1]
+
+    @staticmethod
+    def is_expired(task_info: Dict[str, Any], now: Optional[float] = None) -> bool:
+        deadline = task_info.get("deadline")
+        return deadline is not None and (now or time.time()) > deadline
+
+    def _expire(self, task_info: Dict[str, Any]):
+        # Dropped tasks never reach a consumer, so finish them here to keep join() working
+        self.task_done()
+        logger.info(f"Dropping expired task {task_info.get('id')}")
+        if self.on_expired:
+            try:
+                self.on_expired(task_info)
+            except Exception as e:
+                logger.error(f"Error in on_expired callback: {e}")
+
+    def get_nowait(self):
+        """Remove and return the highest scoring unexpired task; raises QueueEmpty if none is left."""
+        while True:
+            task_info = super().get_nowait()
+            if not self.is_expired(task_info):
+                return task_info
+            self._expire(task_info)
+
+    async def get(self):
+        while True:
+            try:
+                return await super().get()
+            except asyncio.QueueEmpty:
+                # Everything that was queued had expired, wait for new tasks
+                continue
+
+    def drop_oldest(self) -> Optional[Dict[str, Any]]:
+        """Remove and return the longest-queued task regardless of its score, None if empty."""
+        if not self._queue:
+            return None
+        oldest = min(range(len(self._queue)), key=lambda i: self._queue[i][2])
+        entry = self._queue.pop(oldest)
+        heapq.heapify(self._queue)
+        self.task_done()
+        return entry[-1]
+
+    def ordered(self) -> List[Dict[str, Any]]:
+        """Queued task_infos in the order they will be served."""
+        return [entry[-1] for entry in sorted(self._queue)]
@@ -0,0 +1,108 @@
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional
+
+# States of tasks that are not finished yet; everything else is kept in the bounded history
+ACTIVE_STATES = ("en cola", "ejecutando", "pausada")
+# Finished tasks remembered for status lookups and the UI
+TASK_HISTORY_SIZE = int(os.getenv("TASK_HISTORY_SIZE", "500"))
+
+
+@dataclass
+class TaskRecord:
+    task_id: str
+    description: str
+    status: str
+    updated_at: float = field(default_factory=time.time)
+
+
+class TaskRegistry:
+    """
+    Status and description of web UI tasks, indexed by state.
+
+    Active tasks (queued, running, paused) are indexed per state, so views such as "what is
+    running" cost time proportional to the active set instead of every task ever submitted.
+    Finished tasks move to a ring buffer that keeps the last `history_size` of them.
+    """
+
+    def __init__(self, history_size: int = TASK_HISTORY_SIZE):
+        self.history_size = history_size
+        self._active: Dict[str, TaskRecord] = {}
+        self._by_state: Dict[str, Dict[str, None]] = {state: {} for state in ACTIVE_STATES}
+        self._finished: "OrderedDict[str, TaskRecord]" = OrderedDict()
+
+    def _get(self, task_id: str) -> Optional[TaskRecord]:
+        return self._active.get(task_id) or self._finished.get(task_id)
+
+    def add(self, task_id: str, description: str, status: str = "en cola"):
+        self._remove(task_id)
+        self._insert(TaskRecord(task_id=task_id, description=description, status=status))
+
+    def set_status(self, task_id: str, status: str):
+        """Move a task to `status`; unknown task ids are added without description."""
+        record = self._remove(task_id) or TaskRecord(task_id=task_id, description="", status=status)
+        record.status = status
+        record.updated_at = time.time()
+        self._insert(record)
+
+    def _remove(self, task_id: str) -> Optional[TaskRecord]:
+        record = self._active.pop(task_id, None)
+        if record:
+            self._by_state[record.status].pop(task_id, None)
+            return record
+        return self._finished.pop(task_id, None)
+
+    def _insert(self, record: TaskRecord):
+        if record.status in ACTIVE_STATES:
+            self._active[record.task_id] = record
+            self._by_state[record.status][record.task_id] = None
+            return
+        self._finished[record.task_id] = record
+        while len(self._finished) > self.history_size:
+            self._finished.popitem(last=False)
+
+    def get_status(self, task_id: Optional[str], default: Optional[str] = None) -> Optional[str]:
+        record = self._get(task_id) if task_id else None
+        return record.status if record else default
+
+    def get_description(self, task_id: str, default: str = "") -> str:
+        record = self._get(task_id)
+        return record.description if record else default
+
+    def ids_in(self, *states: str) -> List[str]:
+        """Ids of active tasks in the given states, oldest state change first."""
+        return [task_id for state in states for task_id in self._by_state.get(state, ())]
+
+    def count(self, state: str) -> int:
+        """Number of active tasks in `state`."""
+        return len(self._by_state.get(state, ()))
+
+    def finished(self) -> List[TaskRecord]:
+        """Recently finished tasks, oldest first."""
+        return list(self._finished.values())
+
+    def counts(self) -> Dict[str, int]:
+        counts = {state: len(ids) for state, ids in self._by_state.items()}
+        counts["finalizadas"] = len(self._finished)
+        return counts
+
+    def is_active(self, task_id: str) -> bool:
+        return task_id in self._active
+
+    def __contains__(self, task_id: str) -> bool:
+        return self._get(task_id) is not None
+
+    def __len__(self) -> int:
+        return len(self._active) + len(self._finished)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._active
+        yield from self._finished
+
+    def clear(self):
+        self._active.clear()
+        self._finished.clear()
+        for ids in self._by_state.values():
+            ids.clear()
@@ -0,0 +1,218 @@
+import atexit
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Opt-in: empty keeps the queue in memory only, e.g. ./tmp/task_queue.db re-queues unfinished tasks after a restart
+TASK_STORE_PATH = os.getenv("TASK_STORE_PATH", "")
+TASK_STORE_FLUSH_INTERVAL = float(os.getenv("TASK_STORE_FLUSH_INTERVAL", "0.05"))
+# Runs a task may start before recover() gives up on it (0 = unlimited), so a task that
+# crashes the process does not crash it again on every restart
+TASK_MAX_ATTEMPTS = int(os.getenv("TASK_MAX_ATTEMPTS", "3"))
+
+# Task states that mean "not finished"; such tasks are re-queued after a restart
+UNFINISHED_STATES = ("en cola", "ejecutando", "pausada")
+QUEUED_STATE = "en cola"
+FAILED_STATE = "fallida"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id TEXT PRIMARY KEY,
+    description TEXT NOT NULL,
+    type TEXT NOT NULL,
+    priority TEXT,
+    deadline REAL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    info TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status);
+"""
+
+_UPSERT = """
+INSERT INTO tasks (id, description, type, priority, deadline, status, attempts, result, info, created_at, updated_at)
+VALUES (:id, :description, :type, :priority, :deadline, :status, :attempts, :result, :info, :created_at, :updated_at)
+ON CONFLICT(id) DO UPDATE SET
+    status = excluded.status,
+    attempts = excluded.attempts,
+    result = COALESCE(excluded.result, tasks.result),
+    updated_at = excluded.updated_at
+"""
+
+
+class TaskStore:
+    """
+    SQLite (WAL) persistence for the web UI task queue: tasks, states, attempts and results.
+
+    Callers only update an in-memory pending map, which takes microseconds; a writer thread
+    flushes it in one transaction every `flush_interval` seconds (and at exit), coalescing
+    repeated updates of the same task. After a restart, `recover()` returns the unfinished
+    tasks with interrupted ("ejecutando"/"pausada") ones put back to "en cola", except those
+    that already started `max_attempts` runs, which are marked "fallida".
+    """
+
+    def __init__(self, db_path: str, flush_interval: float = TASK_STORE_FLUSH_INTERVAL):
+        self.db_path = db_path
+        self.flush_interval = flush_interval
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._rows: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._writer = threading.Thread(target=self._writer_loop, name="task-store-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def _stage(self, row: Dict[str, Any]):
+        with self._lock:
+            self._pending[row["id"]] = row
+        self._wakeup.set()
+
+    def add(self, task_info: Dict[str, Any], status: str = QUEUED_STATE):
+        """Record a newly queued task."""
+        now = time.time()
+        priority = task_info.get("priority")
+        extra = {key: value for key, value in task_info.items()
+                 if key not in ("id", "description", "type", "priority", "deadline", "status")}
+        row = {
+            "id": task_info["id"],
+            "description": task_info.get("description", ""),
+            "type": task_info.get("type", "browser_use"),
+            "priority": None if priority is None else str(priority),
+            "deadline": task_info.get("deadline"),
+            "status": status,
+            "attempts": task_info.get("attempts", 0),
+            "result": None,
+            "info": json.dumps(extra, default=str),
+            "created_at": now,
+            "updated_at": now,
+        }
+        with self._lock:
+            self._rows[row["id"]] = row
+        self._stage(dict(row))
+
+    def update(self, task_id: str, status: str, result: Optional[Any] = None, new_attempt: bool = False):
+        """Record a state change; `new_attempt` counts the start of a run."""
+        with self._lock:
+            row = self._rows.get(task_id)
+            if row is None:
+                return
+            row["status"] = status
+            row["updated_at"] = time.time()
+            if new_attempt:
+                row["attempts"] += 1
+            if result is not None:
+                row["result"] = json.dumps(result, default=str)
+            staged = dict(row)
+            if status not in UNFINISHED_STATES:
+                # Finished tasks are only read back from the database
+                del self._rows[task_id]
+        self._stage(staged)
+
+    def _writer_loop(self):
+        while not self._closed:
+            self._wakeup.wait()
+            if self._closed:
+                break
+            time.sleep(self.flush_interval)  # let more updates accumulate into one transaction
+            self._wakeup.clear()
+            self.flush()
+
+    def flush(self):
+        """Write all pending updates in one transaction."""
+        with self._lock:
+            pending, self._pending = list(self._pending.values()), {}
+        if not pending:
+            return
+        try:
+            with self._db_lock, self._conn:
+                self._conn.executemany(_UPSERT, pending)
+        except sqlite3.Error as e:
+            logger.error(f"Failed to persist {len(pending)} task updates: {e}")
+            with self._lock:
+                for row in pending:
+                    self._pending.setdefault(row["id"], row)
+
+    def recover(self, max_attempts: int = TASK_MAX_ATTEMPTS) -> List[Dict[str, Any]]:
+        """Unfinished tasks from a previous run as task_info dicts, oldest first, re-queued."""
+        with self._db_lock:
+            cursor = self._conn.execute(
+                f"SELECT * FROM tasks WHERE status IN ({','.join('?' * len(UNFINISHED_STATES))}) ORDER BY created_at",
+                UNFINISHED_STATES,
+            )
+            columns = [column[0] for column in cursor.description]
+            rows = [dict(zip(columns, values)) for values in cursor.fetchall()]
+
+        tasks = []
+        for row in rows:
+            if max_attempts and row["attempts"] >= max_attempts:
+                logger.warning(f"Task {row['id']} was interrupted after {row['attempts']} attempts, marking it failed.")
+                row["status"] = FAILED_STATE
+                row["result"] = json.dumps({"status": "failed", "task": row["description"], "success": False,
+                                            "error": f"interrumpida tras {row['attempts']} intentos"})
+                row["updated_at"] = time.time()
+                self._stage(dict(row))
+                continue
+            if row["status"] != QUEUED_STATE:
+                logger.info(f"Re-queueing task {row['id']} interrupted while '{row['status']}'.")
+                row["status"] = QUEUED_STATE
+                row["updated_at"] = time.time()
+                self._stage(dict(row))
+            with self._lock:
+                self._rows[row["id"]] = row
+            tasks.append({
+                **json.loads(row["info"] or "{}"),
+                "id": row["id"],
+                "description": row["description"],
+                "type": row["type"],
+                "priority": row["priority"],
+                "deadline": row["deadline"],
+                "attempts": row["attempts"],
+                "status": QUEUED_STATE,
+            })
+        return tasks
+
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._rows.get(task_id)
+            if row:
+                return dict(row)
+        with self._db_lock:
+            cursor = self._conn.execute("SELECT * FROM tasks WHERE id = ?", (task_id,))
+            values = cursor.fetchone()
+            return dict(zip([column[0] for column in cursor.description], values)) if values else None
+
+    def clear(self):
+        """Forget all tasks (the web UI "clear" button)."""
+        with self._lock:
+            self._pending.clear()
+            self._rows.clear()
+        with self._db_lock, self._conn:
+            self._conn.execute("DELETE FROM tasks")
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._wakeup.set()
+        self.flush()
+        with self._db_lock:
+            self._conn.close()
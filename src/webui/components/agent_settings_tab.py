@@ -5,7 +5,7 @@ import gradio as gr
 from gradio.components import Component
 from typing import Any, Dict, Optional
 from src.webui.webui_manager import WebuiManager
-from src.utils import config
+from src.utils import config, llm_provider as llm_provider_utils
 import logging
 from functools import partial
 
@@ -257,6 +257,11 @@ def create_agent_settings_tab(webui_manager: WebuiManager):
         outputs=[planner_llm_model_name]
     )
 
+    # Cached LLM clients built with the old endpoint/key must not be reused
+    for component in (llm_provider, llm_base_url, llm_api_key,
+                      planner_llm_provider, planner_llm_base_url, planner_llm_api_key):
+        component.change(lambda *_: llm_provider_utils.clear_llm_model_cache(), inputs=None, outputs=None)
+
     async def update_wrapper(mcp_file):
         """Wrapper for handle_pause_resume."""
         update_dict = await update_mcp_server(mcp_file, webui_manager)
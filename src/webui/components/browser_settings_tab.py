@@ -6,6 +6,7 @@ from gradio.components import Component
 
 from src.webui.webui_manager import WebuiManager
 from src.utils import config
+from src.browser.custom_browser import LAUNCH_PROFILES, DEFAULT_LAUNCH_PROFILE
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +28,9 @@ async def close_browser(webui_manager: WebuiManager):
         await webui_manager.bu_browser.close()
         webui_manager.bu_browser = None
 
+    # Queue workers relaunch their browsers with the new settings on their next task
+    await webui_manager.close_worker_browsers()
+
 def create_browser_settings_tab(webui_manager: WebuiManager):
     """
     Creates a browser settings tab.
@@ -74,6 +78,40 @@ def create_browser_settings_tab(webui_manager: WebuiManager):
                 info="Disable browser security",
                 interactive=True
             )
+            launch_profile = gr.Dropdown(
+                choices=list(LAUNCH_PROFILES),
+                label="Launch Profile",
+                value=DEFAULT_LAUNCH_PROFILE,
+                info="throughput: no GPU/extensions/background work, smaller window; fidelity: full rendering; debug: logging and DevTools",
+                interactive=True
+            )
+
+    with gr.Group():
+        with gr.Row():
+            lean_mode = gr.Checkbox(
+                label="Lean Page Mode",
+                value=bool(strtobool(os.getenv("BROWSER_LEAN_MODE", "false"))),
+                info="Block images, media, fonts and ad/tracker hosts (use with Vision off)",
+                interactive=True
+            )
+            lean_mode_allowed_domains = gr.Textbox(
+                label="Lean Mode Allowed Domains",
+                value=os.getenv("BROWSER_LEAN_MODE_ALLOWED_DOMAINS", ""),
+                info="Comma separated domains whose resources are never blocked",
+                interactive=True,
+            )
+            reuse_logins = gr.Checkbox(
+                label="Reuse Logins",
+                value=bool(strtobool(os.getenv("BROWSER_STORAGE_STATE_CACHE", "false"))),
+                info="Save cookies/localStorage after successful tasks (encrypted) and restore them in new contexts",
+                interactive=True
+            )
+            http_cache = gr.Checkbox(
+                label="Shared HTTP Cache",
+                value=bool(strtobool(os.getenv("BROWSER_HTTP_CACHE", "false"))),
+                info="Serve repeated JS/CSS/fonts/images from a disk cache shared by all contexts and runs",
+                interactive=True
+            )
 
     with gr.Group():
         with gr.Row():
@@ -139,6 +177,11 @@ def create_browser_settings_tab(webui_manager: WebuiManager):
             keep_browser_open=keep_browser_open,
             headless=headless,
             disable_security=disable_security,
+            launch_profile=launch_profile,
+            lean_mode=lean_mode,
+            lean_mode_allowed_domains=lean_mode_allowed_domains,
+            reuse_logins=reuse_logins,
+            http_cache=http_cache,
             save_recording_path=save_recording_path,
             save_trace_path=save_trace_path,
             save_agent_history_path=save_agent_history_path,
@@ -159,3 +202,7 @@ def create_browser_settings_tab(webui_manager: WebuiManager):
     keep_browser_open.change(close_wrapper)
     disable_security.change(close_wrapper)
     use_own_browser.change(close_wrapper)
+    launch_profile.change(close_wrapper)
+    lean_mode.change(close_wrapper)
+    reuse_logins.change(close_wrapper)
+    http_cache.change(close_wrapper)
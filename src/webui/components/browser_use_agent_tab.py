@@ -19,9 +19,15 @@ from gradio.components import Component
 from langchain_core.language_models.chat_models import BaseChatModel
 
 # from src.agent.browser_use.browser_use_agent import BrowserUseAgent  # Temporarily disabled
+from src.browser.browser_watchdog import get_browser_watchdog
 from src.browser.custom_browser import CustomBrowser
+from src.browser.custom_context import CustomBrowserContext
+from src.browser.resource_policy import ResourcePolicy
+from src.browser.http_cache import get_http_cache
+from src.browser.storage_state_cache import get_storage_state_cache
 from src.controller.custom_controller import CustomController
 from src.utils import llm_provider
+from src.utils.task_queue import TaskRejectedError
 from src.webui.webui_manager import WebuiManager
 from src.webui.components.vnc_viewer import create_vnc_controls, handle_browser_mode_change, handle_vnc_open, handle_vnc_close
 
@@ -389,6 +395,11 @@ async def run_agent_task(
     keep_browser_open = get_browser_setting("keep_browser_open", False)
     headless = get_browser_setting("headless", False)
     disable_security = get_browser_setting("disable_security", False)
+    launch_profile = get_browser_setting("launch_profile") or None
+    lean_mode = get_browser_setting("lean_mode", False)
+    lean_mode_allowed_domains = get_browser_setting("lean_mode_allowed_domains") or None
+    reuse_logins = get_browser_setting("reuse_logins", False)
+    use_http_cache = get_browser_setting("http_cache", False)
     window_w = int(get_browser_setting("window_w", 1280))
     window_h = int(get_browser_setting("window_h", 1100))
     cdp_url = get_browser_setting("cdp_url") or None
@@ -448,6 +459,17 @@ async def run_agent_task(
                 await webui_manager.bu_browser.close()
                 webui_manager.bu_browser = None
 
+        # Recycle a kept-open browser that ran too many tasks, got too old or uses too much memory
+        browser_watchdog = get_browser_watchdog()
+        recycle_reason = browser_watchdog.check(webui_manager.bu_browser)
+        if recycle_reason:
+            browser_watchdog.record_recycle(webui_manager.bu_browser, recycle_reason)
+            if webui_manager.bu_browser_context:
+                await webui_manager.bu_browser_context.close()
+                webui_manager.bu_browser_context = None
+            await webui_manager.bu_browser.close()
+            webui_manager.bu_browser = None
+
         # Create Browser if needed
         if not webui_manager.bu_browser:
             logger.info("Launching new browser instance.")
@@ -474,8 +496,13 @@ async def run_agent_task(
                         window_width=window_w,
                         window_height=window_h,
                     )
-                )
+                ),
+                resource_policy=ResourcePolicy.from_settings(lean_mode, lean_mode_allowed_domains),
+                storage_state_cache=get_storage_state_cache() if reuse_logins else None,
+                launch_profile=launch_profile,
+                http_cache=get_http_cache() if use_http_cache else None,
             )
+            browser_watchdog.track(webui_manager.bu_browser)
 
         # Create Context if needed
         if not webui_manager.bu_browser_context:
@@ -704,6 +731,15 @@ async def run_agent_task(
                 agent_task.result()  # Raise the exception to be caught below
             logger.info("Agent task completed processing.")
 
+            # Keep the logged-in session so the next task can skip the login steps
+            history = agent_task.result()
+            if (
+                    history
+                    and history.is_successful()
+                    and isinstance(webui_manager.bu_browser_context, CustomBrowserContext)
+            ):
+                await webui_manager.bu_browser_context.save_storage_state()
+
             logger.info(f"Explicitly saving agent history to: {history_file}")
             webui_manager.bu_agent.save_history(history_file)
 
@@ -743,6 +779,8 @@ async def run_agent_task(
 
         finally:
             webui_manager.bu_current_task = None  # Clear the task reference
+            if webui_manager.bu_browser:
+                browser_watchdog.record_task(webui_manager.bu_browser)
 
             # Close browser/context if requested
             if should_close_browser_on_finish:
@@ -905,7 +943,7 @@ async def handle_stop(webui_manager: WebuiManager):
 async def handle_pause_resume(webui_manager: WebuiManager):
     """Handles clicks on the 'Pause/Resume' button - now works with task queue."""
     current_task_id = webui_manager.current_task_id
-    current_status = webui_manager.task_status.get(current_task_id, "") if current_task_id else ""
+    current_status = webui_manager.tasks.get_status(current_task_id, "") if current_task_id else ""
 
     if current_status == "ejecutando":
         logger.info("Pause button clicked.")
@@ -952,9 +990,8 @@ async def handle_clear(webui_manager: WebuiManager):
     """Handles clicks on the 'Clear' button - now works with task queue."""
     logger.info("Clear button clicked.")
 
-    # Stop any running task first using the task queue system
-    if webui_manager.current_task_id:
-        await webui_manager.stop_task()
+    # Stop all running tasks first using the task queue system
+    await webui_manager.stop_all_tasks()
 
     # Stop the task processor
     await webui_manager.stop_task_processor()
@@ -967,10 +1004,7 @@ async def handle_clear(webui_manager: WebuiManager):
         except asyncio.QueueEmpty:
             break
 
-    webui_manager.task_status.clear()
-    webui_manager.task_descriptions.clear()
-    webui_manager.current_task_id = None
-    webui_manager.current_task_future = None
+    webui_manager.clear_tasks()
 
     # Reset browser use agent state
     if webui_manager.bu_controller:
@@ -1159,13 +1193,17 @@ def create_browser_use_agent_tab(webui_manager: WebuiManager):
                         "type": "browser_automation",
                         "browser_mode": browser_mode
                     }
-                    webui_manager.task_queue.put_nowait(task_info)
-                    webui_manager.task_status[task_id] = "en cola"
-                    webui_manager.task_descriptions[task_id] = task_description
+                    queued_id = webui_manager.enqueue_task(task_info)
+                    if queued_id != task_id:
+                        response = f"🔗 Tarea idéntica ya en curso, unida a la tarea {queued_id}"
+                        task_id = queued_id
 
                     mode_text = "VNC Viewer" if browser_mode == "vnc" else "PC Browser"
                     print(f"✅ Tarea {task_id} añadida a la cola real (Modo: {mode_text})")
                     response += f" (Modo: {mode_text})"
+                except TaskRejectedError as e:
+                    print(f"🚫 Tarea {task_id} rechazada: {e}")
+                    response = f"🚫 Tarea rechazada: {e}"
                 except Exception as e:
                     print(f"❌ Error añadiendo tarea a la cola: {e}")
                     response += f" (Error: {e})"
@@ -1177,7 +1215,7 @@ def create_browser_use_agent_tab(webui_manager: WebuiManager):
             # Get current queue status
             queue_status = f"Tareas en cola: {webui_manager.task_queue.qsize()}"
             if webui_manager.current_task_id:
-                current_status = webui_manager.task_status.get(webui_manager.current_task_id, "unknown")
+                current_status = webui_manager.tasks.get_status(webui_manager.current_task_id, "unknown")
                 queue_status += f"\nTarea actual: {current_status}"
 
             # Return updates for all outputs
@@ -62,6 +62,7 @@ async def run_deep_research(webui_manager: WebuiManager, components: Dict[Compon
     research_task_comp = webui_manager.get_component_by_id("deep_research_agent.research_task")
     resume_task_id_comp = webui_manager.get_component_by_id("deep_research_agent.resume_task_id")
     parallel_num_comp = webui_manager.get_component_by_id("deep_research_agent.parallel_num")
+    browser_isolation_comp = webui_manager.get_component_by_id("deep_research_agent.browser_isolation")
     save_dir_comp = webui_manager.get_component_by_id(
         "deep_research_agent.max_query")  # Note: component ID seems misnamed in original code
     start_button_comp = webui_manager.get_component_by_id("deep_research_agent.start_button")
@@ -74,6 +75,7 @@ async def run_deep_research(webui_manager: WebuiManager, components: Dict[Compon
     task_topic = components.get(research_task_comp, "").strip()
     task_id_to_resume = components.get(resume_task_id_comp, "").strip() or None
     max_parallel_agents = int(components.get(parallel_num_comp, 1))
+    browser_isolation = components.get(browser_isolation_comp, "process")
     base_save_dir = components.get(save_dir_comp, "./tmp/deep_research").strip()
     safe_root_dir = "./tmp/deep_research"
     normalized_base_save_dir = os.path.abspath(os.path.normpath(base_save_dir))
@@ -100,6 +102,7 @@ async def run_deep_research(webui_manager: WebuiManager, components: Dict[Compon
         research_task_comp: gr.update(interactive=False),
         resume_task_id_comp: gr.update(interactive=False),
         parallel_num_comp: gr.update(interactive=False),
+        browser_isolation_comp: gr.update(interactive=False),
         save_dir_comp: gr.update(interactive=False),
         markdown_display_comp: gr.update(value="Starting research..."),
         markdown_download_comp: gr.update(value=None, interactive=False)
@@ -143,6 +146,12 @@ async def run_deep_research(webui_manager: WebuiManager, components: Dict[Compon
             "user_data_dir": get_setting("browser_settings", "browser_user_data_dir"),
             "window_width": int(get_setting("browser_settings", "window_w", 1280)),
             "window_height": int(get_setting("browser_settings", "window_h", 1100)),
+            "browser_isolation": browser_isolation,
+            "launch_profile": get_setting("browser_settings", "launch_profile"),
+            "lean_mode": get_setting("browser_settings", "lean_mode", False),
+            "lean_mode_allowed_domains": get_setting("browser_settings", "lean_mode_allowed_domains"),
+            "reuse_logins": get_setting("browser_settings", "reuse_logins", False),
+            "http_cache": get_setting("browser_settings", "http_cache", False),
             # Add other relevant fields if DeepResearchAgent accepts them
         }
 
@@ -194,6 +203,9 @@ async def run_deep_research(webui_manager: WebuiManager, components: Dict[Compon
             logger.warning("Cannot monitor plan file: Task ID unknown.")
             plan_file_path = None
         last_plan_content = None
+        # A report left by an earlier run of a resumed task is not shown until synthesis rewrites it
+        last_report_mtime = (os.path.getmtime(report_file_path)
+                             if report_file_path and os.path.exists(report_file_path) else 0)
         while not agent_task.done():
             update_dict = {}
             update_dict[resume_task_id_comp] = gr.update(value=running_task_id)
@@ -222,11 +234,23 @@ async def run_deep_research(webui_manager: WebuiManager, components: Dict[Compon
                     # Avoid continuous logging for the same error
                     await asyncio.sleep(2.0)
 
+            # The synthesis streams the report into report.md, show it as it grows
+            if report_file_path:
+                try:
+                    current_mtime = os.path.getmtime(report_file_path) if os.path.exists(report_file_path) else 0
+                    if current_mtime > last_report_mtime:
+                        report_content = _read_file_safe(report_file_path)
+                        if report_content:
+                            update_dict[markdown_display_comp] = gr.update(value=report_content)
+                            last_report_mtime = current_mtime
+                except Exception as e:
+                    logger.warning(f"Error checking/reading report file {report_file_path}: {e}")
+
             # Yield updates if any
             if update_dict:
                 yield update_dict
 
-            await asyncio.sleep(1.0)  # Check file changes every second
+            await asyncio.sleep(0.5)  # Check file changes twice a second
 
         # --- 7. Task Finalization ---
         logger.info("Agent task processing finished. Awaiting final result...")
@@ -283,6 +307,7 @@ async def run_deep_research(webui_manager: WebuiManager, components: Dict[Compon
             research_task_comp: gr.update(interactive=True),
             resume_task_id_comp: gr.update(value="", interactive=True),
             parallel_num_comp: gr.update(interactive=True),
+            browser_isolation_comp: gr.update(interactive=True),
             save_dir_comp: gr.update(interactive=True),
             # Keep download button enabled if file exists
             markdown_download_comp: gr.update() if report_file_path and os.path.exists(report_file_path) else gr.update(
@@ -395,6 +420,11 @@ def create_deep_research_agent_tab(webui_manager: WebuiManager):
             parallel_num = gr.Number(label="Parallel Agent Num", value=1,
                                      precision=0,
                                      interactive=True)
+            browser_isolation = gr.Dropdown(label="Browser Isolation",
+                                            choices=["process", "context", "tab"],
+                                            value=os.getenv("BROWSER_ISOLATION", "process"),
+                                            info="process: one browser per query; context: one shared browser, one context per query; tab: one shared context, one tab per query",
+                                            interactive=True)
             max_query = gr.Textbox(label="Research Save Dir", value="./tmp/deep_research",
                                    interactive=True)
     with gr.Row():
@@ -407,6 +437,7 @@ def create_deep_research_agent_tab(webui_manager: WebuiManager):
         dict(
             research_task=research_task,
             parallel_num=parallel_num,
+            browser_isolation=browser_isolation,
             max_query=max_query,
             start_button=start_button,
             stop_button=stop_button,
@@ -1,3 +1,6 @@
+import os
+from distutils.util import strtobool
+
 import gradio as gr
 
 from src.webui.webui_manager import WebuiManager
@@ -19,7 +22,10 @@ theme_map = {
 }
 
 
-def create_ui(theme_name="Ocean"):
+def create_ui(theme_name="Ocean", prewarm=None):
+    if prewarm is None:
+        prewarm = bool(strtobool(os.getenv("WEBUI_PREWARM", "false")))
+
     css = """
     @import url('https://fonts.googleapis.com/css2?family=Orbitron:wght@400;700;900&family=Rajdhani:wght@300;400;500;600;700&family=Exo+2:wght@300;400;500;600;700;800;900&family=Electrolize:wght@400&display=swap');
 
@@ -629,6 +635,7 @@ def create_ui(theme_name="Ocean"):
                 with gr.Tabs():
                     with gr.TabItem("📈 Estado del Sistema"):
                         gr.Markdown("**Sistema de investigación profunda temporalmente deshabilitado para compatibilidad.**")
+                        prewarm_status = gr.Markdown(ui_manager.get_prewarm_status_text())
                     # with gr.TabItem("Deep Research"):
                     #     create_deep_research_agent_tab(ui_manager)  # Temporarily disabled
 
@@ -747,4 +754,21 @@ def create_ui(theme_name="Ocean"):
 
         demo.load(fn=start_task_processor, inputs=[], outputs=[])
 
+        # Warm up browser, LLM client and MCP servers in the background on the server's event loop,
+        # started with the server (Gradio runs extra_startup_events there) rather than on the first page load
+        async def start_prewarm():
+            if prewarm:
+                ui_manager.start_prewarm()
+
+        demo.extra_startup_events.append(start_prewarm)
+
+        # Refresh the readiness display until the warm-up has finished
+        def refresh_prewarm_status():
+            done = not prewarm or ui_manager.is_prewarmed()
+            return ui_manager.get_prewarm_status_text(), gr.Timer(active=not done)
+
+        prewarm_timer = gr.Timer(1.0, active=prewarm)
+        prewarm_timer.tick(fn=refresh_prewarm_status, inputs=[], outputs=[prewarm_status, prewarm_timer])
+        demo.load(fn=refresh_prewarm_status, inputs=[], outputs=[prewarm_status, prewarm_timer])
+
     return demo
@@ -4,13 +4,19 @@ from typing import TYPE_CHECKING
 import os
 import gradio as gr
 from datetime import datetime
-from typing import Optional, Dict, List, Tuple, Any
+from typing import Optional, Dict, List, Tuple, Any, Union
 import uuid
 import asyncio
 import time
-from collections import deque
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
 
 from gradio.components import Component
+from src.utils.rate_limiter import get_rate_limiter
+from src.utils.result_cache import get_result_cache, resolve_cache_ttl, result_cache_key
+from src.utils.task_queue import QUEUE_FULL_POLICIES, PriorityTaskQueue, TaskRejectedError, task_coalesce_key
+from src.utils.task_registry import TaskRegistry
+from src.utils.task_store import TASK_STORE_PATH, TaskStore
 from browser_use.browser.browser import Browser
 from browser_use.browser.context import BrowserContext
 from browser_use.agent.service import Agent
@@ -21,8 +27,46 @@ from browser_use.agent.service import Agent
 # from src.agent.deep_research.deep_research_agent import DeepResearchAgent
 
 
+# Number of queued tasks that run at the same time
+TASK_WORKERS = int(os.getenv("TASK_WORKERS", "1"))
+# Attach duplicate submissions to an identical queued/running task instead of running them again
+TASK_COALESCE = os.getenv("TASK_COALESCE", "false").lower() in ("true", "1", "yes")
+# Results kept for wait_for_task() after a task finishes
+MAX_KEPT_RESULTS = 256
+# Backpressure: maximum queued tasks (0 = unbounded), what to do when full, max active tasks per submitter
+TASK_QUEUE_MAX_DEPTH = int(os.getenv("TASK_QUEUE_MAX_DEPTH", "0"))
+TASK_QUEUE_FULL_POLICY = os.getenv("TASK_QUEUE_FULL_POLICY", "reject")
+TASK_SUBMITTER_QUOTA = int(os.getenv("TASK_SUBMITTER_QUOTA", "0"))
+
+
+@dataclass
+class TaskWorker:
+    """Per-worker state of the task queue worker pool."""
+    worker_id: int
+    task_id: Optional[str] = None
+    future: Optional[asyncio.Future] = None
+    agent: Optional[Any] = None
+    browser: Optional[Any] = None
+    started_at: float = 0.0
+    loop_task: Optional[asyncio.Task] = None
+    pause_event: asyncio.Event = field(default_factory=asyncio.Event)
+    stop_event: asyncio.Event = field(default_factory=asyncio.Event)
+
+    def __post_init__(self):
+        self.pause_event.set()  # Initially not paused
+
+    def reset(self):
+        """Clear the per-task state; the browser and loop task are kept."""
+        self.task_id = None
+        self.future = None
+        self.agent = None
+        self.started_at = 0.0
+        self.stop_event.clear()
+        self.pause_event.set()
+
+
 class WebuiManager:
-    def __init__(self, settings_save_dir: str = "./tmp/webui_settings"):
+    def __init__(self, settings_save_dir: str = "./tmp/webui_settings", num_workers: int = TASK_WORKERS):
         self.id_to_component: dict[str, Component] = {}
         self.component_to_id: dict[Component, str] = {}
 
@@ -30,17 +74,45 @@ class WebuiManager:
         os.makedirs(self.settings_save_dir, exist_ok=True)
 
         # Task queue management attributes
-        self.task_queue: asyncio.Queue = asyncio.Queue()
-        self.current_task_id: Optional[str] = None
-        self.current_task_future: Optional[asyncio.Future] = None
-        self.task_status: Dict[str, str] = {}
-        self.task_descriptions: Dict[str, str] = {}
-        self.pause_event: asyncio.Event = asyncio.Event()
-        self.stop_event: asyncio.Event = asyncio.Event()
-        self.pause_event.set()  # Initially not paused
-
-        # Task processor loop task
-        self.task_processor_task: Optional[asyncio.Task] = None
+        # Ordered by priority, task type weight and deadline; expired tasks are dropped before they run
+        self.task_queue: PriorityTaskQueue = PriorityTaskQueue(on_expired=self._on_task_expired)
+        # Task states indexed by state; finished tasks are kept in a bounded history (TASK_HISTORY_SIZE)
+        self.tasks = TaskRegistry()
+
+        # Coalescing: key -> in-flight task id, plus results and waiters for wait_for_task()
+        self.coalesce_tasks = TASK_COALESCE
+        self._inflight_tasks: Dict[str, str] = {}
+        self.task_attached: Dict[str, int] = {}
+        self._task_results: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._task_waiters: Dict[str, List[asyncio.Future]] = {}
+
+        # Backpressure: queue depth limit, per-submitter quotas and queue gauges
+        self.max_queue_depth = TASK_QUEUE_MAX_DEPTH
+        self.queue_full_policy = TASK_QUEUE_FULL_POLICY
+        if self.queue_full_policy not in QUEUE_FULL_POLICIES:
+            print(f"Política de cola llena desconocida '{self.queue_full_policy}', usando 'reject'.")
+            self.queue_full_policy = "reject"
+        self.submitter_quota = TASK_SUBMITTER_QUOTA
+        self._submitter_active: Dict[str, int] = {}
+        self._queue_space = asyncio.Event()
+        self.queue_wait_times: deque = deque(maxlen=100)
+        self.rejected_tasks = 0
+        self.dropped_tasks = 0
+
+        # Durable copy of the queue in SQLite; unfinished tasks from the last run are queued again
+        self.task_store: Optional[TaskStore] = TaskStore(TASK_STORE_PATH) if TASK_STORE_PATH else None
+        self._restore_tasks()
+
+        # Worker pool: each worker takes tasks from the queue with its own agent and browser
+        self.workers: List[TaskWorker] = [TaskWorker(worker_id=i) for i in range(max(1, num_workers))]
+
+        # LLM used by queued browser tasks, built through get_llm_model so every task shares its client
+        self.task_llm_provider = os.getenv("TASK_LLM_PROVIDER", "openai")
+        self.task_model_name = os.getenv("TASK_LLM_MODEL", "gpt-4o")
+
+        # Warm-up state: browser, LLM client and MCP servers started before the first task
+        self.prewarm_task: Optional[asyncio.Task] = None
+        self.prewarm_status: Dict[str, str] = {}
 
     def init_browser_use_agent(self) -> None:
         """
@@ -141,70 +213,297 @@ class WebuiManager:
         yield update_components
 
     # Task Queue Management Methods
-    async def add_task(self, task_description: str, task_type: str = "browser_use") -> str:
-        """Add a new task to the queue."""
+    @property
+    def running_workers(self) -> List[TaskWorker]:
+        """Workers that are currently running a task, most recently started last."""
+        return sorted((worker for worker in self.workers if worker.task_id), key=lambda worker: worker.started_at)
+
+    @property
+    def current_task_id(self) -> Optional[str]:
+        """The most recently started running task (the target of pause/stop without a task id)."""
+        running = self.running_workers
+        return running[-1].task_id if running else None
+
+    @property
+    def current_task_future(self) -> Optional[asyncio.Future]:
+        running = self.running_workers
+        return running[-1].future if running else None
+
+    def get_worker(self, task_id: Optional[str] = None) -> Optional[TaskWorker]:
+        """Get the worker running `task_id`, or the current task's worker when no id is given."""
+        task_id = task_id or self.current_task_id
+        for worker in self.workers:
+            if task_id and worker.task_id == task_id:
+                return worker
+        return None
+
+    async def add_task(self, task_description: str, task_type: str = "browser_use",
+                       priority: Optional[Any] = None, deadline: Optional[float] = None,
+                       coalesce: Optional[bool] = None, cache_ttl: Union[bool, float, None] = None,
+                       submitter: Optional[str] = None) -> str:
+        """
+        Add a new task to the queue.
+        `priority` is "low", "normal" (default), "high" or a number; `deadline` is an epoch
+        timestamp after which the task is dropped if it has not started yet. With coalescing
+        (TASK_COALESCE or `coalesce=True`) the id of an identical in-flight task is returned.
+        `cache_ttl` marks a read-only task whose result may be reused for that many seconds
+        (True: RESULT_CACHE_TTL).
+        Raises TaskRejectedError when the queue is full (policy "reject") or `submitter` is over
+        its quota; with policy "block" it waits for room instead.
+        """
         task_id = str(uuid.uuid4())
         task_info = {
             "id": task_id,
             "description": task_description,
             "type": task_type,
             "status": "en cola",
-            "timestamp": datetime.now().isoformat()
+            "timestamp": datetime.now().isoformat(),
+            "priority": priority,
+            "deadline": deadline,
+            "cache_ttl": cache_ttl,
+            "submitter": submitter,
         }
-        await self.task_queue.put(task_info)
-        self.task_status[task_id] = "en cola"
-        self.task_descriptions[task_id] = task_description
-        print(f"Tarea '{task_description}' ({task_id}) añadida a la cola.")
+        if self.queue_full_policy == "block":
+            while self.max_queue_depth and self.queue_depth >= self.max_queue_depth:
+                self._queue_space.clear()
+                await self._queue_space.wait()
+        queued_id = self.enqueue_task(task_info, coalesce=coalesce)
+        if queued_id == task_id:
+            print(f"Tarea '{task_description}' ({task_id}) añadida a la cola.")
+        return queued_id
+
+    def enqueue_task(self, task_info: Dict[str, Any], coalesce: Optional[bool] = None) -> str:
+        """
+        Queue a prepared task_info dict and record it (synchronous, for UI callbacks).
+        Returns the task id, which is an existing task's id when the submission was coalesced.
+        Raises TaskRejectedError when the task cannot be admitted; a full queue cannot block
+        here, so policy "block" rejects like "reject" (add_task waits instead).
+        """
+        task_id = task_info["id"]
+        if self.coalesce_tasks if coalesce is None else coalesce:
+            key = task_info.setdefault("coalesce_key", task_coalesce_key(
+                task_info.get("description", ""), task_info.get("type", "browser_use"), self._task_settings(task_info)
+            ))
+            existing_id = self._inflight_tasks.get(key)
+            if existing_id and self.tasks.is_active(existing_id):
+                self.task_attached[existing_id] = self.task_attached.get(existing_id, 0) + 1
+                print(f"Tarea duplicada unida a la tarea {existing_id} ({self.task_attached[existing_id]} adjuntas).")
+                return existing_id
+
+        self._check_admission(task_info)
+        if task_info.get("coalesce_key"):
+            self._inflight_tasks[task_info["coalesce_key"]] = task_id
+        submitter = task_info.get("submitter")
+        if submitter:
+            self._submitter_active[submitter] = self._submitter_active.get(submitter, 0) + 1
+        task_info.setdefault("enqueued_at", time.time())
+        self.task_queue.put_nowait(task_info)
+        self.tasks.add(task_id, task_info.get("description", ""))
+        if self.task_store:
+            self.task_store.add(task_info)
         return task_id
 
-    async def pause_current_task(self):
-        """Pause the currently running task."""
-        if self.current_task_id and self.task_status.get(self.current_task_id) == "ejecutando":
-            self.pause_event.clear()  # Signal pause
-            self.task_status[self.current_task_id] = "pausada"
-            print(f"Tarea {self.current_task_id} pausada.")
+    @property
+    def queue_depth(self) -> int:
+        """Tasks waiting to run (stopped tasks still in the heap are not counted)."""
+        return self.tasks.count("en cola")
+
+    def _check_admission(self, task_info: Dict[str, Any]):
+        """Enforce the submitter quota and the queue depth limit; may drop the oldest task."""
+        submitter = task_info.get("submitter")
+        if submitter and self.submitter_quota and self._submitter_active.get(submitter, 0) >= self.submitter_quota:
+            self.rejected_tasks += 1
+            raise TaskRejectedError(f"'{submitter}' ya tiene {self.submitter_quota} tareas activas")
+        if not self.max_queue_depth or self.queue_depth < self.max_queue_depth:
+            return
+        if self.queue_full_policy != "drop_oldest":
+            self.rejected_tasks += 1
+            raise TaskRejectedError(f"la cola está llena ({self.max_queue_depth} tareas)")
+        while self.queue_depth >= self.max_queue_depth:
+            dropped = self.task_queue.drop_oldest()
+            if dropped is None:
+                break
+            if self.tasks.get_status(dropped["id"]) == "en cola":
+                self.dropped_tasks += 1
+                self._set_status(dropped["id"], "descartada")
+                print(f"Cola llena: tarea más antigua {dropped['id']} descartada.")
+            self._finish_task(dropped, {"status": "descartada", "task": dropped.get("description"), "success": False})
+
+    def get_queue_metrics(self) -> Dict[str, Any]:
+        """Queue depth and wait-time gauges."""
+        now = time.time()
+        queued = [task_info for task_info in self.task_queue.ordered()
+                  if self.tasks.get_status(task_info["id"]) == "en cola"]
+        waits = sorted(self.queue_wait_times)
+        return {
+            "depth": len(queued),
+            "max_depth": self.max_queue_depth,
+            "policy": self.queue_full_policy,
+            "oldest_wait": round(max((now - task_info.get("enqueued_at", now) for task_info in queued), default=0), 1),
+            "wait_p50": round(waits[len(waits) // 2], 1) if waits else 0,
+            "wait_max": round(waits[-1], 1) if waits else 0,
+            "rejected": self.rejected_tasks,
+            "dropped": self.dropped_tasks,
+        }
+
+    def _task_settings(self, task_info: Dict[str, Any]) -> Dict[str, Any]:
+        """Settings that change a task's outcome; only tasks with equal settings are coalesced."""
+        return {
+            "llm_provider": self.task_llm_provider,
+            "model_name": self.task_model_name,
+            "browser_mode": task_info.get("browser_mode") or self.get_browser_mode(),
+        }
+
+    def _finish_task(self, task_info: Dict[str, Any], result: Dict[str, Any]):
+        """Release the task's coalescing key and hand its result to everyone waiting on it."""
+        task_id = task_info["id"]
+        key = task_info.get("coalesce_key")
+        if key and self._inflight_tasks.get(key) == task_id:
+            del self._inflight_tasks[key]
+        self.task_attached.pop(task_id, None)
+        submitter = task_info.get("submitter")
+        if submitter and self._submitter_active.get(submitter):
+            self._submitter_active[submitter] -= 1
+            if not self._submitter_active[submitter]:
+                del self._submitter_active[submitter]
+        self._task_results[task_id] = result
+        while len(self._task_results) > MAX_KEPT_RESULTS:
+            self._task_results.popitem(last=False)
+        for waiter in self._task_waiters.pop(task_id, []):
+            if not waiter.done():
+                waiter.set_result(result)
+
+    async def wait_for_task(self, task_id: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Wait for a task (or the task a duplicate was attached to) to finish and return its result."""
+        if task_id in self._task_results:
+            return self._task_results[task_id]
+        if not self.tasks.is_active(task_id):
+            return {"status": self.tasks.get_status(task_id, "desconocida"), "success": False}
+        waiter = asyncio.get_running_loop().create_future()
+        self._task_waiters.setdefault(task_id, []).append(waiter)
+        try:
+            return await asyncio.wait_for(asyncio.shield(waiter), timeout=timeout)
+        finally:
+            if not waiter.done():
+                waiters = self._task_waiters.get(task_id, [])
+                if waiter in waiters:
+                    waiters.remove(waiter)
+
+    def _set_status(self, task_id: str, status: str, result: Optional[Any] = None, new_attempt: bool = False):
+        """Set a task's status and persist it."""
+        was_queued = self.tasks.get_status(task_id) == "en cola"
+        self.tasks.set_status(task_id, status)
+        if self.task_store:
+            self.task_store.update(task_id, status, result=result, new_attempt=new_attempt)
+        if was_queued and status != "en cola":
+            self._queue_space.set()  # queue_depth counts queued tasks: wake submitters blocked on a full queue
+
+    def _restore_tasks(self):
+        """Queue the tasks that were queued or running when the web UI last stopped."""
+        if not self.task_store:
+            return
+        tasks = self.task_store.recover()
+        for task_info in tasks:
+            self.task_queue.put_nowait(task_info)
+            self.tasks.add(task_info["id"], task_info["description"])
+            if task_info.get("coalesce_key"):
+                self._inflight_tasks[task_info["coalesce_key"]] = task_info["id"]
+            if task_info.get("submitter"):
+                submitter = task_info["submitter"]
+                self._submitter_active[submitter] = self._submitter_active.get(submitter, 0) + 1
+        if tasks:
+            print(f"Restauradas {len(tasks)} tareas pendientes de la ejecución anterior.")
+
+    def clear_tasks(self):
+        """Forget all task states, in memory and in the task store."""
+        self.tasks.clear()
+        self._queue_space.set()
+        self._inflight_tasks.clear()
+        self._submitter_active.clear()
+        self.task_attached.clear()
+        self._task_results.clear()
+        for waiters in self._task_waiters.values():
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_result({"status": "detenida", "success": False})
+        self._task_waiters.clear()
+        if self.task_store:
+            self.task_store.clear()
+
+    def _on_task_expired(self, task_info: Dict[str, Any]):
+        task_id = task_info["id"]
+        if self.tasks.get_status(task_id) == "en cola":
+            self._set_status(task_id, "expirada")
+            print(f"Tarea {task_id} expirada antes de empezar, descartada.")
+        self._finish_task(task_info, {"status": "expirada", "task": task_info.get("description"), "success": False})
+
+    async def pause_task(self, task_id: Optional[str] = None):
+        """Pause a running task (the current one when no id is given)."""
+        worker = self.get_worker(task_id)
+        if worker and self.tasks.get_status(worker.task_id) == "ejecutando":
+            worker.pause_event.clear()  # Signal pause
+            if worker.agent:
+                await worker.agent.pause()
+            self._set_status(worker.task_id, "pausada")
+            print(f"Tarea {worker.task_id} pausada.")
         else:
             print("No hay tarea en ejecución para pausar.")
 
-    async def resume_current_task(self):
-        """Resume the currently paused task."""
-        if self.current_task_id and self.task_status.get(self.current_task_id) == "pausada":
-            self.pause_event.set()  # Signal resume
-            self.task_status[self.current_task_id] = "ejecutando"
-            print(f"Tarea {self.current_task_id} reanudada.")
+    async def resume_task(self, task_id: Optional[str] = None):
+        """Resume a paused task (the current one when no id is given)."""
+        worker = self.get_worker(task_id)
+        if worker and self.tasks.get_status(worker.task_id) == "pausada":
+            worker.pause_event.set()  # Signal resume
+            if worker.agent:
+                await worker.agent.resume()
+            self._set_status(worker.task_id, "ejecutando")
+            print(f"Tarea {worker.task_id} reanudada.")
         else:
             print("No hay tarea pausada para reanudar.")
 
+    async def pause_current_task(self):
+        """Pause the currently running task."""
+        await self.pause_task()
+
+    async def resume_current_task(self):
+        """Resume the currently paused task."""
+        await self.resume_task()
+
     async def stop_task(self, task_id: Optional[str] = None):
         """Stop a specific task or the current task."""
-        if task_id is None:  # Stop current task
-            if self.current_task_id:
-                task_to_stop_id = self.current_task_id
-                if self.current_task_future:
-                    self.stop_event.set()  # Signal stop
-                    # Wait briefly for task to respond to stop signal
-                    try:
-                        await asyncio.wait_for(self.current_task_future, timeout=1)
-                    except asyncio.TimeoutError:
-                        print(f"La tarea {task_to_stop_id} no respondió a la señal de detención, cancelando forzosamente.")
-                        self.current_task_future.cancel()
-                    except asyncio.CancelledError:
-                        print(f"La tarea {task_to_stop_id} fue cancelada.")
-                    finally:
-                        self.task_status[task_to_stop_id] = "detenida"
-                        self.current_task_id = None
-                        self.current_task_future = None
-                        self.stop_event.clear()
-                        self.pause_event.set()
-                        print(f"Tarea {task_to_stop_id} detenida.")
-            else:
-                print("No hay tarea en ejecución para detener.")
-        else:  # Stop specific task in queue
-            if self.task_status.get(task_id) == "en cola":
-                self.task_status[task_id] = "detenida"
-                print(f"Tarea {task_id} eliminada de la cola.")
-            else:
-                print(f"La tarea {task_id} no está en cola o en ejecución para detener.")
+        worker = self.get_worker(task_id)
+        if worker:
+            task_to_stop_id = worker.task_id
+            future = worker.future
+            worker.stop_event.set()  # Signal stop
+            worker.pause_event.set()
+            if worker.agent:
+                await worker.agent.stop()
+            if future:
+                # Wait briefly for task to respond to stop signal
+                try:
+                    await asyncio.wait_for(future, timeout=1)
+                except asyncio.TimeoutError:
+                    print(f"La tarea {task_to_stop_id} no respondió a la señal de detención, cancelando forzosamente.")
+                    future.cancel()
+                except asyncio.CancelledError:
+                    print(f"La tarea {task_to_stop_id} fue cancelada.")
+                except Exception:
+                    pass
+            # The worker resets its own state before taking the next task
+            self._set_status(task_to_stop_id, "detenida")
+            print(f"Tarea {task_to_stop_id} detenida.")
+        elif task_id is None:
+            print("No hay tarea en ejecución para detener.")
+        elif self.tasks.get_status(task_id) == "en cola":  # Stop specific task in queue
+            self._set_status(task_id, "detenida")
+            print(f"Tarea {task_id} eliminada de la cola.")
+        else:
+            print(f"La tarea {task_id} no está en cola o en ejecución para detener.")
+
+    async def stop_all_tasks(self):
+        """Stop every running task."""
+        await asyncio.gather(*(self.stop_task(worker.task_id) for worker in self.running_workers))
 
     async def handle_user_input(self, user_message: str) -> Tuple[str, List[List[str]]]:
         """Handle user input - either control commands or new tasks."""
@@ -226,45 +525,61 @@ class WebuiManager:
             return "", self.bu_chat_history
 
     def get_queue_display_text(self) -> str:
-        """Get formatted text for task queue display."""
+        """Get formatted text for task queue display (only looks at active tasks)."""
+        task_workers = {worker.task_id: worker.worker_id for worker in self.workers if worker.task_id}
         queue_contents = []
-        for task_id, status in self.task_status.items():
-            description = self.task_descriptions.get(task_id, "Sin descripción")[:50]
-            if status == "en cola":
-                queue_contents.append(f"- {description}... ({task_id[:8]}): {status}")
-            elif status == "ejecutando":
-                queue_contents.append(f"- {description}... ({task_id[:8]}): {status} (Actual)")
-            elif status == "pausada":
-                queue_contents.append(f"- {description}... ({task_id[:8]}): {status} (Actual)")
-
-        return "\n".join(queue_contents) if queue_contents else "No hay tareas en cola."
+        for task_id in self.tasks.ids_in("ejecutando", "pausada"):
+            description = self.tasks.get_description(task_id, "Sin descripción")[:50]
+            worker_text = f"Worker {task_workers[task_id]}" if task_id in task_workers else "Actual"
+            queue_contents.append(
+                f"- {description}... ({task_id[:8]}): {self.tasks.get_status(task_id)} ({worker_text})"
+            )
+        # Queued tasks are listed in the order the scheduler will run them
+        for task_info in self.task_queue.ordered():
+            task_id = task_info["id"]
+            if self.tasks.get_status(task_id) == "en cola":
+                description = self.tasks.get_description(task_id, "Sin descripción")[:50]
+                queue_contents.append(f"- {description}... ({task_id[:8]}): en cola")
+
+        if not queue_contents:
+            return "No hay tareas en cola."
+        metrics = self.get_queue_metrics()
+        depth_text = f"{metrics['depth']}/{metrics['max_depth']}" if metrics["max_depth"] else str(metrics["depth"])
+        queue_contents.append(
+            f"Cola: {depth_text} · espera p50 {metrics['wait_p50']}s, máx {metrics['wait_max']}s · "
+            f"más antigua {metrics['oldest_wait']}s"
+        )
+        return "\n".join(queue_contents)
 
     def is_pause_button_active(self) -> bool:
         """Check if pause button should be active."""
         return (self.current_task_id is not None and
-                self.task_status.get(self.current_task_id) == "ejecutando")
+                self.tasks.get_status(self.current_task_id) == "ejecutando")
 
     def is_stop_button_active(self) -> bool:
         """Check if stop button should be active."""
         return (self.current_task_id is not None and
-                self.task_status.get(self.current_task_id) in ["ejecutando", "pausada"])
+                self.tasks.get_status(self.current_task_id) in ["ejecutando", "pausada"])
 
     async def start_task_processor(self):
-        """Start the task processor loop."""
-        if self.task_processor_task is None or self.task_processor_task.done():
-            self.task_processor_task = asyncio.create_task(self._task_processor_loop())
+        """Start one task processor loop per worker."""
+        for worker in self.workers:
+            if worker.loop_task is None or worker.loop_task.done():
+                worker.loop_task = asyncio.create_task(self._task_processor_loop(worker))
 
     async def stop_task_processor(self):
-        """Stop the task processor loop."""
-        if self.task_processor_task and not self.task_processor_task.done():
-            self.task_processor_task.cancel()
-            try:
-                await self.task_processor_task
-            except asyncio.CancelledError:
-                pass
+        """Stop the task processor loops."""
+        for worker in self.workers:
+            if worker.loop_task and not worker.loop_task.done():
+                worker.loop_task.cancel()
+                try:
+                    await worker.loop_task
+                except asyncio.CancelledError:
+                    pass
+            worker.loop_task = None
 
-    async def _task_processor_loop(self):
-        """Main task processor loop that handles tasks from the queue."""
+    async def _task_processor_loop(self, worker: TaskWorker):
+        """Worker loop that takes tasks from the shared queue; the workers run concurrently."""
         while True:
             try:
                 task_info = await self.task_queue.get()
@@ -272,55 +587,260 @@ class WebuiManager:
                 task_description = task_info["description"]
                 task_type = task_info["type"]
 
-                if self.task_status.get(task_id) == "detenida":
+                # Stopped (or cleared) while queued; finished tasks may already have left the history
+                if self.tasks.get_status(task_id) != "en cola":
                     print(f"Saltando tarea detenida: {task_id}")
                     self.task_queue.task_done()
+                    self._finish_task(task_info, {"status": "detenida", "task": task_description, "success": False})
+                    continue
+
+                # A cached result needs neither the browser nor LLM quota
+                cached = await self._get_cached_result(task_info, worker)
+                if cached is not None:
+                    self.queue_wait_times.append(time.time() - task_info.get("enqueued_at", time.time()))
+                    self._set_status(task_id, "completada", result=cached)
+                    print(f"⚡ Tarea {task_id} respondida desde la caché de resultados.")
+                    self.task_queue.task_done()
+                    self._finish_task(task_info, cached)
                     continue
 
-                self.current_task_id = task_id
-                self.task_status[task_id] = "ejecutando"
-                self.stop_event.clear()
-                self.pause_event.set()
+                # Admission control: only start when the provider quota has room for one more task
+                limiter = get_rate_limiter(self.task_llm_provider, self.task_model_name)
+                if not limiter.has_headroom():
+                    print(f"⏳ Tarea {task_id} esperando margen de cuota de {self.task_llm_provider}: "
+                          f"{limiter.get_metrics()}")
+                # Waiting for quota must not outlive the deadline the queue already checked
+                deadline = task_info.get("deadline")
+                try:
+                    await asyncio.wait_for(limiter.admit(),
+                                           timeout=None if deadline is None else max(0.0, deadline - time.time()))
+                except asyncio.TimeoutError:
+                    self.task_queue.task_done()
+                    self._on_task_expired(task_info)
+                    continue
+                if self.tasks.get_status(task_id) != "en cola":
+                    limiter.release()
+                    self.task_queue.task_done()
+                    self._finish_task(task_info, {"status": "detenida", "task": task_description, "success": False})
+                    continue
+
+                self.queue_wait_times.append(time.time() - task_info.get("enqueued_at", time.time()))
+                worker.reset()
+                worker.task_id = task_id
+                worker.started_at = time.monotonic()
+                self._set_status(task_id, "ejecutando", new_attempt=True)
 
-                print(f"Iniciando tarea: {task_description} ({task_id})")
+                print(f"Iniciando tarea: {task_description} ({task_id}) en worker {worker.worker_id}")
 
+                result = None
                 try:
                     # Execute actual browser automation task
-                    self.current_task_future = asyncio.create_task(
-                        self._execute_browser_task(task_id, task_description)
+                    worker.future = asyncio.create_task(
+                        self._execute_browser_task(task_id, task_description, worker,
+                                                   cache_ttl=task_info.get("cache_ttl"))
                     )
-                    result = await self.current_task_future
+                    result = await worker.future
 
-                    if self.task_status.get(task_id) != "detenida":
+                    if self.tasks.get_status(task_id) != "detenida":
                         if result.get("success", False):
-                            self.task_status[task_id] = "completada"
+                            self._set_status(task_id, "completada", result=result)
                             print(f"Tarea {task_id} completada exitosamente.")
                         else:
-                            self.task_status[task_id] = "fallida"
+                            self._set_status(task_id, "fallida", result=result)
                             print(f"Tarea {task_id} falló: {result.get('error', 'Error desconocido')}")
 
                 except asyncio.CancelledError:
+                    if not worker.stop_event.is_set():
+                        raise  # The worker loop itself is being cancelled
                     print(f"Tarea {task_id} fue cancelada externamente.")
-                    self.task_status[task_id] = "detenida"
+                    self._set_status(task_id, "detenida")
                 except Exception as e:
                     print(f"Error ejecutando tarea {task_id}: {e}")
-                    self.task_status[task_id] = "fallida"
+                    self._set_status(task_id, "fallida")
+                    result = {"status": "failed", "task": task_description, "error": str(e), "success": False}
                 finally:
+                    limiter.release()
                     self.task_queue.task_done()
-                    self.current_task_id = None
-                    self.current_task_future = None
-                    self.stop_event.clear()
-                    self.pause_event.set()
+                    worker.reset()
+                    if self.tasks.get_status(task_id) == "detenida" or result is None:
+                        result = {"status": "detenida", "task": task_description, "success": False}
+                    self._finish_task(task_info, result)
 
             except asyncio.CancelledError:
-                print("Task processor loop cancelled.")
+                print(f"Task processor loop {worker.worker_id} cancelled.")
                 break
             except Exception as e:
                 print(f"Error in task processor loop: {e}")
                 await asyncio.sleep(1)  # Brief pause before continuing
 
-    async def _execute_browser_task(self, task_id: str, description: str) -> dict:
+    # Warm-up Methods
+    def start_prewarm(self) -> asyncio.Task:
+        """Start the warm-up in the background (once) and return its task."""
+        if self.prewarm_task is None:
+            # Shown as pending right away, the steps update it as they finish
+            self.prewarm_status = dict.fromkeys(("browser", "llm", "mcp"), "pendiente")
+            self.prewarm_task = asyncio.create_task(self.prewarm())
+        return self.prewarm_task
+
+    async def prewarm(self) -> Dict[str, str]:
+        """
+        Launch the browser, build the task LLM client and connect MCP servers concurrently,
+        so the first task does not pay for them one after another.
+        """
+        print("🔥 Precalentando navegador, LLM y MCP...")
+        start = time.monotonic()
+        await asyncio.gather(
+            self._prewarm_step("browser", self._prewarm_browsers),
+            self._prewarm_step("llm", self._prewarm_llm),
+            self._prewarm_step("mcp", self._prewarm_mcp),
+        )
+        print(f"🔥 Precalentamiento terminado en {time.monotonic() - start:.1f}s: {self.prewarm_status}")
+        return self.prewarm_status
+
+    async def _prewarm_step(self, name: str, step):
+        self.prewarm_status[name] = "pendiente"
+        start = time.monotonic()
+        try:
+            await step()
+            self.prewarm_status[name] = f"listo ({time.monotonic() - start:.1f}s)"
+        except Exception as e:
+            # A failed step is simply done lazily by the first task
+            self.prewarm_status[name] = f"error: {e}"
+            print(f"Error en el precalentamiento de {name}: {e}")
+
+    async def wait_for_prewarm(self):
+        """Wait for a running warm-up so a task does not launch a second browser next to it."""
+        if self.prewarm_task and not self.prewarm_task.done():
+            await asyncio.shield(self.prewarm_task)
+
+    def is_prewarmed(self) -> bool:
+        return self.prewarm_task is not None and self.prewarm_task.done()
+
+    def get_prewarm_status_text(self) -> str:
+        """Get formatted text for the warm-up readiness display."""
+        if not self.prewarm_status:
+            return "Precalentamiento desactivado."
+        header = "Precalentamiento terminado:" if self.is_prewarmed() else "Precalentando..."
+        return "\n".join([header, *(f"- {name}: {status}" for name, status in self.prewarm_status.items())])
+
+    def _get_browser_setting(self, key: str, default: Any = None) -> Any:
+        """Get a browser setting from the browser settings tab, falling back to `default`."""
+        component = self.id_to_component.get(f"browser_settings.{key}")
+        value = getattr(component, "value", None) if component else None
+        return default if value is None or value == "" else value
+
+    def _worker_browser(self, worker: TaskWorker):
+        """Return the worker's browser for queued tasks, creating it (not launching it) if needed."""
+        from browser_use.browser.browser import BrowserConfig
+        from browser_use.browser.context import BrowserContextConfig
+        from src.browser.browser_watchdog import get_browser_watchdog
+        from src.browser.custom_browser import CustomBrowser
+        from src.browser.http_cache import get_http_cache
+        from src.browser.resource_policy import ResourcePolicy
+        from src.browser.storage_state_cache import get_storage_state_cache
+
+        if worker.browser is None:
+            window_w = int(self._get_browser_setting("window_w", 1280))
+            window_h = int(self._get_browser_setting("window_h", 1100))
+            worker.browser = CustomBrowser(
+                config=BrowserConfig(
+                    headless=self._get_browser_setting("headless", False),
+                    disable_security=self._get_browser_setting("disable_security", False),
+                    new_context_config=BrowserContextConfig(window_width=window_w, window_height=window_h),
+                ),
+                resource_policy=ResourcePolicy.from_settings(
+                    self._get_browser_setting("lean_mode", False),
+                    self._get_browser_setting("lean_mode_allowed_domains"),
+                ),
+                storage_state_cache=get_storage_state_cache() if self._get_browser_setting("reuse_logins", False) else None,
+                launch_profile=self._get_browser_setting("launch_profile"),
+                http_cache=get_http_cache() if self._get_browser_setting("http_cache", False) else None,
+            )
+            get_browser_watchdog().track(worker.browser)
+        return worker.browser
+
+    async def _ensure_browser(self, worker: Optional[TaskWorker] = None):
+        """Return the worker's browser for queued tasks, launching it if needed."""
+        browser = self._worker_browser(worker or self.workers[0])
+        # Starts Playwright and Chromium on first call, a no-op afterwards
+        await browser.get_playwright_browser()
+        return browser
+
+    async def _prewarm_browsers(self):
+        await asyncio.gather(*(self._ensure_browser(worker) for worker in self.workers))
+
+    async def close_worker_browsers(self):
+        """Close the workers' browsers, e.g. after browser settings changed; they relaunch on the next task."""
+        for worker in self.workers:
+            browser, worker.browser = worker.browser, None
+            # A busy worker's browser is detached here and closed when its task ends
+            if browser and not worker.task_id:
+                try:
+                    await browser.close()
+                except Exception as e:
+                    print(f"Error cerrando el navegador del worker {worker.worker_id}: {e}")
+
+    def _get_task_llm(self):
+        """The queued tasks' LLM; get_llm_model memoizes it, so the warm-up and every task share one client."""
+        from src.utils.llm_provider import get_llm_model
+        return get_llm_model(self.task_llm_provider, model_name=self.task_model_name)
+
+    async def _prewarm_llm(self):
+        # Importing the LLM stack and building the client are both slow, keep them off the event loop
+        await asyncio.to_thread(self._get_task_llm)
+
+    async def _prewarm_mcp(self):
+        mcp_config_path = os.getenv("MCP_SERVER_CONFIG", "")
+        if not mcp_config_path or not os.path.exists(mcp_config_path):
+            return
+        from src.controller.custom_controller import CustomController
+        with open(mcp_config_path, "r") as f:
+            mcp_server_config = json.load(f)
+        controller = CustomController()
+        await controller.setup_mcp_client(mcp_server_config)
+        self.bu_controller = controller
+
+    async def _recycle_browser_if_needed(self, worker: TaskWorker, browser: Any):
+        """Count a finished task against the worker's browser and close it when the watchdog says so."""
+        from src.browser.browser_watchdog import get_browser_watchdog
+
+        browser_watchdog = get_browser_watchdog()
+        browser_watchdog.record_task(browser)
+        if browser is not worker.browser:
+            # Detached by close_worker_browsers() while the task was running
+            await browser.close()
+            return
+        recycle_reason = browser_watchdog.check(browser)
+        if recycle_reason:
+            browser_watchdog.record_recycle(browser, recycle_reason)
+            worker.browser = None
+            await browser.close()
+
+    async def _get_cached_result(self, task_info: Dict[str, Any], worker: TaskWorker) -> Optional[Dict[str, Any]]:
+        """Cached result of a read-only task (one with a cache_ttl), looked up before anything is launched."""
+        if not resolve_cache_ttl(task_info.get("cache_ttl")):
+            return None
+        from src.agent.browser_use.browser_use_agent import task_cache_settings
+
+        vnc_enabled = self.get_browser_mode() == "vnc"
+        # The key only reads the browser's settings; the browser is created here but not launched
+        browser = None if vnc_enabled else self._worker_browser(worker)
+        settings = task_cache_settings(self.task_llm_provider, self.task_model_name, vnc_enabled, browser)
+        try:
+            cached = await asyncio.to_thread(
+                get_result_cache().get, result_cache_key(task_info["description"], settings)
+            )
+        except Exception as e:
+            print(f"Error leyendo la caché de resultados: {e}")
+            return None
+        return {**cached, "cached": True} if cached is not None else None
+
+    async def _execute_browser_task(self, task_id: str, description: str, worker: Optional[TaskWorker] = None,
+                                    cache_ttl: Union[bool, float, None] = None) -> dict:
         """Execute actual browser automation task using BrowserUseAgent."""
+        worker = worker or self.workers[0]
+        browser = None
+        browser_context = None
         try:
             # Import the browser agent
             from src.agent.browser_use.browser_use_agent import BrowserUseAgent
@@ -329,26 +849,41 @@ class WebuiManager:
             browser_mode = self.get_browser_mode()
             vnc_enabled = (browser_mode == "vnc")
 
+            # Reuse the warmed-up browser, LLM and MCP controller; the VNC display needs its own browser
+            await self.wait_for_prewarm()
+            if not vnc_enabled:
+                browser = await self._ensure_browser(worker)
+                # The task's own CustomBrowserContext, kept here so its logins can be saved afterwards
+                browser_context = await browser.new_context(config=browser.config.new_context_config)
+            llm = await asyncio.to_thread(self._get_task_llm)
+
             # Create agent instance with vision-capable model and VNC support
             agent = BrowserUseAgent(
-                llm_provider="openai",
-                model_name="gpt-4o",
-                enable_vnc=vnc_enabled
+                llm_provider=self.task_llm_provider,
+                model_name=self.task_model_name,
+                enable_vnc=vnc_enabled,
+                llm=llm,
+                browser=browser,
+                browser_context=browser_context,
+                controller=getattr(self, "bu_controller", None),
             )
+            worker.agent = agent
 
             print(f"🖥️ Browser mode: {'VNC Viewer' if vnc_enabled else 'PC Browser'}")
 
             print(f"🚀 Iniciando ejecución de tarea {task_id}: {description}")
 
-            # Execute the task with browser automation
-            result = await agent.execute_task(description, max_steps=20)
+            # Execute the task with browser automation; the worker loop already looked the result cache up
+            result = await agent.execute_task(description, max_steps=20, cache_ttl=cache_ttl, lookup_cache=False)
 
-            # Check for stop/pause during execution
-            if self.stop_event.is_set():
+            # stop_task() already stopped the agent between steps (or cancelled its run)
+            if worker.stop_event.is_set():
                 print(f"Tarea {task_id} detenida por solicitud del usuario.")
-                await agent.stop()
                 raise asyncio.CancelledError("Tarea detenida por el usuario")
 
+            if browser_context is not None and result.get("is_successful"):
+                # Keep the logged-in session so the next task can skip the login steps
+                await browser_context.save_storage_state()
             print(f"✅ Tarea {task_id} completada: {result.get('status', 'unknown')}")
             return result
 
@@ -363,6 +898,14 @@ class WebuiManager:
                 "error": str(e),
                 "success": False
             }
+        finally:
+            if browser_context is not None:
+                try:
+                    await browser_context.close()
+                except Exception as e:
+                    print(f"Error cerrando el contexto del navegador de la tarea {task_id}: {e}")
+            if browser is not None:
+                await self._recycle_browser_if_needed(worker, browser)
 
     def get_browser_mode(self) -> str:
         """Get current browser mode from UI components"""
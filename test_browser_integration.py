@@ -66,7 +66,7 @@ async def test_task_queue_integration():
         await asyncio.sleep(5)
         
         # Check task status
-        status = manager.task_status.get(task_id, "unknown")
+        status = manager.tasks.get_status(task_id, "unknown")
         print(f"📊 Task status: {status}")
         
         # Stop task processor
@@ -65,8 +65,9 @@ async def test_task_queue():
     
     # Check final status
     print("\nFinal Task Status:")
-    for task_id, status in manager.task_status.items():
-        description = manager.task_descriptions.get(task_id, "Unknown")
+    for task_id in manager.tasks:
+        status = manager.tasks.get_status(task_id)
+        description = manager.tasks.get_description(task_id, "Unknown")
         print(f"  {task_id[:8]}: {status} - {description}")
     
     # Stop the task processor
@@ -0,0 +1,127 @@
+import asyncio
+import sys
+
+sys.path.append(".")
+
+from src.browser.browser_pool import BrowserPool
+from src.browser.browser_watchdog import BrowserWatchdog
+
+
+class FakePlaywrightBrowser:
+    def __init__(self):
+        self.connected = True
+
+    def is_connected(self):
+        return self.connected
+
+
+class FakeBrowser:
+    remote_debugging_port = None
+
+    def __init__(self):
+        self.playwright_browser = None
+        self.closed = False
+
+    async def get_playwright_browser(self):
+        self.playwright_browser = FakePlaywrightBrowser()
+        return self.playwright_browser
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeFactory:
+    def __init__(self):
+        self.launched = []
+
+    def __call__(self):
+        browser = FakeBrowser()
+        self.launched.append(browser)
+        return browser
+
+
+def _pool(max_size=2, idle_timeout=300):
+    return BrowserPool(max_size=max_size, idle_timeout=idle_timeout,
+                       watchdog=BrowserWatchdog(max_tasks=0, max_age=0, max_rss_mb=0))
+
+
+def test_checkin_returns_browser_for_reuse():
+    async def run():
+        pool = _pool()
+        factory = FakeFactory()
+        first = await pool.checkout("default", factory)
+        await pool.checkin(first)
+        assert pool.idle_count == 1
+
+        second = await pool.checkout("default", factory)
+        other = await pool.checkout("headless", factory)
+        await pool.close()
+        return first, second, other, factory
+
+    first, second, other, factory = asyncio.run(run())
+    assert second is first
+    assert other is not first
+    assert len(factory.launched) == 2
+    assert not first.closed
+
+
+def test_idle_browsers_are_reaped():
+    async def run():
+        pool = _pool(idle_timeout=0.01)
+        factory = FakeFactory()
+        browser = await pool.checkout("default", factory)
+        await pool.checkin(browser)
+        await asyncio.sleep(0.05)
+        await pool.evict_idle()
+        idle_count = pool.idle_count
+        await pool.close()
+        return browser, idle_count
+
+    browser, idle_count = asyncio.run(run())
+    assert idle_count == 0
+    assert browser.closed
+
+
+def test_unhealthy_browsers_are_closed():
+    async def run():
+        pool = _pool()
+        factory = FakeFactory()
+        # Reported unhealthy by the caller
+        failed = await pool.checkout("default", factory)
+        await pool.checkin(failed, healthy=False)
+
+        # Disconnected while idle in the pool
+        disconnected = await pool.checkout("default", factory)
+        await pool.checkin(disconnected)
+        disconnected.playwright_browser.connected = False
+        replacement = await pool.checkout("default", factory)
+        size = pool.size
+        await pool.close()
+        return failed, disconnected, replacement, size
+
+    failed, disconnected, replacement, size = asyncio.run(run())
+    assert failed.closed
+    assert disconnected.closed
+    assert replacement is not disconnected and not replacement.closed
+    assert size == 1
+
+
+def test_checkout_blocks_at_max_size():
+    async def run():
+        pool = _pool(max_size=1)
+        factory = FakeFactory()
+        leased = await pool.checkout("default", factory)
+
+        waiter = asyncio.create_task(pool.checkout("default", factory))
+        await asyncio.sleep(0.05)
+        blocked = not waiter.done()
+
+        await pool.checkin(leased)
+        reused = await asyncio.wait_for(waiter, timeout=1)
+        await pool.close()
+        return leased, reused, blocked, factory
+
+    leased, reused, blocked, factory = asyncio.run(run())
+    assert blocked
+    assert reused is leased
+    assert len(factory.launched) == 1
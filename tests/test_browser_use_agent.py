@@ -0,0 +1,103 @@
+import asyncio
+import sys
+
+sys.path.append(".")
+
+import pytest
+
+from src.agent.browser_use import browser_use_agent
+from src.agent.browser_use.browser_use_agent import BrowserUseAgent
+
+
+class FakeHistory:
+    def is_done(self):
+        return True
+
+    def is_successful(self):
+        return True
+
+    def final_result(self):
+        return "done"
+
+
+class FakeAgent:
+    """Runs `max_steps` steps of 20 ms; like browser-use, stop() is checked before each step."""
+    instances = []
+
+    def __init__(self, task, llm, **kwargs):
+        self.steps = 0
+        self.stopped = False
+        FakeAgent.instances.append(self)
+
+    async def run(self, max_steps, on_step_start=None):
+        for _ in range(max_steps):
+            if self.stopped:
+                break
+            if on_step_start is not None:
+                await on_step_start(self)
+            await asyncio.sleep(0.02)
+            self.steps += 1
+        return FakeHistory()
+
+    def stop(self):
+        self.stopped = True
+
+    def pause(self):
+        raise AssertionError("Agent.pause() waits for resume with a blocking input()")
+
+    def resume(self):
+        raise AssertionError("Agent.resume() relaunches the browser")
+
+
+@pytest.fixture
+def agent(monkeypatch):
+    FakeAgent.instances = []
+    monkeypatch.setattr(browser_use_agent, "Agent", FakeAgent)
+    return BrowserUseAgent(llm=object(), track_usage=False)
+
+
+def test_pause_holds_the_run_until_resume(agent):
+    async def run():
+        task = asyncio.create_task(agent.execute_task("Buscar el clima", max_steps=10))
+        await asyncio.sleep(0.05)
+        await agent.pause()
+        await asyncio.sleep(0.05)
+        steps_at_pause = FakeAgent.instances[0].steps
+        await asyncio.sleep(0.1)
+        paused_steps = FakeAgent.instances[0].steps - steps_at_pause
+        assert agent.get_status()["is_paused"]
+        await agent.resume()
+        return paused_steps, await asyncio.wait_for(task, timeout=1)
+
+    paused_steps, result = asyncio.run(run())
+    assert paused_steps == 0
+    assert result["status"] == "completed"
+    assert FakeAgent.instances[0].steps == 10
+
+
+def test_stop_while_running(agent):
+    async def run():
+        task = asyncio.create_task(agent.execute_task("Buscar el clima", max_steps=100))
+        await asyncio.sleep(0.05)
+        await agent.stop()
+        return await asyncio.wait_for(task, timeout=1)
+
+    result = asyncio.run(run())
+    assert result["status"] == "stopped"
+    assert FakeAgent.instances[0].stopped
+    assert FakeAgent.instances[0].steps < 100
+
+
+def test_stop_while_paused(agent):
+    async def run():
+        task = asyncio.create_task(agent.execute_task("Buscar el clima", max_steps=100))
+        await asyncio.sleep(0.05)
+        await agent.pause()
+        await asyncio.sleep(0.05)
+        # A paused run is cancelled right away instead of waiting for the grace period
+        await asyncio.wait_for(agent.stop(grace_period=10), timeout=1)
+        return await asyncio.wait_for(task, timeout=1)
+
+    result = asyncio.run(run())
+    assert result["status"] == "stopped"
+    assert not agent.get_status()["is_paused"]
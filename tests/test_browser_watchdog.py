@@ -0,0 +1,56 @@
+import sys
+
+sys.path.append(".")
+
+from src.browser.browser_watchdog import BrowserWatchdog
+
+
+class FakeBrowser:
+    remote_debugging_port = None
+
+
+def test_recycle_after_max_tasks():
+    watchdog = BrowserWatchdog(max_tasks=2, max_age=0, max_rss_mb=0)
+    browser = FakeBrowser()
+    watchdog.track(browser)
+
+    watchdog.record_task(browser)
+    assert watchdog.check(browser) is None
+    watchdog.record_task(browser)
+    assert watchdog.check(browser) == "max_tasks"
+
+    watchdog.record_recycle(browser, "max_tasks")
+    assert watchdog.get_metrics() == {"tracked_browsers": 0, "recycles": {"max_tasks": 1}}
+
+
+def test_recycle_after_max_age():
+    watchdog = BrowserWatchdog(max_tasks=0, max_age=0.01, max_rss_mb=0)
+    browser = FakeBrowser()
+    watchdog.track(browser)
+    watchdog._stats[browser].started_at -= 1
+
+    assert watchdog.check(browser) == "max_age"
+
+
+def test_unknown_rss_never_triggers_recycle():
+    watchdog = BrowserWatchdog(max_tasks=0, max_age=0, max_rss_mb=1)
+    browser = FakeBrowser()
+
+    assert watchdog.get_rss_mb(browser) is None
+    assert watchdog.check(browser) is None
+    assert watchdog.check(None) is None
+
+
+def test_pipe_mode_warns_that_rss_recycling_is_off(caplog):
+    import pytest
+
+    pytest.importorskip("psutil")
+    watchdog = BrowserWatchdog(max_tasks=0, max_age=0, max_rss_mb=1)
+    browser = FakeBrowser()
+    browser.playwright_browser = object()  # launched, but over a pipe
+    watchdog.track(browser)
+
+    with caplog.at_level("WARNING", logger="src.browser.browser_watchdog"):
+        assert watchdog.check(browser) is None
+        assert watchdog.check(browser) is None
+    assert len([r for r in caplog.records if "BROWSER_DEBUGGING_PORT=pipe" in r.getMessage()]) == 1
@@ -0,0 +1,108 @@
+import argparse
+import asyncio
+import json
+import sys
+
+sys.path.append(".")
+
+from src.cli import completed_lines, read_tasks
+
+
+def test_read_tasks_streams_from_offset(tmp_path):
+    path = tmp_path / "tasks.jsonl"
+    path.write_text("\n".join([
+        json.dumps({"id": "a", "task": "first"}),
+        "plain text task",
+        "",
+        json.dumps({"id": "c", "description": "third"}),
+        json.dumps({"id": "d"}),
+    ]))
+    assert [(line, task.get("id")) for line, task in read_tasks(str(path))] == [(0, "a"), (1, None), (3, "c")]
+    assert [line for line, _ in read_tasks(str(path), offset=1, skip_lines={3})] == [1]
+
+
+def test_completed_lines(tmp_path):
+    path = tmp_path / "results.jsonl"
+    assert completed_lines(str(path)) == set()
+    path.write_text(json.dumps({"line": 0}) + "\n" + json.dumps({"line": 4}) + "\n{broken\n")
+    assert completed_lines(str(path)) == {0, 4}
+
+
+class FakeHistory:
+    def is_done(self):
+        return True
+
+    def is_successful(self):
+        return True
+
+    def final_result(self):
+        return "done"
+
+
+def _run_batch(tmp_path, monkeypatch, concurrency=2, tasks=2, **overrides):
+    """Run cli.run_batch with fake agents and a fake Chromium launch; returns (failures, agent kwargs, launches)."""
+    from src import cli
+    from src.agent.browser_use import browser_use_agent
+    from src.browser.custom_browser import CustomBrowser
+
+    received = []
+    launches = []
+
+    class FakePlaywrightBrowser:
+        async def close(self):
+            pass
+
+    async def fake_init(self):
+        launches.append(self)
+        await asyncio.sleep(0.01)
+        self.playwright_browser = FakePlaywrightBrowser()
+        return self.playwright_browser
+
+    class FakeAgent:
+        def __init__(self, task, llm, **kwargs):
+            received.append(kwargs)
+            self.browser = kwargs["browser"]
+
+        async def run(self, max_steps, on_step_start=None):
+            await self.browser.get_playwright_browser()
+            return FakeHistory()
+
+    monkeypatch.setattr(CustomBrowser, "_init", fake_init)
+    monkeypatch.setattr(browser_use_agent, "Agent", FakeAgent)
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.delenv("MCP_SERVER_CONFIG", raising=False)
+    path = tmp_path / "tasks.jsonl"
+    path.write_text("".join(json.dumps({"task": f"task {i}"}) + "\n" for i in range(tasks)))
+    args = argparse.Namespace(**{
+        "input": str(path), "output": None, "concurrency": concurrency, "offset": 0, "resume": False,
+        "max_steps": 5, "llm_provider": "openai", "model_name": "gpt-4o", "launch_profile": None,
+        "lean_mode": True, "http_cache": False, "headed": False, **overrides,
+    })
+    return asyncio.run(cli.run_batch(args)), received, launches
+
+
+def test_run_batch_gives_each_agent_a_custom_browser_context(tmp_path, monkeypatch):
+    from src.browser.custom_context import CustomBrowserContext
+
+    failures, received, _ = _run_batch(tmp_path, monkeypatch)
+
+    assert failures == 0
+    contexts = [kwargs["browser_context"] for kwargs in received]
+    assert len(contexts) == 2 and contexts[0] is not contexts[1]
+    assert all(isinstance(context, CustomBrowserContext) for context in contexts)
+    assert all(context.resource_policy is not None for context in contexts)
+
+
+def test_run_batch_launches_the_shared_browser_once(tmp_path, monkeypatch):
+    failures, received, launches = _run_batch(tmp_path, monkeypatch, concurrency=4, tasks=8)
+
+    assert failures == 0
+    assert len(received) == 8
+    assert len(launches) == 1
+
+
+def test_run_batch_rejects_unknown_llm_provider(tmp_path, monkeypatch):
+    import pytest
+
+    with pytest.raises(ValueError, match="Unsupported LLM provider"):
+        _run_batch(tmp_path, monkeypatch, llm_provider="gpt")
@@ -0,0 +1,45 @@
+import asyncio
+import sys
+
+sys.path.append(".")
+
+from src.browser.custom_browser import CHROME_THROUGHPUT_ARGS, CustomBrowser, CustomBrowserConfig
+
+
+class FakeChromium:
+    def __init__(self):
+        self.launch_kwargs = None
+
+    async def launch(self, **kwargs):
+        self.launch_kwargs = kwargs
+        return object()
+
+
+class FakePlaywright:
+    def __init__(self):
+        self.chromium = FakeChromium()
+
+
+def _launch_args(browser):
+    playwright = FakePlaywright()
+    asyncio.run(browser._setup_builtin_browser(playwright))
+    return playwright.chromium.launch_kwargs["args"]
+
+
+def test_launch_profile_from_config_reaches_launch_args():
+    browser = CustomBrowser(config=CustomBrowserConfig(headless=True, launch_profile="throughput"))
+    try:
+        assert browser.launch_profile == "throughput"
+        args = _launch_args(browser)
+        assert all(arg in args for arg in CHROME_THROUGHPUT_ARGS)
+        assert "--window-size=1280,720" in args
+    finally:
+        asyncio.run(browser.close())
+
+
+def test_explicit_launch_profile_wins_over_config():
+    browser = CustomBrowser(config=CustomBrowserConfig(launch_profile="throughput"), launch_profile="default")
+    try:
+        assert not any(arg in _launch_args(browser) for arg in CHROME_THROUGHPUT_ARGS)
+    finally:
+        asyncio.run(browser.close())
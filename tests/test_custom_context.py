@@ -0,0 +1,105 @@
+import asyncio
+import sys
+
+import pytest
+
+sys.path.append(".")
+
+from browser_use.browser.context import BrowserContextConfig, BrowserSession
+from browser_use.browser.views import BrowserError
+
+from src.browser.custom_browser import CustomBrowser
+from src.browser.custom_context import CustomBrowserContext
+
+
+class FakePage:
+    def __init__(self):
+        self.url = "about:blank"
+        self.closed = False
+
+    def on(self, event, handler):
+        pass
+
+    def is_closed(self):
+        return self.closed
+
+    async def goto(self, url):
+        self.url = url
+
+    async def wait_for_load_state(self):
+        pass
+
+    async def title(self):
+        return self.url
+
+    async def close(self):
+        self.closed = True
+
+
+class FakePlaywrightContext:
+    async def new_page(self):
+        return FakePage()
+
+
+def _tab_context():
+    parent = CustomBrowserContext(browser=CustomBrowser(),
+                                  config=BrowserContextConfig(allowed_domains=["example.com"]))
+
+    async def get_shared_session():
+        return BrowserSession(context=FakePlaywrightContext())
+
+    parent.get_shared_session = get_shared_session
+    return parent.new_tab_context()
+
+
+def test_tab_context_enforces_allowed_domains():
+    async def run():
+        tab = _tab_context()
+        await tab.create_new_tab("https://example.com/news")
+        with pytest.raises(BrowserError):
+            await tab.create_new_tab("https://evil.test/")
+        page = await tab.get_current_page()
+        page.url = "https://evil.test/redirected"
+        with pytest.raises(BrowserError):
+            await tab.switch_to_tab(1)
+        await tab.close()
+
+    asyncio.run(run())
+
+
+def test_tab_context_keeps_browser_use_tab_references_in_sync():
+    async def run():
+        tab = _tab_context()
+        first = await tab.get_current_page()
+        await tab.create_new_tab("https://example.com/second")
+        assert tab.agent_current_page is tab.human_current_page is not first
+        await tab.switch_to_tab(0)
+        assert tab.agent_current_page is first and tab.human_current_page is first
+        await tab.close()
+        assert tab.agent_current_page is None
+
+    asyncio.run(run())
+
+
+def test_login_wall_invalidates_storage_state_off_the_event_loop():
+    import threading
+    from types import SimpleNamespace
+
+    invalidated = []
+
+    class FakeStorageStateCache:
+        enabled = True
+
+        def invalidate(self, host):
+            invalidated.append((host, threading.current_thread() is threading.main_thread()))
+
+    context = CustomBrowserContext(browser=CustomBrowser(), config=BrowserContextConfig(),
+                                   storage_state_cache=FakeStorageStateCache())
+    request = SimpleNamespace(is_navigation_request=lambda: True)
+
+    async def run():
+        await context._on_response(SimpleNamespace(status=200, url="https://example.com/", request=request))
+        await context._on_response(SimpleNamespace(status=403, url="https://example.com/account", request=request))
+
+    asyncio.run(run())
+    assert invalidated == [("example.com", False)]
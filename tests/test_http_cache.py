@@ -0,0 +1,61 @@
+import sys
+
+sys.path.append(".")
+
+from src.browser.http_cache import HttpCache, is_storable, parse_max_age
+
+
+def test_parse_max_age():
+    assert parse_max_age("public, max-age=600") == 600
+    assert parse_max_age("max-age=31536000, immutable") == float("inf")
+    assert parse_max_age("no-cache") is None
+    assert parse_max_age("") is None
+
+
+def test_store_and_reload(tmp_path):
+    cache = HttpCache(cache_dir=str(tmp_path), max_bytes=1024)
+    url = "https://cdn.example.com/app.js"
+    cache.store(url, 200, {"Cache-Control": "max-age=600", "ETag": '"v1"', "Content-Encoding": "gzip"}, b"console.log(1)")
+
+    entry = cache.lookup(url)
+    assert entry.is_fresh()
+    assert entry.etag == '"v1"'
+    assert "content-encoding" not in entry.headers
+    assert cache.read_body(url) == b"console.log(1)"
+
+    # A new process picks up entries written by earlier runs
+    reloaded = HttpCache(cache_dir=str(tmp_path), max_bytes=1024)
+    assert reloaded.lookup(url).size == len(b"console.log(1)")
+
+
+def test_lru_eviction(tmp_path):
+    cache = HttpCache(cache_dir=str(tmp_path), max_bytes=10)
+    cache.store("https://a/1.css", 200, {}, b"aaaa")
+    cache.store("https://a/2.css", 200, {}, b"bbbb")
+    cache.lookup("https://a/1.css")
+    cache.store("https://a/3.css", 200, {}, b"cccc")
+
+    assert cache.lookup("https://a/2.css") is None
+    assert cache.lookup("https://a/1.css") is not None
+    assert cache.total_bytes <= 10
+
+
+def test_is_storable():
+    assert is_storable(200, {"cache-control": "max-age=60"})
+    assert not is_storable(200, {"cache-control": "no-store"})
+    assert not is_storable(404, {})
+
+
+def test_per_user_responses_are_not_stored():
+    assert not is_storable(200, {"cache-control": "private, max-age=600"})
+    assert not is_storable(200, {"cache-control": "max-age=600"}, {"Authorization": "Bearer token"})
+    assert not HttpCache.is_cacheable_request("GET", "image", {"authorization": "Bearer token"})
+    assert HttpCache.is_cacheable_request("GET", "image", {"accept": "image/*"})
+
+
+def test_vary_other_than_accept_encoding_is_not_stored():
+    assert is_storable(200, {"vary": "Accept-Encoding"})
+    assert is_storable(200, {"vary": "accept-encoding, Accept-Encoding"})
+    assert not is_storable(200, {"vary": "*"})
+    assert not is_storable(200, {"vary": "Cookie"})
+    assert not is_storable(200, {"vary": "Accept-Encoding, User-Agent"})
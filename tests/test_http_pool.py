@@ -0,0 +1,62 @@
+import sys
+
+sys.path.append(".")
+
+from src.utils.http_pool import endpoint_key, get_async_http_client, get_http_client
+
+
+def test_endpoint_key():
+    assert endpoint_key("https://api.openai.com/v1") == "https://api.openai.com:443"
+    assert endpoint_key("https://api.openai.com:443/v2/") == "https://api.openai.com:443"
+    assert endpoint_key("http://localhost:11434") == "http://localhost:11434"
+    assert endpoint_key(None) == endpoint_key("") == ""
+
+
+def test_clients_are_shared_per_endpoint():
+    assert get_http_client("https://api.x.ai/v1") is get_http_client("https://api.x.ai/v2")
+    assert get_http_client("https://api.x.ai/v1") is not get_http_client("https://api.deepseek.com")
+    assert get_async_http_client("https://api.x.ai/v1") is get_async_http_client("https://api.x.ai")
+
+
+def test_client_uses_configured_limits(monkeypatch):
+    from src.utils import http_pool
+
+    monkeypatch.setattr(http_pool, "LLM_HTTP_MAX_CONNECTIONS", 7)
+    monkeypatch.setattr(http_pool, "LLM_HTTP_MAX_KEEPALIVE", 3)
+    monkeypatch.setattr(http_pool, "LLM_HTTP_KEEPALIVE_EXPIRY", 12.0)
+    client = get_http_client("https://limits.example.com")
+    pool = client._transport._pool
+
+    assert (pool._max_connections, pool._max_keepalive_connections, pool._keepalive_expiry) == (7, 3, 12.0)
+    assert client.timeout.connect == 10.0
+
+
+def test_anthropic_clients_keep_model_settings():
+    from langchain_anthropic import ChatAnthropic
+
+    from src.utils.llm_provider import _use_shared_http_pool
+
+    base_url = "https://anthropic.example.com"
+    llm = ChatAnthropic(model="claude-3-5-sonnet-20241022", base_url=base_url, api_key="test-key",
+                        max_retries=5, default_request_timeout=30, default_headers={"X-Team": "qa"})
+    llm = _use_shared_http_pool(llm, base_url, "test-key")
+
+    for client, http_client in ((llm._client, get_http_client(base_url)),
+                                (llm._async_client, get_async_http_client(base_url))):
+        assert client._client is http_client
+        assert client.max_retries == 5
+        assert client.timeout == 30
+        assert client.default_headers["X-Team"] == "qa"
+
+
+def test_http2_falls_back_without_h2(monkeypatch, caplog):
+    from src.utils import http_pool
+
+    monkeypatch.setattr(http_pool, "LLM_HTTP2", True)
+    monkeypatch.setattr(http_pool, "h2", None)
+    monkeypatch.setattr(http_pool, "_HTTP2_FALLBACK_LOGGED", False)
+    with caplog.at_level("WARNING", logger="src.utils.http_pool"):
+        client = get_async_http_client("https://no-h2.example.com")
+
+    assert client._transport._pool._http2 is False
+    assert any("'h2' package is missing" in record.getMessage() for record in caplog.records)
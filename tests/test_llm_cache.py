@@ -0,0 +1,56 @@
+import sys
+
+sys.path.append(".")
+
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration
+
+from src.utils.llm_cache import SQLiteLRUCache, should_cache
+
+
+def test_should_cache():
+    assert not should_cache(0.0, mode="off")
+    assert should_cache(0.0, mode="deterministic")
+    assert should_cache(None, mode="deterministic")
+    assert not should_cache(0.6, mode="deterministic")
+    assert should_cache(0.6, mode="all")
+
+
+def test_exact_match_lookup(tmp_path):
+    cache = SQLiteLRUCache(db_path=str(tmp_path / "llm.db"))
+    generations = [ChatGeneration(message=AIMessage(content="Paris"))]
+    cache.update("capital of france?", "gpt-4o,temperature=0", generations)
+
+    hit = cache.lookup("capital of france?", "gpt-4o,temperature=0")
+    assert hit[0].message.content == "Paris"
+    assert cache.lookup("capital of france?", "gpt-4o,temperature=0.7") is None
+    assert cache.lookup("Capital of France?", "gpt-4o,temperature=0") is None
+    assert cache.get_metrics()["hits"] == 1
+
+
+def test_size_based_eviction(tmp_path):
+    cache = SQLiteLRUCache(db_path=str(tmp_path / "llm.db"), max_bytes=3000)
+    for i in range(10):
+        cache.update(f"prompt {i}", "model", [ChatGeneration(message=AIMessage(content="x" * 500))])
+    assert cache.get_metrics()["size_mb"] * 1024 * 1024 <= 3000
+    assert cache.lookup("prompt 9", "model") is not None
+    assert cache.lookup("prompt 0", "model") is None
+
+
+def test_streamed_synthesis_uses_the_response_cache(tmp_path):
+    import asyncio
+
+    from langchain_core.language_models import FakeListChatModel
+    from langchain_core.messages import HumanMessage
+
+    from src.agent.deep_research.deep_research_agent import REPORT_FILENAME, _stream_report_to_md
+
+    cache = SQLiteLRUCache(db_path=str(tmp_path / "llm.db"))
+    messages = [HumanMessage(content="Write the report")]
+    llm = FakeListChatModel(responses=["# Streamed report", "# New answer"], cache=cache)
+    assert asyncio.run(_stream_report_to_md(llm, messages, tmp_path)) == "# Streamed report"
+    # The first run streamed into the report file
+    assert (tmp_path / REPORT_FILENAME).exists()
+    # A repeated synthesis replays the cached answer instead of calling the model again
+    assert asyncio.run(_stream_report_to_md(llm, messages, tmp_path)) == "# Streamed report"
+    assert cache.get_metrics()["hits"] == 1
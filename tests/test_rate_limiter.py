@@ -0,0 +1,125 @@
+import asyncio
+import sys
+
+sys.path.append(".")
+
+from src.utils.rate_limiter import ProviderRateLimiter, parse_rate_limits
+
+
+def test_parse_rate_limits():
+    limits = parse_rate_limits("openai:gpt-4o=500/300000, anthropic=50/40000,bad=x/1,ollama=10")
+    assert limits == {"openai:gpt-4o": (500, 300000), "anthropic": (50, 40000), "ollama": (10, 0)}
+
+
+def test_unlimited_always_has_headroom():
+    limiter = ProviderRateLimiter()
+    for _ in range(1000):
+        limiter.record(10000)
+    assert limiter.has_headroom()
+
+
+def test_headroom_reserves_running_tasks_share():
+    limiter = ProviderRateLimiter(rpm=10, tpm=10000, window=60)
+    limiter.running = 2
+    for _ in range(4):
+        limiter.record(1000, now=100)
+    # 4 requests by 2 tasks: a third task would need about 2 more, 6 < 10
+    assert limiter.has_headroom(now=101)
+    for _ in range(2):
+        limiter.record(1000, now=100)
+    # 6 requests + 3 for one more task reaches 9 < 10, but 6000 + 3000 tokens is still fine
+    assert limiter.has_headroom(now=101)
+    limiter.record(1000, now=100)
+    assert not limiter.has_headroom(now=101)
+    # Requests older than the window no longer count
+    assert limiter.has_headroom(now=161)
+
+
+def test_admit_waits_for_headroom():
+    async def run():
+        limiter = ProviderRateLimiter(rpm=1, window=0.05)
+        limiter.record()
+        await asyncio.wait_for(limiter.admit(poll_interval=0.01), timeout=1)
+        assert limiter.running == 1
+        limiter.release()
+        assert limiter.running == 0
+
+    asyncio.run(run())
+
+
+def test_deepseek_r1_stream_runs_callbacks():
+    from types import SimpleNamespace
+
+    from langchain_core.callbacks import BaseCallbackHandler
+    from langchain_core.messages import HumanMessage
+
+    from src.utils.llm_provider import DeepSeekR1ChatOpenAI, track_llm_usage
+    from src.utils.rate_limiter import get_rate_limiter
+
+    class FakeStream:
+        def __init__(self):
+            delta = SimpleNamespace(content="hola", reasoning_content="pienso")
+            usage = SimpleNamespace(model_dump=lambda: {"total_tokens": 42})
+            self.chunks = [SimpleNamespace(choices=[SimpleNamespace(delta=delta)], usage=None),
+                           SimpleNamespace(choices=[], usage=usage)]
+
+        def __aiter__(self):
+            return self._iterate()
+
+        async def _iterate(self):
+            for chunk in self.chunks:
+                yield chunk
+
+        async def close(self):
+            pass
+
+    requests = []
+
+    async def create(**kwargs):
+        requests.append(kwargs)
+        return FakeStream()
+
+    class ConfigHandler(BaseCallbackHandler):
+        ended = 0
+
+        def on_llm_end(self, response, **kwargs):
+            ConfigHandler.ended += 1
+
+    llm = DeepSeekR1ChatOpenAI(model="deepseek-reasoner", base_url="https://api.deepseek.com", api_key="test-key")
+    # ChatOpenAI's own async_client (a chat.completions resource) is left in place
+    assert hasattr(llm.async_client, "create")
+    llm._async_openai_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    track_llm_usage(llm, "deepseek", "r1-usage-test")
+
+    message = asyncio.run(llm.ainvoke([HumanMessage(content="hola")], {"callbacks": [ConfigHandler()]},
+                                      stop=["FIN"]))
+
+    assert message.content == "hola"
+    assert message.reasoning_content == "pienso"
+    assert requests[0]["stop"] == ["FIN"]
+    assert ConfigHandler.ended == 1
+    assert get_rate_limiter("deepseek", "r1-usage-test").usage() == (1, 42)
+
+
+def test_deepseek_r1_ollama_records_usage(monkeypatch):
+    from langchain_core.messages import AIMessage, HumanMessage
+    from langchain_core.outputs import ChatGeneration, ChatResult
+    from langchain_ollama import ChatOllama
+
+    from src.utils.llm_provider import DeepSeekR1ChatOllama, track_llm_usage
+    from src.utils.rate_limiter import get_rate_limiter
+
+    async def agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        message = AIMessage(content="<think>pienso</think>hola",
+                            usage_metadata={"input_tokens": 5, "output_tokens": 7, "total_tokens": 12})
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    monkeypatch.setattr(ChatOllama, "_agenerate", agenerate)
+    llm = DeepSeekR1ChatOllama(model="deepseek-r1:14b")
+    track_llm_usage(llm, "ollama", "r1-usage-test")
+
+    message = asyncio.run(llm.ainvoke([HumanMessage(content="hola")]))
+
+    assert message.content == "hola"
+    assert message.reasoning_content == "pienso"
+    assert get_rate_limiter("ollama", "r1-usage-test").usage() == (1, 12)
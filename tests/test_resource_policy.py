@@ -0,0 +1,31 @@
+import sys
+
+sys.path.append(".")
+
+from src.browser.resource_policy import ResourcePolicy, parse_domain_list
+
+
+def test_lean_policy_blocks_heavy_resources_and_trackers():
+    policy = ResourcePolicy.lean()
+
+    assert policy.should_block("https://news.example.com/hero.jpg", "image")
+    assert policy.should_block("https://news.example.com/font.woff2", "font")
+    assert policy.should_block("https://www.google-analytics.com/analytics.js", "script")
+    assert policy.should_block("https://securepubads.g.doubleclick.net/tag.js", "script")
+    assert not policy.should_block("https://news.example.com/app.js", "script")
+    assert not policy.should_block("https://news.example.com/", "document")
+
+
+def test_allowed_domains_are_never_blocked():
+    policy = ResourcePolicy.lean("shop.example.com, cdn.example.org")
+
+    assert not policy.should_block("https://shop.example.com/product.png", "image")
+    assert not policy.should_block("https://img.cdn.example.org/product.png", "image")
+    assert policy.should_block("https://other.example.com/product.png", "image")
+
+
+def test_from_settings_and_domain_parsing():
+    assert ResourcePolicy.from_settings(False, "example.com") is None
+    assert ResourcePolicy.from_settings(True) is not None
+    assert parse_domain_list(" .Example.com,foo.org  bar.net ") == {"example.com", "foo.org", "bar.net"}
+    assert parse_domain_list(["a.com", " "]) == {"a.com"}
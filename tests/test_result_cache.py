@@ -0,0 +1,43 @@
+import sys
+import time
+
+sys.path.append(".")
+
+from src.utils.result_cache import RESULT_CACHE_TTL, ResultCache, resolve_cache_ttl, result_cache_key
+
+
+def test_key_normalizes_task_and_includes_settings():
+    settings = {"model_name": "gpt-4o", "headless": True}
+    assert result_cache_key("Price of  BTC", settings) == result_cache_key("price of btc ", settings)
+    assert result_cache_key("price of btc", settings) != result_cache_key("price of btc", {**settings, "model_name": "o3"})
+
+
+def test_resolve_cache_ttl():
+    assert resolve_cache_ttl(True) == RESULT_CACHE_TTL
+    assert resolve_cache_ttl(60) == 60.0
+    assert resolve_cache_ttl(None) is None and resolve_cache_ttl(False) is None and resolve_cache_ttl(0) is None
+
+
+def test_hit_and_expiry(tmp_path):
+    cache = ResultCache(db_path=str(tmp_path / "results.db"))
+    cache.put("k", "task", {"final_result": "42", "success": True}, ttl=60)
+    cached = cache.get("k")
+    assert cached["final_result"] == "42"
+    assert "cached_at" in cached
+
+    cache.put("old", "task", {"final_result": "1"}, ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get("old") is None
+    assert cache.get_metrics()["hits"] == 1
+
+
+def test_lru_eviction(tmp_path):
+    cache = ResultCache(db_path=str(tmp_path / "results.db"), max_entries=2)
+    cache.put("a", "a", {"final_result": "a"}, ttl=60)
+    cache.put("b", "b", {"final_result": "b"}, ttl=60)
+    time.sleep(0.01)
+    assert cache.get("a") is not None  # "b" is now the least recently used
+    cache.put("c", "c", {"final_result": "c"}, ttl=60)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert len(cache) == 2
@@ -0,0 +1,120 @@
+import asyncio
+import sys
+import time
+
+sys.path.append(".")
+
+from src.utils.task_queue import PriorityTaskQueue, task_coalesce_key
+
+
+def _task(task_id, task_type="browser_use", priority=None, deadline=None):
+    return {"id": task_id, "type": task_type, "priority": priority, "deadline": deadline}
+
+
+def test_priority_and_type_weights():
+    async def run():
+        queue = PriorityTaskQueue(type_weights={"browser_use": 1.0, "deep_research": 0.25})
+        await queue.put(_task("research", "deep_research", "high"))
+        await queue.put(_task("normal-1"))
+        await queue.put(_task("low", priority="low"))
+        await queue.put(_task("normal-2"))
+        await queue.put(_task("urgent", priority="high"))
+        return [(await queue.get())["id"] for _ in range(5)]
+
+    # The priority class decides first, the type weight only orders tasks within a class
+    assert asyncio.run(run()) == ["urgent", "research", "normal-1", "normal-2", "low"]
+
+
+def test_aging_prevents_starvation():
+    async def run():
+        queue = PriorityTaskQueue(aging_interval=60)
+        now = time.time()
+        old_low = _task("old-low", priority="low")
+        old_low["enqueued_at"] = now - 300
+        await queue.put(old_low)
+        for i in range(3):
+            await queue.put(_task(f"high-{i}", priority="high"))
+        return [(await queue.get())["id"] for _ in range(4)]
+
+    # Five minutes of waiting lift the low task above freshly submitted high priority ones
+    assert asyncio.run(run()) == ["old-low", "high-0", "high-1", "high-2"]
+
+
+def test_near_deadline_outranks_higher_class():
+    async def run():
+        queue = PriorityTaskQueue(aging_interval=60)
+        now = time.time()
+        await queue.put(_task("normal"))
+        await queue.put(_task("low-later", priority="low", deadline=now + 3600))
+        await queue.put(_task("low-due", priority="low", deadline=now + 30))
+        return [(await queue.get())["id"] for _ in range(3)]
+
+    assert asyncio.run(run()) == ["low-due", "normal", "low-later"]
+
+
+def test_earliest_deadline_breaks_ties():
+    async def run():
+        queue = PriorityTaskQueue()
+        now = time.time()
+        await queue.put(_task("late", deadline=now + 600))
+        await queue.put(_task("no-deadline"))
+        await queue.put(_task("soon", deadline=now + 60))
+        return [(await queue.get())["id"] for _ in range(3)]
+
+    assert asyncio.run(run()) == ["soon", "late", "no-deadline"]
+
+
+def test_expired_tasks_are_dropped():
+    expired = []
+
+    async def run():
+        queue = PriorityTaskQueue(on_expired=lambda task_info: expired.append(task_info["id"]))
+        await queue.put(_task("expired", priority="high", deadline=time.time() - 1))
+        await queue.put(_task("ok"))
+        task_info = await queue.get()
+        queue.task_done()
+        # Expired tasks are marked done so join() does not hang
+        await asyncio.wait_for(queue.join(), timeout=1)
+        return task_info["id"]
+
+    assert asyncio.run(run()) == "ok"
+    assert expired == ["expired"]
+
+
+def test_get_waits_when_only_expired_tasks_are_queued():
+    async def run():
+        queue = PriorityTaskQueue()
+        await queue.put(_task("expired", deadline=time.time() - 1))
+        getter = asyncio.create_task(queue.get())
+        await asyncio.sleep(0.01)
+        assert not getter.done()
+        await queue.put(_task("fresh"))
+        return (await asyncio.wait_for(getter, timeout=1))["id"]
+
+    assert asyncio.run(run()) == "fresh"
+
+
+def test_coalesce_key():
+    settings = {"llm_provider": "openai", "model_name": "gpt-4o", "browser_mode": "pc"}
+    key = task_coalesce_key("Find  the price of\nBTC ", "browser_use", settings)
+    assert key == task_coalesce_key("find the price of btc", "browser_use", dict(reversed(list(settings.items()))))
+    assert key != task_coalesce_key("find the price of btc", "deep_research", settings)
+    assert key != task_coalesce_key("find the price of btc", "browser_use", {**settings, "browser_mode": "vnc"})
+
+
+def test_drop_oldest_ignores_score():
+    async def run():
+        queue = PriorityTaskQueue()
+        await queue.put(_task("old-low", priority="low"))
+        await queue.put(_task("high", priority="high"))
+        await queue.put(_task("normal"))
+        dropped = queue.drop_oldest()
+        remaining = [task_info["id"] for task_info in queue.ordered()]
+        while not queue.empty():
+            await queue.get()
+            queue.task_done()
+        await asyncio.wait_for(queue.join(), timeout=1)
+        return dropped["id"], remaining
+
+    assert asyncio.run(run()) == ("old-low", ["high", "normal"])
+    assert PriorityTaskQueue().drop_oldest() is None
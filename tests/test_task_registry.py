@@ -0,0 +1,41 @@
+import sys
+
+sys.path.append(".")
+
+from src.utils.task_registry import TaskRegistry
+
+
+def test_state_index():
+    registry = TaskRegistry()
+    for task_id in ("a", "b", "c"):
+        registry.add(task_id, f"task {task_id}")
+    registry.set_status("b", "ejecutando")
+    registry.set_status("c", "ejecutando")
+    registry.set_status("c", "pausada")
+
+    assert registry.ids_in("en cola") == ["a"]
+    assert registry.ids_in("ejecutando", "pausada") == ["b", "c"]
+    assert registry.get_status("c") == "pausada"
+    assert registry.get_description("b") == "task b"
+    assert registry.is_active("a")
+
+    registry.set_status("b", "completada")
+    assert registry.ids_in("ejecutando") == []
+    assert not registry.is_active("b")
+    assert registry.get_status("b") == "completada"
+    assert registry.counts() == {"en cola": 1, "ejecutando": 0, "pausada": 1, "finalizadas": 1}
+
+
+def test_finished_tasks_are_bounded():
+    registry = TaskRegistry(history_size=2)
+    for i in range(5):
+        registry.add(str(i), f"task {i}")
+        registry.set_status(str(i), "completada")
+    registry.add("active", "still queued")
+
+    assert [record.task_id for record in registry.finished()] == ["3", "4"]
+    assert registry.get_status("0") is None
+    assert registry.get_status("0", "desconocida") == "desconocida"
+    assert registry.get_status("active") == "en cola"
+    assert len(registry) == 3
+    assert list(registry) == ["active", "3", "4"]
@@ -0,0 +1,67 @@
+import sys
+
+sys.path.append(".")
+
+from src.utils.task_store import TaskStore
+
+
+def _task(task_id, description="Search the weather"):
+    return {"id": task_id, "description": description, "type": "browser_use", "priority": "high"}
+
+
+def test_interrupted_tasks_are_requeued(tmp_path):
+    db_path = str(tmp_path / "tasks.db")
+    store = TaskStore(db_path, flush_interval=0)
+    store.add(_task("queued"))
+    store.add(_task("running"))
+    store.add(_task("done"))
+    store.update("running", "ejecutando", new_attempt=True)
+    store.update("done", "ejecutando", new_attempt=True)
+    store.update("done", "completada", result={"success": True})
+    store.close()
+
+    restarted = TaskStore(db_path, flush_interval=0)
+    tasks = restarted.recover()
+    assert [task["id"] for task in tasks] == ["queued", "running"]
+    assert all(task["status"] == "en cola" for task in tasks)
+    assert tasks[1]["attempts"] == 1
+    assert tasks[1]["priority"] == "high"
+    assert restarted.get("done")["status"] == "completada"
+    restarted.close()
+
+
+def test_tasks_that_keep_crashing_are_not_requeued(tmp_path):
+    db_path = str(tmp_path / "tasks.db")
+    store = TaskStore(db_path, flush_interval=0)
+    store.add(_task("crashy"))
+    store.add(_task("retry"))
+    for _ in range(3):
+        store.update("crashy", "ejecutando", new_attempt=True)
+    store.update("retry", "ejecutando", new_attempt=True)
+    store.close()
+
+    restarted = TaskStore(db_path, flush_interval=0)
+    assert [task["id"] for task in restarted.recover(max_attempts=3)] == ["retry"]
+    restarted.close()
+
+    # The failed state is persisted, so the task stays out of the queue on the next start too
+    again = TaskStore(db_path, flush_interval=0)
+    assert [task["id"] for task in again.recover(max_attempts=3)] == ["retry"]
+    row = again.get("crashy")
+    assert row["status"] == "fallida"
+    assert "3 intentos" in row["result"]
+    again.close()
+
+
+def test_updates_are_coalesced_until_flush(tmp_path):
+    store = TaskStore(str(tmp_path / "tasks.db"), flush_interval=60)
+    store.add(_task("a"))
+    store.update("a", "ejecutando", new_attempt=True)
+    store.update("a", "fallida", result={"error": "boom"})
+    store.flush()
+
+    row = store.get("a")
+    assert row["status"] == "fallida"
+    assert row["attempts"] == 1
+    assert "boom" in row["result"]
+    store.close()
@@ -0,0 +1,135 @@
+import asyncio
+import sys
+import time
+
+sys.path.append(".")
+
+from src.utils.rate_limiter import ProviderRateLimiter
+from src.webui import webui_manager
+from src.webui.webui_manager import WebuiManager
+
+
+def _manager(monkeypatch, tmp_path) -> WebuiManager:
+    monkeypatch.setattr(webui_manager, "TASK_STORE_PATH", "")
+    return WebuiManager(settings_save_dir=str(tmp_path / "settings"))
+
+
+def test_deadline_expires_while_waiting_for_quota(monkeypatch, tmp_path):
+    limiter = ProviderRateLimiter(rpm=1)
+    limiter.record()
+    monkeypatch.setattr(webui_manager, "get_rate_limiter", lambda *args: limiter)
+
+    async def run():
+        manager = _manager(monkeypatch, tmp_path)
+
+        async def execute(*args, **kwargs):
+            raise AssertionError("an expired task must not run")
+
+        manager._execute_browser_task = execute
+        task_id = await manager.add_task("Buscar el clima", deadline=time.time() + 0.2)
+        await manager.start_task_processor()
+        try:
+            result = await manager.wait_for_task(task_id, timeout=2)
+        finally:
+            await manager.stop_task_processor()
+        return manager, task_id, result
+
+    manager, task_id, result = asyncio.run(run())
+    assert result["status"] == "expirada"
+    assert manager.tasks.get_status(task_id) == "expirada"
+    assert limiter.running == 0
+
+
+def test_stopping_a_queued_task_unblocks_submitters(monkeypatch, tmp_path):
+    async def run():
+        manager = _manager(monkeypatch, tmp_path)
+        manager.max_queue_depth = 1
+        manager.queue_full_policy = "block"
+        first_id = await manager.add_task("Primera tarea")
+
+        submit = asyncio.create_task(manager.add_task("Segunda tarea"))
+        await asyncio.sleep(0.05)
+        blocked = not submit.done()
+
+        # No worker is running: the only way out of the full queue is the stop
+        await manager.stop_task(first_id)
+        second_id = await asyncio.wait_for(submit, timeout=1)
+        return blocked, manager.tasks.get_status(second_id)
+
+    assert asyncio.run(run()) == (True, "en cola")
+
+
+def test_cached_task_reads_the_result_cache_once(monkeypatch, tmp_path):
+    from types import SimpleNamespace
+
+    from src.agent.browser_use import browser_use_agent
+    from src.utils.result_cache import ResultCache
+
+    class CountingResultCache(ResultCache):
+        reads = 0
+
+        def get(self, key):
+            CountingResultCache.reads += 1
+            return super().get(key)
+
+    class FakeHistory:
+        def is_done(self):
+            return True
+
+        def is_successful(self):
+            return True
+
+        def final_result(self):
+            return "22 grados"
+
+    class FakeAgent:
+        def __init__(self, task, llm, **kwargs):
+            pass
+
+        async def run(self, max_steps, on_step_start=None):
+            return FakeHistory()
+
+    class FakeContext:
+        async def save_storage_state(self):
+            pass
+
+        async def close(self):
+            pass
+
+    class FakeBrowser:
+        config = SimpleNamespace(new_context_config=None)
+
+        async def new_context(self, config=None):
+            return FakeContext()
+
+        async def close(self):
+            pass
+
+    cache = CountingResultCache(db_path=str(tmp_path / "results.db"))
+    monkeypatch.setattr(webui_manager, "get_result_cache", lambda: cache)
+    monkeypatch.setattr(browser_use_agent, "get_result_cache", lambda: cache)
+    monkeypatch.setattr(browser_use_agent, "AGENT_HISTORY_DIR", str(tmp_path / "history"))
+    monkeypatch.setattr(browser_use_agent, "Agent", FakeAgent)
+
+    async def run():
+        manager = _manager(monkeypatch, tmp_path)
+        browser = FakeBrowser()
+        manager._worker_browser = lambda worker: browser
+
+        async def ensure_browser(worker=None):
+            return browser
+
+        manager._ensure_browser = ensure_browser
+        manager._get_task_llm = lambda: SimpleNamespace(callbacks=None)
+        task_id = await manager.add_task("Clima en Madrid", cache_ttl=60)
+        await manager.start_task_processor()
+        try:
+            return await manager.wait_for_task(task_id, timeout=2)
+        finally:
+            await manager.stop_task_processor()
+
+    result = asyncio.run(run())
+    assert result["success"] and not result.get("cached")
+    # One read by the worker before the browser is touched, none inside the agent wrapper
+    assert CountingResultCache.reads == 1
+    assert cache.get_metrics()["entries"] == 1
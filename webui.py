@@ -9,9 +9,11 @@ def main():
     parser.add_argument("--ip", type=str, default="127.0.0.1", help="IP address to bind to")
     parser.add_argument("--port", type=int, default=7788, help="Port to listen on")
     parser.add_argument("--theme", type=str, default="Base", choices=theme_map.keys(), help="Theme to use for the UI")
+    parser.add_argument("--prewarm", action="store_true", default=None,
+                        help="Launch the browser, LLM client and MCP servers before the first task")
     args = parser.parse_args()
 
-    demo = create_ui(theme_name=args.theme)
+    demo = create_ui(theme_name=args.theme, prewarm=args.prewarm)
     demo.queue().launch(server_name=args.ip, server_port=args.port)
 
 